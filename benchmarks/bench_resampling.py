@@ -0,0 +1,79 @@
+"""Micro-benchmark: polyphase resampler vs the old np.interp resampler.
+
+Run from the repository root:
+
+    python benchmarks/bench_resampling.py
+
+Reports wall time per call for common input rates and durations, and how
+much of a tone above the 8 kHz output Nyquist frequency leaks back into
+the 16 kHz result as an alias.
+"""
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core.audio.resampling import resample  # noqa: E402
+
+TARGET_SR = 16000
+
+
+def interp_resample(audio: np.ndarray, orig_sr: int, target_sr: int = TARGET_SR) -> np.ndarray:
+    """The np.interp implementation previously used by the API server."""
+    if orig_sr == target_sr:
+        return audio
+    ratio = target_sr / orig_sr
+    n_samples = int(len(audio) * ratio)
+    indices = np.linspace(0, len(audio) - 1, n_samples)
+    return np.interp(indices, np.arange(len(audio)), audio).astype(np.float32)
+
+
+def _time(fn, repeats: int) -> float:
+    fn()
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _alias_db(out: np.ndarray) -> float:
+    """Energy of the output relative to a full-scale sine, in dB. The input
+    tone is above the output Nyquist frequency, so ideally this is silence."""
+    rms = float(np.sqrt(np.mean(out[len(out) // 10:-len(out) // 10] ** 2)))
+    return 20 * np.log10(max(rms, 1e-12) / (1 / np.sqrt(2)))
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    print(f"{'input':>12} {'seconds':>8} {'interp ms':>10} {'poly ms':>10}")
+    for orig_sr in (8000, 22050, 44100, 48000):
+        for seconds in (1, 30, 600):
+            audio = rng.uniform(-0.5, 0.5, orig_sr * seconds).astype(np.float32)
+            repeats = 5 if seconds < 600 else 2
+            t_interp = _time(lambda: interp_resample(audio, orig_sr), repeats)
+            t_poly = _time(lambda: resample(audio, orig_sr, TARGET_SR), repeats)
+            print(
+                f"{orig_sr:>10}Hz {seconds:>8} "
+                f"{t_interp * 1e3:>10.1f} {t_poly * 1e3:>10.1f}"
+            )
+
+    print()
+    print("Alias of a 10 kHz tone after resampling to 16 kHz (lower is better):")
+    for orig_sr in (44100, 48000):
+        t = np.arange(orig_sr * 2) / orig_sr
+        tone = np.sin(2 * np.pi * 10000 * t).astype(np.float32)
+        print(
+            f"  {orig_sr} Hz: interp {_alias_db(interp_resample(tone, orig_sr)):6.1f} dB, "
+            f"polyphase {_alias_db(resample(tone, orig_sr, TARGET_SR)):6.1f} dB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""Headless batch transcription: python -m cli [options] INPUT [INPUT ...]
+
+Inputs are files, directories (scanned for supported audio) or glob
+patterns. Runs the same BatchJob as the GUI's batch panel without importing
+Qt, prints throughput when done and exits 0 only if every file was written.
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import signal
+import sys
+from pathlib import Path
+
+os.environ.setdefault("HF_HUB_DISABLE_PROGRESS_BARS", "1")
+
+from core.cuda_setup import setup_cuda_if_available
+setup_cuda_if_available()
+
+from config.constants import (
+    MODEL_NAMES,
+    SUPPORTED_AUDIO_EXTENSIONS,
+    TASK_MODES,
+)
+from config.manager import config_manager
+from core.logging_config import get_logger, setup_logging
+from core.models.cache_index import get_model_cache_index
+from core.models.loader import (
+    check_model_cached,
+    download_model_files,
+    get_missing_files,
+    get_repo_file_info,
+    get_repo_id,
+    load_whisper_s2t_model,
+)
+from core.models.metadata import ModelMetadata
+from core.output.writers import available_formats
+from core.transcription.batch_job import BatchJob, BatchStats
+from core.transcription.cache import (
+    CACHE_FILE,
+    CacheScope,
+    model_beam_size,
+    open_transcription_cache,
+)
+from core.transcription.file_scanner import FileScanner
+from core.transcription.scheduler import SCHEDULE_POLICIES, format_duration
+from core.transcription.workers import WorkerModelSpec
+from utils import get_resource_path
+
+logger = get_logger(__name__)
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    cfg = config_manager.get_value
+    p = argparse.ArgumentParser(
+        prog="python -m cli",
+        description="Transcribe audio files with WhisperS2T, without the GUI.",
+    )
+    p.add_argument("inputs", nargs="+", help="audio files, directories or glob patterns")
+    p.add_argument("-m", "--model", default=cfg("model_name"), choices=MODEL_NAMES, metavar="NAME",
+                   help="model name, e.g. 'Whisper small.en' (default: %(default)s)")
+    p.add_argument("-p", "--precision", default=cfg("precision"),
+                   choices=sorted(config_manager.VALID_OPTIONS["precisions"]))
+    p.add_argument("-d", "--device", default=cfg("device_type"),
+                   choices=sorted(config_manager.VALID_OPTIONS["device_types"]))
+    p.add_argument("-f", "--format", default="txt", choices=available_formats())
+    p.add_argument("-o", "--output-dir", default=None,
+                   help="where outputs go (default: next to each input)")
+    p.add_argument("-w", "--workers", type=int, default=cfg("batch_cpu_workers"),
+                   help="model processes on CPU, each with a share of the threads")
+    p.add_argument("-l", "--language", default=cfg("language"))
+    p.add_argument("--task", default=cfg("task_mode"), choices=TASK_MODES)
+    p.add_argument("--beam-size", type=int, default=cfg("beam_size"))
+    p.add_argument("--batch-size", type=int, default=cfg("batch_size"))
+    p.add_argument("--files-per-group", type=int, default=cfg("batch_files_per_group"))
+    p.add_argument("--prefetch", type=int, default=cfg("batch_prefetch_files"),
+                   help="files decoded ahead of the model (0 disables)")
+    p.add_argument("--schedule", default=cfg("batch_schedule"), choices=sorted(SCHEDULE_POLICIES))
+    p.add_argument("-r", "--recursive", action="store_true",
+                   help="scan directories recursively")
+    p.add_argument("--no-resume", dest="resume", action="store_false", default=cfg("batch_resume"),
+                   help="redo files a previous run already finished")
+    p.add_argument("--no-cache", dest="cache", action="store_false",
+                   default=cfg("transcription_cache_enabled", True),
+                   help="do not read or write the transcription cache")
+    p.add_argument("-q", "--quiet", action="store_true", help="only print the summary")
+    return p
+
+
+def collect_inputs(patterns: list[str], recursive: bool = False) -> list[Path]:
+    """Expand files, directories and globs into a sorted, de-duplicated list
+    of supported audio files."""
+    scanner = FileScanner()
+    extensions = set(SUPPORTED_AUDIO_EXTENSIONS)
+    found: dict[str, Path] = {}
+    for pattern in patterns:
+        matches = [Path(m) for m in glob.glob(pattern, recursive=True)] or [Path(pattern)]
+        for path in matches:
+            if path.is_dir():
+                candidates = scanner.scan_directory(
+                    path, SUPPORTED_AUDIO_EXTENSIONS, recursive
+                )
+            elif path.is_file() and path.suffix.lower() in extensions:
+                candidates = [path]
+            else:
+                continue
+            for c in candidates:
+                found.setdefault(str(c.resolve()).lower(), c)
+    return sorted(found.values())
+
+
+def _print_download(downloaded: int, total: int) -> None:
+    print(
+        f"\rDownloading model: {downloaded / 2**20:.0f}/{total / 2**20:.0f} MB",
+        end="" if downloaded < total else "\n",
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+def resolve_model_path(model_name: str, precision: str, quiet: bool = False) -> str:
+    """Local snapshot for the model, downloading whatever is missing."""
+    repo_id = get_repo_id(model_name, precision)
+    cached = check_model_cached(repo_id)
+    if cached and get_model_cache_index().checked_at(repo_id, cached) is not None:
+        return cached
+    try:
+        files_info = get_repo_file_info(repo_id)
+    except Exception as e:
+        if cached:
+            logger.info(f"Could not check {repo_id} online ({e}); using the cache")
+            return cached
+        raise
+    local_path, missing = get_missing_files(repo_id, files_info, cached)
+    if not missing:
+        return local_path
+    return download_model_files(
+        repo_id, missing, progress_callback=None if quiet else _print_download
+    )
+
+
+def format_stats(stats: BatchStats) -> str:
+    lines = [
+        f"Files:      {stats.completed} transcribed"
+        + (f" ({stats.cached} from cache)" if stats.cached else "")
+        + (f", {stats.skipped} already done" if stats.skipped else "")
+        + (f", {stats.failed} failed" if stats.failed else "")
+        + f" of {stats.total}",
+        f"Elapsed:    {format_duration(stats.elapsed)}",
+        f"Throughput: {stats.files_per_second:.2f} files/s, "
+        f"{stats.audio_per_second:.1f} audio-s/s",
+    ]
+    rtf = stats.real_time_factor
+    if rtf is not None:
+        lines.append(f"RTF:        {rtf:.3f} ({1 / rtf:.1f}x real time)")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _build_parser().parse_args(argv)
+    setup_logging()
+
+    files = collect_inputs(args.inputs, args.recursive)
+    if not files:
+        print("No supported audio files found.", file=sys.stderr)
+        return EXIT_USAGE
+    if ModelMetadata.get_model_info(args.model, args.precision) is None:
+        print(f"{args.model} is not available in {args.precision}.", file=sys.stderr)
+        return EXIT_USAGE
+
+    try:
+        local_path = resolve_model_path(args.model, args.precision, args.quiet)
+        model = load_whisper_s2t_model(
+            args.model, args.precision, args.device,
+            beam_size=args.beam_size, local_path=local_path,
+        )
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    except Exception as e:
+        print(f"Could not load {args.model}: {e}", file=sys.stderr)
+        return EXIT_FAILED
+
+    cache = None
+    scope = None
+    if args.cache:
+        cache = open_transcription_cache(
+            get_resource_path(CACHE_FILE),
+            config_manager.get_value("transcription_cache_max_mb", 512),
+        )
+        scope = CacheScope(
+            model_key=ModelMetadata.resolve_model_key(args.model, args.precision),
+            beam_size=model_beam_size(model, args.beam_size),
+        )
+
+    def on_progress(current: int, total: int, message: str) -> None:
+        if not args.quiet:
+            print(f"[{current}/{total}] {message}", flush=True)
+
+    def on_error(message: str) -> None:
+        print(message, file=sys.stderr, flush=True)
+
+    job = BatchJob(
+        files,
+        model,
+        output_format=args.format,
+        output_directory=args.output_dir,
+        batch_size=args.batch_size,
+        language=args.language,
+        task_mode=args.task,
+        files_per_group=args.files_per_group,
+        prefetch_files=args.prefetch,
+        resume=args.resume,
+        schedule=args.schedule,
+        adaptive_batch=config_manager.get_value("batch_adaptive", True),
+        worker_spec=WorkerModelSpec(
+            model_name=args.model,
+            precision=args.precision,
+            device=args.device,
+            beam_size=args.beam_size,
+            local_path=local_path,
+        ),
+        cpu_workers=args.workers,
+        cache=cache,
+        cache_scope=scope,
+        on_progress=on_progress,
+        on_error=on_error,
+    )
+
+    # First Ctrl+C finishes the files in flight and writes their outputs; a
+    # second one kills the process.
+    def on_sigint(_signum, _frame):
+        print("\nStopping after the current files (Ctrl+C again to abort)...",
+              file=sys.stderr, flush=True)
+        job.request_stop()
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    signal.signal(signal.SIGINT, on_sigint)
+    try:
+        stats = job.run()
+    finally:
+        if cache is not None:
+            cache.close()
+
+    print(format_stats(stats))
+    if job.stop_requested.is_set():
+        return EXIT_INTERRUPTED
+    return EXIT_OK if stats.succeeded else EXIT_FAILED
+
+
+if __name__ == "__main__":
+    sys.exit(main())
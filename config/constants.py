@@ -98,7 +98,6 @@ SUPPORTED_AUDIO_EXTENSIONS = [
     ".mkv", ".mp3", ".mp4", ".ogg", ".wav", ".webm", ".wma",
 ]
 
-OUTPUT_FORMATS = ["txt", "vtt", "srt", "json"]
 TASK_MODES = ["transcribe", "translate"]
 
 DEFAULT_BEAM_SIZE = 1
@@ -21,6 +21,7 @@ class ConfigManager:
         "device_types": {"cpu", "cuda"},
         "task_modes": {"transcribe", "translate"},
         "precisions": {"float16", "float32", "bfloat16"},
+        "batch_schedules": {"path", "longest_first", "bucketed"},
     }
 
     DEFAULT_CONFIG = {
@@ -38,6 +39,30 @@ class ConfigManager:
         "batch_size": 16,
         "server_mode_enabled": False,
         "server_port": 8765,
+        "server_batch_window_ms": 20,
+        "server_max_batch_items": 8,
+        "server_max_jobs": 100,
+        "server_max_queue_depth": 64,
+        "server_max_queued_audio_s": 7200,
+        "server_request_timeout_s": 600,
+        "server_warmup_enabled": True,
+        "server_warmup_models": [],
+        "batch_files_per_group": 8,
+        "batch_prefetch_files": 8,
+        "batch_resume": True,
+        "batch_schedule": "path",
+        "batch_adaptive": True,
+        "stable_batch_sizes": {},
+        "batch_cpu_workers": 1,
+        "transcription_cache_enabled": True,
+        "transcription_cache_max_mb": 512,
+        "model_pool_budget_mb": 0,
+        "model_freshness_ttl_hours": 24,
+        "live_dictation": False,
+        "capture_resample_16k": False,
+        "capture_always_warm": False,
+        "capture_preroll_ms": 1500,
+        "capture_idle_timeout_s": 300,
     }
 
     VALIDATION_SCHEMA = {
@@ -54,6 +79,30 @@ class ConfigManager:
         "batch_size": {"type": int, "validator": "_validate_batch_size"},
         "server_mode_enabled": {"type": bool},
         "server_port": {"type": int, "validator": "_validate_port"},
+        "server_batch_window_ms": {"type": int, "validator": "_validate_batch_window"},
+        "server_max_batch_items": {"type": int, "validator": "_validate_max_batch_items"},
+        "server_max_jobs": {"type": int, "validator": "_validate_max_jobs"},
+        "server_max_queue_depth": {"type": int, "validator": "_validate_max_queue_depth"},
+        "server_max_queued_audio_s": {"type": int, "validator": "_validate_max_queued_audio"},
+        "server_request_timeout_s": {"type": int, "validator": "_validate_request_timeout"},
+        "server_warmup_enabled": {"type": bool},
+        "server_warmup_models": {"type": list, "validator": "_validate_warmup_models"},
+        "batch_files_per_group": {"type": int, "validator": "_validate_files_per_group"},
+        "batch_prefetch_files": {"type": int, "validator": "_validate_prefetch_files"},
+        "batch_resume": {"type": bool},
+        "batch_schedule": {"type": str, "options": "batch_schedules", "lowercase": True},
+        "batch_adaptive": {"type": bool},
+        "stable_batch_sizes": {"type": dict, "validator": "_validate_stable_batch_sizes"},
+        "batch_cpu_workers": {"type": int, "validator": "_validate_cpu_workers"},
+        "transcription_cache_enabled": {"type": bool},
+        "transcription_cache_max_mb": {"type": int, "validator": "_validate_cache_max_mb"},
+        "model_pool_budget_mb": {"type": int, "validator": "_validate_pool_budget"},
+        "model_freshness_ttl_hours": {"type": int, "validator": "_validate_freshness_ttl"},
+        "live_dictation": {"type": bool},
+        "capture_resample_16k": {"type": bool},
+        "capture_always_warm": {"type": bool},
+        "capture_preroll_ms": {"type": int, "validator": "_validate_preroll"},
+        "capture_idle_timeout_s": {"type": int, "validator": "_validate_idle_timeout"},
     }
 
     def __init__(self):
@@ -156,6 +205,94 @@ class ConfigManager:
             return value
         return self.DEFAULT_CONFIG["server_port"]
 
+    def _validate_files_per_group(self, value: Any) -> int:
+        if isinstance(value, int) and 1 <= value <= 256:
+            return value
+        return self.DEFAULT_CONFIG["batch_files_per_group"]
+
+    def _validate_prefetch_files(self, value: Any) -> int:
+        if isinstance(value, int) and 0 <= value <= 256:
+            return value
+        return self.DEFAULT_CONFIG["batch_prefetch_files"]
+
+    def _validate_cpu_workers(self, value: Any) -> int:
+        if isinstance(value, int) and 1 <= value <= 64:
+            return value
+        return self.DEFAULT_CONFIG["batch_cpu_workers"]
+
+    def _validate_cache_max_mb(self, value: Any) -> int:
+        if isinstance(value, int) and 1 <= value <= 102400:
+            return value
+        return self.DEFAULT_CONFIG["transcription_cache_max_mb"]
+
+    def _validate_pool_budget(self, value: Any) -> int:
+        # 0 sizes the budget from the device's total memory.
+        if isinstance(value, int) and 0 <= value <= 1048576:
+            return value
+        return self.DEFAULT_CONFIG["model_pool_budget_mb"]
+
+    def _validate_freshness_ttl(self, value: Any) -> int:
+        # 0 never re-checks cached models against the hub.
+        if isinstance(value, int) and 0 <= value <= 8760:
+            return value
+        return self.DEFAULT_CONFIG["model_freshness_ttl_hours"]
+
+    def _validate_preroll(self, value: Any) -> int:
+        if isinstance(value, int) and 0 <= value <= 5000:
+            return value
+        return self.DEFAULT_CONFIG["capture_preroll_ms"]
+
+    def _validate_idle_timeout(self, value: Any) -> int:
+        # 0 keeps a warm capture stream open until the app exits.
+        if isinstance(value, int) and 0 <= value <= 86400:
+            return value
+        return self.DEFAULT_CONFIG["capture_idle_timeout_s"]
+
+    def _validate_batch_window(self, value: Any) -> int:
+        if isinstance(value, int) and 0 <= value <= 1000:
+            return value
+        return self.DEFAULT_CONFIG["server_batch_window_ms"]
+
+    def _validate_max_batch_items(self, value: Any) -> int:
+        if isinstance(value, int) and 1 <= value <= 64:
+            return value
+        return self.DEFAULT_CONFIG["server_max_batch_items"]
+
+    def _validate_max_jobs(self, value: Any) -> int:
+        if isinstance(value, int) and 1 <= value <= 10000:
+            return value
+        return self.DEFAULT_CONFIG["server_max_jobs"]
+
+    def _validate_max_queue_depth(self, value: Any) -> int:
+        if isinstance(value, int) and 1 <= value <= 10000:
+            return value
+        return self.DEFAULT_CONFIG["server_max_queue_depth"]
+
+    def _validate_max_queued_audio(self, value: Any) -> int:
+        if isinstance(value, int) and 1 <= value <= 1000000:
+            return value
+        return self.DEFAULT_CONFIG["server_max_queued_audio_s"]
+
+    def _validate_request_timeout(self, value: Any) -> int:
+        # 0 disables the deadline.
+        if isinstance(value, int) and 0 <= value <= 86400:
+            return value
+        return self.DEFAULT_CONFIG["server_request_timeout_s"]
+
+    def _validate_warmup_models(self, value: Any) -> list[str]:
+        # Keys as listed by /models, e.g. "Whisper large-v3 - float16".
+        try:
+            from config.constants import WHISPER_MODELS
+        except ImportError:
+            return [v for v in value if isinstance(v, str)]
+        return [v for v in value if isinstance(v, str) and v in WHISPER_MODELS]
+
+    def _validate_stable_batch_sizes(self, value: Any) -> dict[str, int]:
+        return {
+            k: v for k, v in value.items()
+            if isinstance(k, str) and isinstance(v, int) and 1 <= v <= 200
+        }
+
     def load_config(self) -> dict[str, Any]:
         return copy.deepcopy(self._ensure_cache())
 
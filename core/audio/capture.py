@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+import sounddevice as sd
+
+from core.audio.ring_buffer import RingBuffer
+from core.exceptions import AudioRecordingError
+from core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_RING_SECONDS = 10
+_POLL_S = 0.02
+# How long detach() waits for audio captured before it to be handed over.
+_DETACH_TIMEOUT_S = 1.0
+
+_SAMPLE_WIDTHS = {"int16": 2, "int32": 4, "float32": 4}
+
+
+class WarmCapture:
+    """An input stream kept open between recordings, with a pre-roll.
+
+    Opening a PortAudio stream takes long enough to clip the first word after
+    the hotkey. This keeps one stream running instead: its callback copies
+    blocks into a RingBuffer and a feeder thread drains them. While nothing
+    is attached the newest `pre_roll_ms` of audio is kept; attach(sink) hands
+    the sink that pre-roll and then every new block, so a recording starts at
+    once and includes what was said just before the key press. After
+    `idle_timeout_s` with nothing attached the stream is closed (0 keeps it
+    open) and the next attach() reopens it.
+    """
+
+    def __init__(
+        self,
+        samplerate: int,
+        channels: int,
+        dtype: str,
+        device: int | None = None,
+        latency: str = "high",
+        pre_roll_ms: int = 1500,
+        idle_timeout_s: float = 300.0,
+    ) -> None:
+        self.samplerate = samplerate
+        self.channels = channels
+        self.dtype = dtype
+        self.device = device
+        self.latency = latency
+        self.frame_bytes = channels * _SAMPLE_WIDTHS.get(dtype, 2)
+        self.pre_roll_bytes = samplerate * max(0, pre_roll_ms) // 1000 * self.frame_bytes
+        self.idle_timeout_s = idle_timeout_s
+
+        self._lock = threading.Lock()
+        self._stream: Optional[sd.RawInputStream] = None
+        self._ring: Optional[RingBuffer] = None
+        self._stop_feeder: Optional[threading.Event] = None
+        self._pre_roll: deque[bytes] = deque()
+        self._pre_roll_size = 0
+        self._sink: Optional[Callable[[bytes], None]] = None
+        self._detach_at: Optional[int] = None
+        self._detached = threading.Event()
+        self._idle_since = time.monotonic()
+        self.overflow_count = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self._stream is not None
+
+    def open(self) -> None:
+        with self._lock:
+            if self._stream is not None:
+                return
+            ring = RingBuffer(self.samplerate * self.frame_bytes * _RING_SECONDS)
+            try:
+                stream = sd.RawInputStream(
+                    device=self.device,
+                    samplerate=self.samplerate,
+                    channels=self.channels,
+                    dtype=self.dtype,
+                    latency=self.latency,
+                    callback=self._make_callback(ring),
+                )
+                stream.start()
+            except Exception as e:
+                logger.error(f"Failed to open warm capture stream: {e}")
+                raise AudioRecordingError(f"Audio device error: {e}") from e
+            self._stream = stream
+            self._ring = ring
+            self._pre_roll.clear()
+            self._pre_roll_size = 0
+            self._idle_since = time.monotonic()
+            # Each stream gets its own feeder and stop event, so a feeder
+            # that is still winding down can never touch the next ring.
+            self._stop_feeder = threading.Event()
+            threading.Thread(
+                target=self._feed_loop,
+                args=(ring, self._stop_feeder),
+                name="WarmCapture",
+                daemon=True,
+            ).start()
+        logger.info(
+            f"Warm capture stream open ({self.samplerate} Hz, {self.channels} ch, "
+            f"{self.pre_roll_bytes // self.frame_bytes} frames pre-roll)"
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            stream = self._release()
+        self._close_stream(stream)
+
+    def attach(self, sink: Callable[[bytes], None]) -> None:
+        """Deliver audio to `sink` on the feeder thread, starting with the
+        pre-roll. Opens the stream if it was released."""
+        self.open()
+        with self._lock:
+            self._detached.clear()
+            self._detach_at = None
+            self._sink = sink
+            # Still under the lock, so no live block can overtake the pre-roll.
+            while self._pre_roll:
+                sink(self._pre_roll.popleft())
+            self._pre_roll_size = 0
+
+    def detach(self) -> None:
+        """Stop delivering once everything captured until now is delivered."""
+        with self._lock:
+            if self._sink is None or self._ring is None:
+                return
+            self._detach_at = self._ring.written
+        if not self._detached.wait(_DETACH_TIMEOUT_S):
+            logger.warning("Warm capture did not catch up; the recording tail may be cut")
+        with self._lock:
+            self._sink = None
+            self._detach_at = None
+            self._idle_since = time.monotonic()
+
+    def _make_callback(self, ring: RingBuffer):
+        def callback(indata, frames, time_info, status) -> None:
+            # Realtime thread: one copy into the ring, nothing else.
+            if status or not ring.write(indata):
+                self.overflow_count += 1
+        return callback
+
+    def _feed_loop(self, ring: RingBuffer, stop: threading.Event) -> None:
+        while not stop.is_set():
+            views = ring.peek()
+            stream = None
+            with self._lock:
+                if stop.is_set():
+                    return
+                for view in views:
+                    if self._sink is not None:
+                        self._sink(view)
+                    else:
+                        self._keep(view)
+                ring.advance(sum(view.size for view in views))
+                if self._detach_at is not None and ring.consumed >= self._detach_at:
+                    self._detached.set()
+                if (
+                    self._sink is None
+                    and self.idle_timeout_s > 0
+                    and time.monotonic() - self._idle_since > self.idle_timeout_s
+                ):
+                    logger.info("Warm capture idle; releasing the input device")
+                    stream = self._release()
+            if stream is not None:
+                self._close_stream(stream)
+                return
+            if not views:
+                stop.wait(_POLL_S)
+
+    def _keep(self, view) -> None:
+        if self.pre_roll_bytes <= 0:
+            return
+        block = view.tobytes()
+        self._pre_roll.append(block)
+        self._pre_roll_size += len(block)
+        while self._pre_roll_size - len(self._pre_roll[0]) >= self.pre_roll_bytes:
+            self._pre_roll_size -= len(self._pre_roll.popleft())
+
+    def _release(self) -> Optional[sd.RawInputStream]:
+        # Caller holds the lock; the stream is closed outside it.
+        stream, self._stream = self._stream, None
+        if self._stop_feeder is not None:
+            self._stop_feeder.set()
+        self._stop_feeder = None
+        self._ring = None
+        self._sink = None
+        self._detached.set()
+        self._pre_roll.clear()
+        self._pre_roll_size = 0
+        return stream
+
+    def _close_stream(self, stream: Optional[sd.RawInputStream]) -> None:
+        if stream is None:
+            return
+        try:
+            stream.stop()
+            stream.close()
+        except Exception as e:
+            logger.warning(f"Error closing warm capture stream: {e}")
+        logger.info("Warm capture stream closed")
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import io
+import subprocess
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+SAMPLE_RATE = 16000
+
+
+def _read_wav_if_native(path: Path, sr: int) -> bytes | None:
+    """Return the PCM frames of a WAV that is already 16-bit mono at `sr`."""
+    try:
+        with wave.open(str(path), "rb") as wf:
+            if (
+                wf.getframerate() != sr
+                or wf.getnchannels() != 1
+                or wf.getsampwidth() != 2
+            ):
+                return None
+            return wf.readframes(wf.getnframes())
+    except (wave.Error, EOFError, OSError):
+        return None
+
+
+def decode_to_pcm16(path: str | Path, sr: int = SAMPLE_RATE) -> bytes:
+    """Decode any container ffmpeg understands to 16-bit mono PCM at `sr`.
+
+    Mirrors what whisper_s2t does internally, but pipes the samples back
+    instead of round-tripping through a temp WAV, and passes the path as a
+    single argv entry so names with spaces survive.
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".wav":
+        frames = _read_wav_if_native(path, sr)
+        if frames is not None:
+            return frames
+
+    cmd = [
+        "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error",
+        "-threads", "1", "-i", str(path),
+        "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1", "-ar", str(sr), "-",
+    ]
+    proc = subprocess.run(cmd, capture_output=True, check=False)
+    if proc.returncode != 0:
+        err = proc.stderr.decode("utf-8", errors="replace").strip()
+        raise RuntimeError(f"ffmpeg failed to decode {path.name}: {err}")
+    return proc.stdout
+
+
+def decode_bytes_with_pyav(data: bytes, sr: int = SAMPLE_RATE) -> bytes | None:
+    """Decode an in-memory container to 16-bit mono PCM at `sr` with PyAV.
+
+    Returns None when PyAV is not installed or cannot read the payload, in
+    which case the caller has to fall back to a file-based decoder.
+    """
+    try:
+        import av
+    except ImportError:
+        return None
+
+    chunks: list[bytes] = []
+    try:
+        with av.open(io.BytesIO(data)) as container:
+            resampler = av.AudioResampler(format="s16", layout="mono", rate=sr)
+            for frame in container.decode(audio=0):
+                for out in resampler.resample(frame):
+                    chunks.append(out.to_ndarray().tobytes())
+            for out in resampler.resample(None):
+                chunks.append(out.to_ndarray().tobytes())
+    except Exception as e:
+        logger.debug(f"PyAV could not decode in-memory audio: {e}")
+        return None
+    return b"".join(chunks)
+
+
+def pcm_to_float_mono(data: bytes, dtype: str = "int16", channels: int = 1) -> np.ndarray:
+    """Interleaved raw PCM as captured by sounddevice -> mono float32 in [-1, 1]."""
+    audio = np.frombuffer(data, dtype=np.dtype(dtype))
+    if np.issubdtype(audio.dtype, np.integer):
+        audio = audio.astype(np.float32) / float(-np.iinfo(audio.dtype).min)
+    else:
+        audio = audio.astype(np.float32, copy=False)
+    if channels > 1:
+        audio = audio[: audio.size - audio.size % channels].reshape(-1, channels).mean(axis=1)
+    return audio
+
+
+def float_to_pcm16(audio: np.ndarray) -> bytes:
+    pcm = np.clip(audio, -1.0, 1.0)
+    return (pcm * 32767.0).astype(np.int16).tobytes()
+
+
+def wav_bytes(pcm16: bytes, sr: int = SAMPLE_RATE) -> bytes:
+    """Wrap 16-bit mono PCM in a WAV header, entirely in memory."""
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sr)
+        wf.writeframes(pcm16)
+    return buf.getvalue()
+
+
+def model_input(source: str | Path | bytes):
+    """Turn a path or in-memory WAV into something transcribe_with_vad accepts.
+
+    whisper_s2t's loader opens its inputs with wave.open() and only falls back
+    to ffmpeg when that fails or the audio is not 16 kHz mono, so a BytesIO
+    holding a 16 kHz mono WAV is consumed directly with no decode or resample.
+    A fresh BytesIO is returned on every call because the loader reads it to
+    the end.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    return str(source)
+
+
+def probe_duration(path: str | Path) -> float | None:
+    """Read an input's duration from its container header without decoding.
+
+    WAV headers are parsed with the wave module; everything else goes through
+    PyAV when it is installed and ffprobe otherwise. Returns None when the
+    duration cannot be determined.
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".wav":
+        try:
+            with wave.open(str(path), "rb") as wf:
+                rate = wf.getframerate()
+                if rate > 0:
+                    return wf.getnframes() / float(rate)
+        except (wave.Error, EOFError, OSError):
+            pass
+
+    try:
+        import av
+    except ImportError:
+        av = None
+
+    if av is not None:
+        try:
+            with av.open(str(path)) as container:
+                if container.duration:
+                    return container.duration / float(av.time_base)
+                for stream in container.streams.audio:
+                    if stream.duration and stream.time_base:
+                        return float(stream.duration * stream.time_base)
+        except Exception as e:
+            logger.debug(f"PyAV could not probe {path.name}: {e}")
+        return None
+
+    cmd = [
+        "ffprobe", "-v", "error", "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1", str(path),
+    ]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, check=False, timeout=30)
+        return float(proc.stdout.decode("ascii", errors="ignore").strip())
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        return None
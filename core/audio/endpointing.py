@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+@dataclass
+class Utterance:
+    """A stretch of speech; `start` is seconds from the start of the stream."""
+
+    start: float
+    audio: np.ndarray
+    sample_rate: int = SAMPLE_RATE
+
+    @property
+    def end(self) -> float:
+        return self.start + len(self.audio) / float(self.sample_rate)
+
+
+class EnergyEndpointer:
+    """Split a live mono float stream into utterances by frame energy.
+
+    A frame counts as speech when its level is `margin_db` above a running
+    noise-floor estimate (and above `floor_db` dBFS). An utterance opens after
+    `min_speech_ms` of speech, carries `pre_roll_ms` of audio from before the
+    onset so soft word starts are kept, and closes after `min_silence_ms` of
+    non-speech or once it reaches `max_utterance_s` (Whisper sees at most 30 s
+    per window). Cheap enough to run per connection or per microphone.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        frame_ms: int = 30,
+        margin_db: float = 10.0,
+        floor_db: float = -50.0,
+        min_speech_ms: int = 120,
+        min_silence_ms: int = 600,
+        max_utterance_s: float = 25.0,
+        pre_roll_ms: int = 300,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.frame_len = max(1, sample_rate * frame_ms // 1000)
+        self.margin_db = margin_db
+        self.floor_db = floor_db
+        self._min_speech = max(1, min_speech_ms // frame_ms)
+        self._min_silence = max(1, min_silence_ms // frame_ms)
+        self._max_frames = max(1, int(max_utterance_s * 1000) // frame_ms)
+        self._pre_roll: deque[np.ndarray] = deque(maxlen=max(1, pre_roll_ms // frame_ms))
+
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._frames_seen = 0
+        self._noise_db = floor_db - margin_db
+        self._speech_run = 0
+        self._silence_run = 0
+        self._open: Optional[list[np.ndarray]] = None
+        self._open_start = 0
+
+    @property
+    def in_speech(self) -> bool:
+        return self._open is not None
+
+    def current(self) -> Optional[Utterance]:
+        """The utterance still being spoken, or None between utterances."""
+        if self._open is None:
+            return None
+        return self._make(self._open, self._open_start)
+
+    def _make(self, frames: list[np.ndarray], first_frame: int) -> Utterance:
+        return Utterance(
+            start=first_frame * self.frame_len / float(self.sample_rate),
+            audio=np.concatenate(frames) if frames else np.zeros(0, np.float32),
+            sample_rate=self.sample_rate,
+        )
+
+    def _close(self) -> Utterance:
+        utt = self._make(self._open, self._open_start)
+        self._open = None
+        self._speech_run = 0
+        self._silence_run = 0
+        return utt
+
+    def feed(self, audio: np.ndarray) -> list[Utterance]:
+        """Consume more samples; returns utterances that closed on the way."""
+        audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+        if self._pending.size:
+            audio = np.concatenate((self._pending, audio))
+        n = audio.size // self.frame_len
+        self._pending = audio[n * self.frame_len:].copy()
+        if n == 0:
+            return []
+
+        frames = audio[:n * self.frame_len].reshape(n, self.frame_len)
+        rms = np.sqrt(np.mean(frames * frames, axis=1) + 1e-12)
+        levels = 20.0 * np.log10(rms)
+
+        closed: list[Utterance] = []
+        for frame, level in zip(frames, levels):
+            index = self._frames_seen
+            self._frames_seen += 1
+            speech = level > max(self._noise_db + self.margin_db, self.floor_db)
+
+            if self._open is None:
+                if not speech:
+                    # Track the noise floor only between utterances; fall fast
+                    # and rise slowly so a loud room is learned but speech is not.
+                    rate = 0.2 if level < self._noise_db else 0.02
+                    self._noise_db += rate * (level - self._noise_db)
+                    self._speech_run = 0
+                    self._pre_roll.append(frame)
+                    continue
+                self._speech_run += 1
+                self._pre_roll.append(frame)
+                if self._speech_run >= self._min_speech:
+                    self._open = list(self._pre_roll)
+                    self._open_start = index + 1 - len(self._open)
+                    self._pre_roll.clear()
+                    self._silence_run = 0
+                continue
+
+            self._open.append(frame)
+            self._silence_run = 0 if speech else self._silence_run + 1
+            if self._silence_run >= self._min_silence or len(self._open) >= self._max_frames:
+                closed.append(self._close())
+        return closed
+
+    def flush(self) -> Optional[Utterance]:
+        """End of stream: close and return any open utterance."""
+        if self._open is None:
+            return None
+        if self._pending.size:
+            self._open.append(self._pending)
+            self._pending = np.zeros(0, dtype=np.float32)
+        return self._close()
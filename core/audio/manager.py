@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 import numpy as np
 from PySide6.QtCore import QObject, Signal, Slot
 
+from core.audio.capture import WarmCapture
+from core.audio.decoding import SAMPLE_RATE
 from core.audio.recording import RecordingThread
 from core.logging_config import get_logger
 from core.temp_file_manager import temp_file_manager
@@ -19,12 +21,30 @@ class AudioManager(QObject):
     audio_ready = Signal(str)
     audio_error = Signal(str)
 
-    def __init__(self, samplerate: int = 44_100, channels: int = 1, dtype: str = "int16", device_id: int | None = None):
+    def __init__(
+        self,
+        samplerate: int = 44_100,
+        channels: int = 1,
+        dtype: str = "int16",
+        device_id: int | None = None,
+        capture_resample: bool = False,
+        always_warm: bool = False,
+        preroll_ms: int = 1500,
+        idle_timeout_s: int = 300,
+    ):
         super().__init__()
         self.samplerate = samplerate
         self.channels = channels
         self.dtype = dtype
         self.device_id = device_id
+        # Store recordings as 16 kHz mono, converted while recording.
+        self.capture_resample = capture_resample
+        # Keep the input stream open between recordings so a recording
+        # starts at once and includes the last `preroll_ms` before it.
+        self.always_warm = always_warm
+        self.preroll_ms = preroll_ms
+        self.idle_timeout_s = idle_timeout_s
+        self._warm_capture: Optional[WarmCapture] = None
         self._recording_thread: Optional[RecordingThread] = None
         self._current_temp_file: Optional[Path] = None
 
@@ -33,8 +53,40 @@ class AudioManager(QObject):
         self.samplerate = samplerate
         self.channels = channels
         self.dtype = dtype
+        if self._warm_capture is not None:
+            self._warm_capture.close()
+            self._warm_capture = None
+            self.prewarm()
+
+    def prewarm(self) -> None:
+        """Open the warm capture stream now rather than on the first
+        recording. A no-op unless always_warm is set."""
+        if not self.always_warm:
+            return
+        try:
+            self._get_warm_capture().open()
+        except Exception as e:
+            logger.warning(f"Could not open warm capture stream: {e}")
+
+    def _get_warm_capture(self) -> WarmCapture:
+        if self._warm_capture is None:
+            self._warm_capture = WarmCapture(
+                self.samplerate,
+                self.channels,
+                self.dtype,
+                device=self.device_id,
+                pre_roll_ms=self.preroll_ms,
+                idle_timeout_s=self.idle_timeout_s,
+            )
+        return self._warm_capture
+
+    def output_format(self) -> tuple[int, int, str]:
+        """(samplerate, channels, dtype) of what recordings are written as."""
+        if self.capture_resample:
+            return SAMPLE_RATE, 1, "int16"
+        return self.samplerate, self.channels, self.dtype
 
-    def start_recording(self) -> bool:
+    def start_recording(self, audio_tap: Callable[[bytes], None] | None = None) -> bool:
         if self._recording_thread and self._recording_thread.isRunning():
             logger.warning("Attempted to start recording while already recording")
             return False
@@ -49,6 +101,9 @@ class AudioManager(QObject):
                 channels=self.channels,
                 dtype=self.dtype,
                 device=self.device_id,
+                audio_tap=audio_tap,
+                resample_to=SAMPLE_RATE if self.capture_resample else None,
+                capture=self._get_warm_capture() if self.always_warm else None,
             )
             self._recording_thread.recording_error.connect(self._on_recording_error)
             self._recording_thread.recording_finished.connect(self._on_recording_finished)
@@ -109,6 +164,10 @@ class AudioManager(QObject):
         else:
             logger.info(f"[SHUTDOWN]   AM no recording thread running: {_time.perf_counter() - _t:.3f}s")
 
+        if self._warm_capture is not None:
+            self._warm_capture.close()
+            self._warm_capture = None
+
         if self._current_temp_file:
             temp_file_manager.release(self._current_temp_file)
             self._current_temp_file = None
@@ -1,21 +1,31 @@
 from __future__ import annotations
 
-import queue
 import threading
 import wave
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Iterator, Optional
+from typing import Callable, Iterator, Optional
 
 import numpy as np
 import sounddevice as sd
 from PySide6.QtCore import QThread, Signal
 
+from core.audio.capture import WarmCapture
+from core.audio.decoding import float_to_pcm16, pcm_to_float_mono
+from core.audio.resampling import StreamingResampler
+from core.audio.ring_buffer import RingBuffer
 from core.exceptions import AudioRecordingError
 from core.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Capture the writer thread may fall behind by before blocks are dropped.
+RING_SECONDS = 10
+# How long the writer sleeps when the ring is empty.
+_POLL_S = 0.02
+# 2048 int16 samples for the waveform display.
+_LATEST_BYTES = 4096
+
 
 class RecordingThread(QThread):
     update_status_signal = Signal(str)
@@ -30,6 +40,9 @@ class RecordingThread(QThread):
         dtype: str = "int16",
         latency: str = "high",
         device: int | None = None,
+        audio_tap: Callable[[bytes], None] | None = None,
+        resample_to: int | None = None,
+        capture: WarmCapture | None = None,
     ) -> None:
         super().__init__()
         self.output_path = Path(output_path)
@@ -38,18 +51,34 @@ class RecordingThread(QThread):
         self.dtype = dtype
         self.latency = latency
         self.device = device
-
-        self._audio_q: queue.Queue[bytes] = queue.Queue()
+        # Gets every block after it is written, on this thread (not the
+        # PortAudio callback), e.g. for live dictation. The block is a view
+        # into the ring and is only valid during the call.
+        self.audio_tap = audio_tap
+        # With resample_to, blocks are downmixed and resampled as they arrive
+        # and the WAV (and audio_tap) get mono int16 at that rate, which
+        # whisper_s2t reads as-is instead of decoding the file again.
+        self.resample_to = resample_to
+        self._resampler: Optional[StreamingResampler] = None
+        # With a WarmCapture the already-open stream (and its pre-roll) is
+        # used instead of opening one; samplerate etc. must match it.
+        self.capture = capture
+
+        # Allocated once per stream; the callback only copies into it.
+        self._ring: Optional[RingBuffer] = None
         self._overflow_count: int = 0
         self._stream_error: Optional[str] = None
         self._stop_event = threading.Event()
         self._cleanup_complete = threading.Event()
 
-        self._latest_samples = np.zeros(2048, dtype=np.int16)
-        self._samples_lock = threading.Lock()
-
     @contextmanager
     def _audio_stream(self) -> Iterator[sd.RawInputStream]:
+        frame_bytes = self.channels * self._sample_width_from_dtype(self.dtype)
+        self._ring = RingBuffer(self.samplerate * frame_bytes * RING_SECONDS)
+        if self.capture is not None:
+            with self._warm_stream(self.capture):
+                yield None
+            return
         try:
             stream = sd.RawInputStream(
                 device=self.device,
@@ -68,23 +97,46 @@ class RecordingThread(QThread):
             logger.error(f"Failed to create audio stream: {e}")
             raise AudioRecordingError(f"Failed to create audio stream: {e}") from e
 
+    @contextmanager
+    def _warm_stream(self, capture: WarmCapture) -> Iterator[None]:
+        overflows = capture.overflow_count
+        capture.attach(self._on_captured)
+        try:
+            yield
+        finally:
+            capture.detach()
+            self._overflow_count += capture.overflow_count - overflows
+
+    def _on_captured(self, block) -> None:
+        # Called on the capture's feeder thread; the ring has one producer.
+        if not self._ring.write(block):
+            self._overflow_count += 1
+
     def _audio_callback(self, indata, frames, time_info, status) -> None:
+        # Realtime thread: one copy into the preallocated ring, nothing else.
         if status:
-            msg = str(status)
-            self._stream_error = msg
+            self._stream_error = str(status)
             self._overflow_count += 1
-        try:
-            raw = bytes(indata)
-            self._audio_q.put_nowait(raw)
-            samples = np.frombuffer(raw, dtype=np.int16).copy()
-            with self._samples_lock:
-                self._latest_samples = samples
-        except queue.Full:
+        if not self._ring.write(indata):
             self._overflow_count += 1
 
     def get_latest_samples(self) -> np.ndarray:
-        with self._samples_lock:
-            return self._latest_samples.copy()
+        """The newest samples as int16, for display only: a view into the
+        ring that the callback keeps overwriting, so do not hold on to it."""
+        ring = self._ring
+        if ring is None:
+            return np.zeros(2048, dtype=np.int16)
+        data = ring.latest(_LATEST_BYTES)
+        return data[:data.size - data.size % 2].view(np.int16)
+
+    def _drain(self, wf: wave.Wave_write) -> bool:
+        views = self._ring.peek()
+        if not views:
+            return False
+        for view in views:
+            self._write(wf, view)
+        self._ring.advance(sum(view.size for view in views))
+        return True
 
     def run(self) -> None:
         self.update_status_signal.emit("Recording.")
@@ -92,24 +144,24 @@ class RecordingThread(QThread):
             self.output_path.parent.mkdir(parents=True, exist_ok=True)
 
             with wave.open(str(self.output_path), "wb") as wf:
-                wf.setnchannels(self.channels)
-                wf.setsampwidth(self._sample_width_from_dtype(self.dtype))
-                wf.setframerate(self.samplerate)
+                if self.resample_to:
+                    self._resampler = StreamingResampler(self.samplerate, self.resample_to)
+                    wf.setnchannels(1)
+                    wf.setsampwidth(2)
+                    wf.setframerate(self.resample_to)
+                else:
+                    wf.setnchannels(self.channels)
+                    wf.setsampwidth(self._sample_width_from_dtype(self.dtype))
+                    wf.setframerate(self.samplerate)
 
                 with self._audio_stream():
                     while not self._should_stop():
-                        try:
-                            chunk = self._audio_q.get(timeout=0.2)
-                            wf.writeframes(chunk)
-                        except queue.Empty:
-                            pass
-
-                    while True:
-                        try:
-                            chunk = self._audio_q.get_nowait()
-                            wf.writeframes(chunk)
-                        except queue.Empty:
-                            break
+                        if not self._drain(wf):
+                            self._stop_event.wait(_POLL_S)
+                # The stream is closed; write whatever the last callbacks left.
+                self._drain(wf)
+                if self._resampler is not None:
+                    self._emit(wf, float_to_pcm16(self._resampler.flush()))
 
             if self._overflow_count > 0:
                 logger.warning(
@@ -131,6 +183,23 @@ class RecordingThread(QThread):
         finally:
             self._cleanup_complete.set()
 
+    def _write(self, wf: wave.Wave_write, chunk) -> None:
+        if self._resampler is not None:
+            chunk = float_to_pcm16(
+                self._resampler.process(pcm_to_float_mono(chunk, self.dtype, self.channels))
+            )
+        self._emit(wf, chunk)
+
+    def _emit(self, wf: wave.Wave_write, chunk) -> None:
+        wf.writeframes(chunk)
+        if self.audio_tap is not None:
+            try:
+                self.audio_tap(chunk)
+            except Exception:
+                # A failing consumer must not cost the recording itself.
+                logger.exception("Audio tap failed; disabling it")
+                self.audio_tap = None
+
     def _should_stop(self) -> bool:
         return self._stop_event.is_set() or self.isInterruptionRequested()
 
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from math import gcd
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Kaiser-windowed sinc with the same shape as scipy.signal.resample_poly's
+# default: cutoff at the lower of the two Nyquist rates, 10 zero crossings
+# each side, beta 5.
+_ZERO_CROSSINGS = 10
+_KAISER_BETA = 5.0
+
+
+def _ratio(orig_sr: int, target_sr: int) -> tuple[int, int]:
+    if orig_sr <= 0 or target_sr <= 0:
+        raise ValueError(f"Invalid sample rate: {orig_sr} -> {target_sr}")
+    g = gcd(int(orig_sr), int(target_sr))
+    return int(target_sr) // g, int(orig_sr) // g
+
+
+@lru_cache(maxsize=16)
+def _polyphase_bank(up: int, down: int) -> tuple[np.ndarray, int]:
+    """Low-pass FIR for an up/down ratio, split into `up` phases.
+
+    Returns (bank, half_len). bank[p] holds the taps of phase p in reverse
+    order, so one output sample is the dot product of bank[p] with a window
+    of consecutive input samples. Cached because a server sees the same few
+    rates (44.1k, 48k, 8k) over and over.
+    """
+    max_rate = max(up, down)
+    half_len = _ZERO_CROSSINGS * max_rate
+    n = np.arange(2 * half_len + 1, dtype=np.float64)
+    h = np.sinc((n - half_len) / max_rate) * np.kaiser(2 * half_len + 1, _KAISER_BETA)
+    h *= up / h.sum()
+
+    taps = -(-h.size // up)
+    padded = np.zeros(taps * up, dtype=np.float64)
+    padded[:h.size] = h
+    bank = padded.reshape(taps, up).T[:, ::-1]
+    return np.ascontiguousarray(bank, dtype=np.float32), half_len
+
+
+class StreamingResampler:
+    """Polyphase resampler for audio that arrives in pieces.
+
+    Feeding a signal through process() in any chunking and then calling
+    flush() gives the same samples as resample() on the whole signal. Only
+    the last few dozen input samples are kept between calls.
+    """
+
+    def __init__(self, orig_sr: int, target_sr: int) -> None:
+        self.orig_sr = int(orig_sr)
+        self.target_sr = int(target_sr)
+        self.up, self.down = _ratio(self.orig_sr, self.target_sr)
+        self._bank, self._half_len = _polyphase_bank(self.up, self.down)
+        self._taps = self._bank.shape[1]
+        # Zero history stands in for the samples before the signal start.
+        self._buf = np.zeros(self._taps - 1, dtype=np.float32)
+        self._buf_start = -(self._taps - 1)
+        self._total_in = 0
+        self._next_out = 0
+
+    @property
+    def passthrough(self) -> bool:
+        return self.up == self.down
+
+    def _last_ready(self, available: int) -> int:
+        # Output n needs input index (n * down + half_len) // up.
+        return (available * self.up - 1 - self._half_len) // self.down
+
+    def _produce(self, last: int) -> np.ndarray:
+        count = last - self._next_out + 1
+        if count <= 0:
+            return np.zeros(0, dtype=np.float32)
+        out = np.empty(count, dtype=np.float32)
+        windows = sliding_window_view(self._buf, self._taps)
+        # Outputs n and n + up use the same phase and windows `down` input
+        # samples apart, so each phase is one strided matrix-vector product.
+        for i in range(min(count, self.up)):
+            pos = (self._next_out + i) * self.down + self._half_len
+            # Window b covers input b - taps + 1 .. b.
+            row = pos // self.up - self._taps + 1 - self._buf_start
+            m = (count - i + self.up - 1) // self.up
+            out[i::self.up] = (
+                windows[row:row + (m - 1) * self.down + 1:self.down]
+                @ self._bank[pos % self.up]
+            )
+        self._next_out = last + 1
+
+        keep_from = (self._next_out * self.down + self._half_len) // self.up
+        drop = keep_from - self._taps + 1 - self._buf_start
+        if drop > 0:
+            self._buf = self._buf[drop:]
+            self._buf_start += drop
+        return out
+
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        """Resample the next mono float chunk; returns every output sample
+        that is fully determined by the input seen so far."""
+        chunk = np.asarray(chunk, dtype=np.float32).reshape(-1)
+        if self.passthrough:
+            return chunk.copy()
+        if chunk.size:
+            self._buf = np.concatenate((self._buf, chunk))
+            self._total_in += chunk.size
+        return self._produce(self._last_ready(self._total_in))
+
+    def flush(self) -> np.ndarray:
+        """Emit the tail, treating the signal as ending with silence."""
+        if self.passthrough:
+            return np.zeros(0, dtype=np.float32)
+        expected = -(-self._total_in * self.up // self.down)
+        pad = self._half_len // self.up + self._taps + 1
+        self._buf = np.concatenate((self._buf, np.zeros(pad, dtype=np.float32)))
+        return self._produce(expected - 1)
+
+
+def resample(
+    audio: np.ndarray, orig_sr: int, target_sr: int, chunk_size: int = 1 << 16
+) -> np.ndarray:
+    """Resample mono float audio from `orig_sr` to `target_sr`.
+
+    Works through the input `chunk_size` samples at a time into one
+    preallocated output, so the only full-length allocation is the result.
+    """
+    audio = np.asarray(audio).reshape(-1)
+    if int(orig_sr) == int(target_sr):
+        return audio.astype(np.float32, copy=False)
+    up, down = _ratio(orig_sr, target_sr)
+    out = np.empty(-(-audio.size * up // down), dtype=np.float32)
+    rs = StreamingResampler(orig_sr, target_sr)
+    pos = 0
+    for start in range(0, audio.size, chunk_size):
+        piece = rs.process(audio[start:start + chunk_size])
+        out[pos:pos + piece.size] = piece
+        pos += piece.size
+    tail = rs.flush()
+    out[pos:pos + tail.size] = tail
+    return out
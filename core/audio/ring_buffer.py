@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+class RingBuffer:
+    """Preallocated single-producer / single-consumer byte ring.
+
+    Built for the PortAudio callback: write() is one copy into memory that
+    already exists, with no lock, queue node or new buffer. The consumer
+    reads what is pending as at most two views into the ring (peek) and then
+    releases it (advance). Safe without locks for exactly one writer thread
+    and one reader thread: each side only moves its own counter, and moves it
+    after the bytes are copied or consumed. latest() may be called from a
+    third thread for display; it can see a block that is being overwritten.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity <= 0:
+            raise ValueError(f"Invalid ring capacity: {capacity}")
+        self.capacity = int(capacity)
+        self._buf = np.zeros(self.capacity, dtype=np.uint8)
+        # Total bytes ever written / consumed; the difference is pending.
+        self._written = 0
+        self._read = 0
+
+    @property
+    def written(self) -> int:
+        """Total bytes ever written."""
+        return self._written
+
+    @property
+    def consumed(self) -> int:
+        """Total bytes ever released by advance()."""
+        return self._read
+
+    def readable(self) -> int:
+        return self._written - self._read
+
+    def write(self, data) -> bool:
+        """Producer: copy a bytes-like block in; False (nothing written) if it
+        does not fit because the consumer has fallen behind."""
+        src = np.frombuffer(data, dtype=np.uint8)
+        n = src.size
+        if n > self.capacity - (self._written - self._read):
+            return False
+        start = self._written % self.capacity
+        first = min(n, self.capacity - start)
+        self._buf[start:start + first] = src[:first]
+        if first < n:
+            self._buf[:n - first] = src[first:]
+        self._written += n
+        return True
+
+    def peek(self, max_bytes: int | None = None) -> list[np.ndarray]:
+        """Consumer: views of the pending bytes, oldest first (two when they
+        wrap). Valid until advance() releases them."""
+        n = self._written - self._read
+        if max_bytes is not None:
+            n = min(n, max_bytes)
+        if n <= 0:
+            return []
+        start = self._read % self.capacity
+        first = min(n, self.capacity - start)
+        views = [self._buf[start:start + first]]
+        if first < n:
+            views.append(self._buf[:n - first])
+        return views
+
+    def advance(self, n: int) -> None:
+        """Consumer: release `n` bytes returned by peek()."""
+        self._read += min(n, self._written - self._read)
+
+    def latest(self, nbytes: int) -> np.ndarray:
+        """The most recent `nbytes` written, consumed or not. A view unless
+        they wrap around the end of the ring."""
+        n = min(nbytes, self._written, self.capacity)
+        end = self._written % self.capacity
+        if n <= end:
+            return self._buf[end - n:end]
+        return np.concatenate((self._buf[self.capacity - (n - end):], self._buf[:end]))
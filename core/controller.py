@@ -9,9 +9,20 @@ from config.manager import config_manager
 from core.audio.device_utils import get_optimal_audio_settings
 from core.audio.manager import AudioManager
 from core.logging_config import get_logger
+from core.models.loader import check_model_cached, get_repo_id
 from core.models.manager import ModelManager
+from core.models.metadata import ModelMetadata
 from core.temp_file_manager import temp_file_manager
+from core.transcription.cache import (
+    CACHE_FILE,
+    CacheScope,
+    model_beam_size,
+    open_transcription_cache,
+)
+from core.transcription.dictation import DictationSession
 from core.transcription.service import TranscriptionService
+from core.transcription.workers import WorkerModelSpec
+from utils import get_resource_path
 
 logger = get_logger(__name__)
 
@@ -48,10 +59,18 @@ class TranscriberController(QObject):
             f"Audio settings: {samplerate} Hz, {channels} ch, {dtype}, device={audio_device_id}"
         )
 
-        self.model_manager = model_manager or ModelManager()
+        self.model_manager = model_manager or ModelManager(
+            pool_budget_mb=config_manager.get_value("model_pool_budget_mb", 0),
+            freshness_ttl_hours=config_manager.get_value("model_freshness_ttl_hours", 24),
+        )
         self.audio_manager = audio_manager or AudioManager(
-            samplerate, channels, dtype, device_id=audio_device_id
+            samplerate, channels, dtype, device_id=audio_device_id,
+            capture_resample=config_manager.get_value("capture_resample_16k", False),
+            always_warm=config_manager.get_value("capture_always_warm", False),
+            preroll_ms=config_manager.get_value("capture_preroll_ms", 1500),
+            idle_timeout_s=config_manager.get_value("capture_idle_timeout_s", 300),
         )
+        self.audio_manager.prewarm()
 
         task_mode = config_manager.get_value("task_mode", "transcribe")
         language = config_manager.get_value("language", "en")
@@ -66,11 +85,47 @@ class TranscriberController(QObject):
             self._get_current_model_version
         )
 
+        self.transcription_cache = None
+        if config_manager.get_value("transcription_cache_enabled", True):
+            self.transcription_cache = open_transcription_cache(
+                get_resource_path(CACHE_FILE),
+                config_manager.get_value("transcription_cache_max_mb", 512),
+            )
+        self.transcription_service.set_cache(self.transcription_cache)
+
         self._batch_processor = None
+        self._batch_model_key = ""
+        self._dictation: DictationSession | None = None
+        # Model each running GUI job uses, leased so the pool cannot free it
+        # (or count its memory as free) until the job ends.
+        self._model_leases: dict[str, object] = {}
 
         self._connect_signals()
         logger.info("TranscriberController initialized")
 
+    def _cache_scope(self, model) -> CacheScope | None:
+        if self.transcription_cache is None:
+            return None
+        settings = self.model_manager.get_current_settings()
+        if not settings:
+            return None
+        return CacheScope(
+            model_key=ModelMetadata.resolve_model_key(
+                settings["model_name"], settings["precision"]
+            ),
+            beam_size=model_beam_size(model, config_manager.get_value("beam_size", 1)),
+        )
+
+    def _hold_model(self, job: str, model) -> None:
+        self._drop_model(job)
+        self.model_manager.acquire_model(model)
+        self._model_leases[job] = model
+
+    def _drop_model(self, job: str) -> None:
+        model = self._model_leases.pop(job, None)
+        if model is not None:
+            self.model_manager.release_model(model)
+
     def _get_current_model_version(self) -> str | None:
         _, version = self.model_manager.get_model()
         return version
@@ -128,15 +183,65 @@ class TranscriberController(QObject):
         self.model_manager.cancel_loading()
 
     def start_recording(self) -> bool:
-        if not self.audio_manager.start_recording():
+        if self._dictation is not None:
+            if self._dictation.finishing:
+                self.update_button_signal.emit("Still transcribing...")
+                return False
+            # The last recording failed before it finished; drop its session.
+            self._dictation.cancel()
+            self._dictation = None
+            self._drop_model("dictation")
+
+        session = self._start_dictation()
+        if not self.audio_manager.start_recording(
+            audio_tap=session.feed if session is not None else None
+        ):
+            if session is not None:
+                session.cancel()
+                self._dictation = None
+                self._drop_model("dictation")
             self.update_button_signal.emit("Already recording")
             return False
         return True
 
+    def _start_dictation(self) -> DictationSession | None:
+        """With live_dictation on, a session that transcribes the recording
+        pause by pause while it is made, so only the tail is left at stop."""
+        if not config_manager.get_value("live_dictation", False):
+            return None
+        model, _ = self.model_manager.get_model()
+        if not model:
+            return None
+        samplerate, channels, dtype = self.audio_manager.output_format()
+        session = DictationSession(
+            model,
+            samplerate,
+            channels,
+            dtype,
+            language=self.transcription_service.language,
+            task_mode=self.transcription_service.task_mode,
+            curate=self.transcription_service.curate_enabled,
+        )
+        session.text_ready.connect(self._on_dictation_text)
+        session.error_occurred.connect(self._on_dictation_error)
+        self._dictation = session
+        self._hold_model("dictation", model)
+        return session
+
+    def is_dictating(self) -> bool:
+        """True from the start of a live dictation until its last text is out."""
+        return self._dictation is not None
+
     def stop_recording(self) -> None:
         self.audio_manager.stop_recording()
 
     def cancel_transcription(self) -> bool:
+        if self._dictation is not None and self._dictation.finishing:
+            self._dictation.cancel()
+            self._dictation = None
+            self._drop_model("dictation")
+            self._on_transcription_cancelled()
+            return True
         if self.transcription_service.cancel_transcription():
             self.update_button_signal.emit("Cancelling...")
             return True
@@ -158,6 +263,7 @@ class TranscriberController(QObject):
             self.update_button_signal.emit(
                 f"Transcribing {Path(file_path).name}..."
             )
+            self._hold_model("transcription", model)
             self.transcription_service.transcribe_file(
                 model,
                 model_version,
@@ -166,6 +272,7 @@ class TranscriberController(QObject):
                 batch_size=batch_size,
                 language=language,
                 task_mode=task_mode,
+                cache_scope=self._cache_scope(model),
             )
         else:
             self.error_occurred.emit(
@@ -188,6 +295,18 @@ class TranscriberController(QObject):
             self.batch_error.emit("No model is loaded to process audio")
             return
 
+        settings = self.model_manager.get_current_settings()
+        self._batch_model_key = ModelMetadata.resolve_model_key(
+            settings.get("model_name", ""), settings.get("precision", "")
+        )
+        remembered = config_manager.get_value("stable_batch_sizes", {}).get(
+            self._batch_model_key
+        )
+        cpu_workers = config_manager.get_value("batch_cpu_workers", 1)
+        worker_spec = None
+        if cpu_workers > 1 and settings.get("device_type") == "cpu":
+            worker_spec = self._worker_spec(settings)
+
         self._batch_processor = BatchProcessor(
             files=files,
             model=model,
@@ -196,12 +315,41 @@ class TranscriberController(QObject):
             batch_size=batch_size,
             language=language,
             task_mode=task_mode,
+            files_per_group=config_manager.get_value("batch_files_per_group", 8),
+            prefetch_files=config_manager.get_value("batch_prefetch_files", 8),
+            resume=config_manager.get_value("batch_resume", True),
+            schedule=config_manager.get_value("batch_schedule", "path"),
+            adaptive_batch=config_manager.get_value("batch_adaptive", True),
+            remembered_batch_size=remembered,
+            worker_spec=worker_spec,
+            cpu_workers=cpu_workers,
+            cache=self.transcription_cache,
+            cache_scope=self._cache_scope(model),
         )
         self._batch_processor.progress.connect(self._on_batch_progress)
         self._batch_processor.finished.connect(self._on_batch_completed)
         self._batch_processor.error.connect(self._on_batch_error)
+        self._hold_model("batch", model)
         self._batch_processor.start()
 
+    def _worker_spec(self, settings: dict) -> WorkerModelSpec | None:
+        # Workers load from the same local snapshot the GUI model came from,
+        # so they never hit the network.
+        try:
+            local_path = check_model_cached(
+                get_repo_id(settings["model_name"], settings["precision"])
+            )
+        except Exception as e:
+            logger.warning(f"CPU workers disabled, model files not resolved: {e}")
+            return None
+        return WorkerModelSpec(
+            model_name=settings["model_name"],
+            precision=settings["precision"],
+            device="cpu",
+            beam_size=config_manager.get_value("beam_size", 1),
+            local_path=local_path,
+        )
+
     def stop_batch_processing(self) -> None:
         if self._batch_processor:
             self._batch_processor.request_stop()
@@ -222,8 +370,25 @@ class TranscriberController(QObject):
         # reassigns the field once run() has provably returned, and
         # is_batch_processing() guards on isRunning(), so a retained finished
         # thread reports not-busy.
+        self._drop_model("batch")
+        self._remember_batch_size()
         self.batch_completed.emit(message)
 
+    def _remember_batch_size(self) -> None:
+        adaptive = self._batch_processor.adaptive if self._batch_processor else None
+        if adaptive is None:
+            return
+        size = adaptive.to_remember()
+        if size is None:
+            return
+        logger.info(f"Remembering batch size {size} for {self._batch_model_key}")
+        try:
+            config_manager.set_value(
+                "stable_batch_sizes", {self._batch_model_key: size}
+            )
+        except Exception as e:
+            logger.warning(f"Failed to save stable batch size: {e}")
+
     @Slot(str)
     def _on_batch_error(self, message: str) -> None:
         self.batch_error.emit(message)
@@ -267,8 +432,16 @@ class TranscriberController(QObject):
 
     @Slot(str)
     def _on_audio_ready(self, audio_file: str) -> None:
+        if self._dictation is not None:
+            # Everything but the tail has been transcribed already.
+            temp_file_manager.release(Path(audio_file))
+            self.update_button_signal.emit("Transcribing...")
+            self._dictation.finish()
+            return
+
         model, model_version = self.model_manager.get_model()
         if model and model_version:
+            self._hold_model("transcription", model)
             self.transcription_service.transcribe_file(
                 model,
                 model_version,
@@ -283,6 +456,23 @@ class TranscriberController(QObject):
                 "Audio Error", "No model is loaded to process audio"
             )
 
+    @Slot(str, bool)
+    def _on_dictation_text(self, text: str, final: bool) -> None:
+        if self.sender() is not self._dictation:
+            return
+        if final:
+            self._dictation = None
+            self._drop_model("dictation")
+        self.text_ready_signal.emit(text)
+        if final:
+            self.update_button_signal.emit("Click to Record")
+            self.enable_widgets_signal.emit(True)
+
+    @Slot(str)
+    def _on_dictation_error(self, error: str) -> None:
+        logger.error(f"Dictation error: {error}")
+        self.error_occurred.emit("Transcription Error", error)
+
     @Slot(str)
     def _on_audio_error(self, error: str) -> None:
         logger.error(f"Audio error: {error}")
@@ -300,6 +490,7 @@ class TranscriberController(QObject):
 
     @Slot(str)
     def _on_transcription_completed(self, text: str) -> None:
+        self._drop_model("transcription")
         self.text_ready_signal.emit(text)
         self.update_button_signal.emit("Click to Record")
         self.enable_widgets_signal.emit(True)
@@ -311,12 +502,14 @@ class TranscriberController(QObject):
     @Slot(str)
     def _on_transcription_error(self, error: str) -> None:
         logger.error(f"Transcription error: {error}")
+        self._drop_model("transcription")
         self.update_button_signal.emit("Transcription Failed---Click to Record")
         self.enable_widgets_signal.emit(True)
         self.error_occurred.emit("Transcription Error", error)
 
     @Slot()
     def _on_transcription_cancelled(self) -> None:
+        self._drop_model("transcription")
         self.update_button_signal.emit("Click to Record")
         self.enable_widgets_signal.emit(True)
         self.transcription_cancelled_signal.emit()
@@ -335,6 +528,11 @@ class TranscriberController(QObject):
         self.model_manager.cancel_loading()
         logger.info(f"[SHUTDOWN] model_manager.cancel_loading(): {_time.perf_counter() - _t:.3f}s")
 
+        if self._dictation is not None:
+            self._dictation.cancel()
+            self._dictation = None
+            self._drop_model("dictation")
+
         _t = _time.perf_counter()
         self.transcription_service.cancel_transcription()
         logger.info(f"[SHUTDOWN] transcription_service.cancel_transcription(): {_time.perf_counter() - _t:.3f}s")
@@ -347,6 +545,9 @@ class TranscriberController(QObject):
         self.transcription_service.cleanup()
         logger.info(f"[SHUTDOWN] transcription_service.cleanup(): {_time.perf_counter() - _t:.3f}s")
 
+        for job in list(self._model_leases):
+            self._drop_model(job)
+
         _t = _time.perf_counter()
         self.model_manager.cleanup()
         logger.info(f"[SHUTDOWN] model_manager.cleanup(): {_time.perf_counter() - _t:.3f}s")
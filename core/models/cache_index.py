@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from core.logging_config import get_logger
+from utils import get_resource_path
+
+logger = get_logger(__name__)
+
+INDEX_FILE = "cache/model_index.json"
+
+
+def _stat_files(root: Path) -> dict[str, list[int]]:
+    """relative path -> [size, mtime_ns] for every file under a snapshot.
+    stat() follows the HF cache's symlinks, so these describe the blobs."""
+    files: dict[str, list[int]] = {}
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            full = Path(dirpath) / name
+            try:
+                st = full.stat()
+            except OSError:
+                continue
+            files[full.relative_to(root).as_posix()] = [st.st_size, st.st_mtime_ns]
+    return files
+
+
+class ModelCacheIndex:
+    """Persistent map of repo_id -> validated local snapshot.
+
+    Each entry records the snapshot path with the size and mtime of every
+    file in it. A lookup re-stats those files (no opening, no walking the HF
+    cache) and drops the entry if anything changed, so a hit is a handful of
+    stat calls however large the cache is. `checked_at` marks entries whose
+    files were also matched against the repo's remote file list.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self._entries = {
+                    k: v for k, v in data.items()
+                    if isinstance(v, dict) and "path" in v and "files" in v
+                }
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable model cache index {self.path}: {e}")
+
+    def _save(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write model cache index: {e}")
+
+    def lookup(self, repo_id: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(repo_id)
+        if entry is None:
+            return None
+        root = Path(entry["path"])
+        for rel, (size, mtime_ns) in entry["files"].items():
+            try:
+                st = (root / rel).stat()
+            except OSError:
+                st = None
+            if st is None or st.st_size != size or st.st_mtime_ns != mtime_ns:
+                logger.info(f"Model cache index entry for {repo_id} is stale")
+                self.forget(repo_id)
+                return None
+        return entry["path"]
+
+    def record(self, repo_id: str, snapshot_path: str) -> None:
+        """Index a snapshot the caller has already validated."""
+        files = _stat_files(Path(snapshot_path))
+        if not files:
+            return
+        with self._lock:
+            self._entries[repo_id] = {
+                "path": str(snapshot_path),
+                "files": files,
+                "indexed_at": time.time(),
+            }
+            self._save()
+
+    def checked_at(self, repo_id: str, path: str) -> Optional[float]:
+        """When `path` was last confirmed complete against the repo's remote
+        file list, or None if it never was."""
+        with self._lock:
+            entry = self._entries.get(repo_id)
+        if entry is None or entry["path"] != str(path):
+            return None
+        return entry.get("checked_at")
+
+    def mark_checked(self, repo_id: str) -> None:
+        with self._lock:
+            entry = self._entries.get(repo_id)
+            if entry is not None:
+                entry["checked_at"] = time.time()
+                self._save()
+
+    def forget(self, repo_id: str) -> None:
+        with self._lock:
+            if self._entries.pop(repo_id, None) is not None:
+                self._save()
+
+
+_index: Optional[ModelCacheIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_model_cache_index() -> ModelCacheIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = ModelCacheIndex(get_resource_path(INDEX_FILE))
+        return _index
@@ -0,0 +1,440 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+from urllib.parse import quote
+
+import requests
+
+from core.exceptions import ModelLoadError
+from core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_ENDPOINT = "https://huggingface.co"
+# Files larger than one part are fetched as concurrent byte ranges.
+PART_SIZE = 32 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+MAX_RETRIES = 3
+
+
+def default_endpoint() -> str:
+    try:
+        from huggingface_hub.constants import ENDPOINT
+        return ENDPOINT
+    except Exception:
+        return os.environ.get("HF_ENDPOINT", DEFAULT_ENDPOINT)
+
+
+def hub_cache_dir() -> Path:
+    """huggingface_hub's cache directory, shared by the loader and the downloader."""
+    try:
+        from huggingface_hub.constants import HF_HUB_CACHE
+        return Path(HF_HUB_CACHE)
+    except Exception:
+        return Path.home() / ".cache" / "huggingface" / "hub"
+
+
+def _default_headers() -> dict:
+    # User agent and token, as huggingface_hub would send them.
+    try:
+        from huggingface_hub.utils import build_hf_headers
+        return build_hf_headers()
+    except Exception:
+        return {}
+
+
+@dataclass
+class RemoteFile:
+    name: str
+    size: int
+    # sha256 for LFS files, the git blob sha1 otherwise. Also the blob's name
+    # in the hub cache, as huggingface_hub names them.
+    etag: str
+    lfs: bool
+
+
+def file_digest(path: str | Path, size: int, lfs: bool) -> str:
+    """The hub's hash of a local file: sha256 for LFS, git blob sha1 otherwise."""
+    h = hashlib.sha256() if lfs else hashlib.sha1(f"blob {size}\0".encode())
+    with open(path, "rb") as f:
+        while chunk := f.read(8 * CHUNK_SIZE):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def changed_files(snapshot: str | Path, files: dict[str, RemoteFile]) -> list[str]:
+    """Names in `files` whose copy in `snapshot` is missing or differs from
+    the remote. A symlinked file is compared by its blob name, which is the
+    etag; a plain copy (no symlink support) of the right size is hashed."""
+    changed = []
+    for name, remote in files.items():
+        pointer = Path(snapshot) / name
+        if not pointer.is_file() or pointer.stat().st_size != remote.size:
+            changed.append(name)
+        elif pointer.is_symlink():
+            if pointer.resolve().name != remote.etag:
+                changed.append(name)
+        elif file_digest(pointer, remote.size, remote.lfs) != remote.etag:
+            changed.append(name)
+    return changed
+
+
+class _Progress:
+    def __init__(
+        self, total: int, callback: Optional[Callable[[int, int], None]]
+    ) -> None:
+        self.total = total
+        self.done = 0
+        self._callback = callback
+        self._lock = threading.Lock()
+
+    def add(self, n: int) -> None:
+        with self._lock:
+            self.done += n
+            if self._callback and self.total > 0:
+                self._callback(self.done, self.total)
+
+
+@dataclass
+class _FileJob:
+    remote: RemoteFile
+    url: str
+    incomplete: Path
+    state_path: Path
+    # [start, end) byte ranges; a single part streams the whole file.
+    parts: list[tuple[int, int]]
+    ranged: bool
+    done: set[int] = field(default_factory=set)
+    resume_from: int = 0
+    # Part index -> next byte to write. Advanced as bytes land on disk, so a
+    # retry after a dropped connection continues from there.
+    positions: dict[int, int] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def save_state(self) -> None:
+        tmp = self.state_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "etag": self.remote.etag,
+                "size": self.remote.size,
+                "parts": len(self.parts),
+                "done": sorted(self.done),
+            }, f)
+        os.replace(tmp, self.state_path)
+
+    def part_done(self, index: int) -> bool:
+        """Record a finished part; True once every part is in."""
+        with self.lock:
+            self.done.add(index)
+            if self.ranged:
+                self.save_state()
+            return len(self.done) == len(self.parts)
+
+
+class ModelDownloader:
+    """Fetch a model repo into the hub cache with concurrent, resumable
+    transfers.
+
+    The file list, commit and hashes come from the hub's
+    /api/models/{repo}/revision/{rev}?blobs=true metadata; files are read from
+    {endpoint}/{repo}/resolve/{commit}/{file}. Small files download in
+    parallel, one request each; files larger than `part_size` are split into
+    byte ranges fetched in parallel and written in place. Partial downloads
+    stay in blobs/<etag>.incomplete (with a .parts.json listing finished
+    ranges), so an interrupted download resumes where it stopped. Every file
+    is hashed against the metadata before it is moved into place. The layout
+    (blobs/, snapshots/<commit>/, refs/) is huggingface_hub's, so the result
+    is an ordinary cached snapshot. `endpoint` can point at any server that
+    speaks those two routes, such as a local stand-in.
+    """
+
+    def __init__(
+        self,
+        endpoint: Optional[str] = None,
+        cache_dir: Optional[str | Path] = None,
+        max_workers: int = 8,
+        part_size: int = PART_SIZE,
+        timeout: float = 30.0,
+        session: Optional[requests.Session] = None,
+    ) -> None:
+        self.endpoint = (endpoint or default_endpoint()).rstrip("/")
+        self.cache_dir = Path(cache_dir) if cache_dir else hub_cache_dir()
+        self.max_workers = max(1, max_workers)
+        self.part_size = max(CHUNK_SIZE, part_size)
+        self.timeout = timeout
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.max_workers)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update(_default_headers())
+        self._session = session
+
+    def fetch_manifest(
+        self, repo_id: str, revision: str = "main"
+    ) -> tuple[str, dict[str, RemoteFile]]:
+        """(commit sha, {filename: RemoteFile}) for a repo revision."""
+        url = f"{self.endpoint}/api/models/{repo_id}/revision/{quote(revision, safe='')}"
+        r = self._session.get(url, params={"blobs": "true"}, timeout=self.timeout)
+        r.raise_for_status()
+        data = r.json()
+        files = {}
+        for sibling in data.get("siblings", []):
+            name = sibling["rfilename"]
+            lfs = sibling.get("lfs")
+            if lfs:
+                files[name] = RemoteFile(name, int(lfs["size"]), lfs["sha256"], True)
+            else:
+                files[name] = RemoteFile(
+                    name, int(sibling.get("size") or 0), sibling["blobId"], False
+                )
+        return data["sha"], files
+
+    def download(
+        self,
+        repo_id: str,
+        filenames: Optional[list[str]] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        cancel_event: Optional[threading.Event] = None,
+        revision: str = "main",
+    ) -> str:
+        """Download `filenames` (default: the whole repo); returns the
+        snapshot directory. Raises InterruptedError if cancelled."""
+        commit, manifest = self.fetch_manifest(repo_id, revision)
+        if filenames is None:
+            wanted = list(manifest.values())
+        else:
+            unknown = [n for n in filenames if n not in manifest]
+            if unknown:
+                raise ModelLoadError(f"{repo_id} has no file(s) {', '.join(unknown)}")
+            wanted = [manifest[n] for n in filenames]
+
+        repo_dir = self.cache_dir / ("models--" + repo_id.replace("/", "--"))
+        blobs = repo_dir / "blobs"
+        snapshot = repo_dir / "snapshots" / commit
+        blobs.mkdir(parents=True, exist_ok=True)
+        snapshot.mkdir(parents=True, exist_ok=True)
+
+        progress = _Progress(sum(f.size for f in wanted), progress_callback)
+        stop = threading.Event()
+
+        def stopped() -> bool:
+            return stop.is_set() or (cancel_event is not None and cancel_event.is_set())
+
+        # Blobs already on disk (shared with another revision) only need
+        # linking, whether or not they were asked for.
+        wanted_names = {f.name for f in wanted}
+        jobs = []
+        for remote in manifest.values():
+            blob = blobs / remote.etag
+            if blob.is_file() and blob.stat().st_size == remote.size:
+                self._link(blob, snapshot / remote.name)
+                if remote.name in wanted_names:
+                    progress.add(remote.size)
+            elif remote.name in wanted_names:
+                jobs.append(self._plan(repo_id, commit, remote, blobs, progress))
+
+        if jobs:
+            with ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="ModelDownload"
+            ) as pool:
+                futures = [
+                    pool.submit(self._fetch_part, job, i, snapshot, progress, stopped)
+                    for job in jobs
+                    for i in range(len(job.parts))
+                    if i not in job.done
+                ]
+                finished, _ = wait(futures, return_when=FIRST_EXCEPTION)
+                errors = [f.exception() for f in finished if f.exception() is not None]
+                if errors:
+                    stop.set()
+            if errors:
+                # Report the failure that stopped the others, not their
+                # resulting InterruptedErrors.
+                real = [e for e in errors if not isinstance(e, InterruptedError)]
+                if not real or (cancel_event is not None and cancel_event.is_set()):
+                    raise InterruptedError("Download cancelled")
+                raise real[0]
+
+        refs = repo_dir / "refs"
+        refs.mkdir(exist_ok=True)
+        (refs / revision).write_text(commit, encoding="utf-8")
+        return str(snapshot)
+
+    def _plan(
+        self,
+        repo_id: str,
+        commit: str,
+        remote: RemoteFile,
+        blobs: Path,
+        progress: _Progress,
+    ) -> _FileJob:
+        url = f"{self.endpoint}/{repo_id}/resolve/{commit}/{quote(remote.name)}"
+        incomplete = blobs / (remote.etag + ".incomplete")
+        state_path = blobs / (remote.etag + ".parts.json")
+        existing = incomplete.stat().st_size if incomplete.exists() else 0
+
+        if remote.size > self.part_size and self._supports_ranges(url):
+            parts = [
+                (start, min(start + self.part_size, remote.size))
+                for start in range(0, remote.size, self.part_size)
+            ]
+            job = _FileJob(remote, url, incomplete, state_path, parts, ranged=True)
+            job.done = self._load_done(job, existing)
+            # Preallocate so every range can be written at its offset.
+            with open(incomplete, "ab"):
+                pass
+            os.truncate(incomplete, remote.size)
+            job.save_state()
+            progress.add(sum(parts[i][1] - parts[i][0] for i in job.done))
+            if job.done:
+                logger.info(
+                    f"Resuming {remote.name}: {len(job.done)}/{len(parts)} parts on disk"
+                )
+        else:
+            job = _FileJob(
+                remote, url, incomplete, state_path, [(0, remote.size)], ranged=False
+            )
+            state_path.unlink(missing_ok=True)
+            if 0 < existing < remote.size:
+                job.resume_from = existing
+                progress.add(existing)
+                logger.info(f"Resuming {remote.name} at byte {existing}")
+        return job
+
+    def _load_done(self, job: _FileJob, existing: int) -> set[int]:
+        try:
+            with open(job.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if (
+                state.get("etag") == job.remote.etag
+                and state.get("size") == job.remote.size
+                and state.get("parts") == len(job.parts)
+            ):
+                return {i for i in state.get("done", []) if 0 <= i < len(job.parts)}
+        except (OSError, ValueError):
+            pass
+        # No usable state: a sequential download (e.g. huggingface_hub's own
+        # .incomplete file) is valid up to its length.
+        return {i for i, (_, end) in enumerate(job.parts) if end <= existing}
+
+    def _supports_ranges(self, url: str) -> bool:
+        try:
+            with self._session.get(
+                url, headers={"Range": "bytes=0-0"}, stream=True, timeout=self.timeout
+            ) as r:
+                return r.status_code == 206
+        except requests.RequestException:
+            return False
+
+    def _fetch_part(
+        self,
+        job: _FileJob,
+        index: int,
+        snapshot: Path,
+        progress: _Progress,
+        stopped: Callable[[], bool],
+    ) -> None:
+        start, end = job.parts[index]
+        job.positions[index] = start if job.ranged else job.resume_from
+        attempt = 0
+        while True:
+            try:
+                self._stream(job, index, progress, stopped)
+                break
+            except requests.RequestException as e:
+                attempt += 1
+                if attempt > MAX_RETRIES or stopped():
+                    raise ModelLoadError(
+                        f"Downloading {job.remote.name} failed: {e}"
+                    ) from e
+                logger.warning(
+                    f"Retrying {job.remote.name} at byte {job.positions[index]} "
+                    f"(attempt {attempt}/{MAX_RETRIES}): {e}"
+                )
+                time.sleep(attempt)
+
+        if job.part_done(index):
+            self._finalize(job, snapshot)
+
+    def _stream(
+        self,
+        job: _FileJob,
+        index: int,
+        progress: _Progress,
+        stopped: Callable[[], bool],
+    ) -> None:
+        start, end = job.parts[index]
+        pos = job.positions[index]
+        headers = {}
+        if job.ranged or pos > 0:
+            headers["Range"] = f"bytes={pos}-{end - 1}"
+        with self._session.get(
+            job.url, headers=headers, stream=True, timeout=self.timeout
+        ) as r:
+            r.raise_for_status()
+            if headers and r.status_code != 206:
+                if job.ranged:
+                    raise ModelLoadError(
+                        f"Server ignored the range request for {job.remote.name}"
+                    )
+                # No resume support: start the file over, taking back the
+                # progress already reported for it.
+                progress.add(start - pos)
+                pos = job.positions[index] = start
+            with open(job.incomplete, "r+b" if pos > 0 or job.ranged else "wb") as out:
+                if not job.ranged:
+                    # Drop anything past the last byte known to be written.
+                    out.truncate(pos)
+                out.seek(pos)
+                for chunk in r.iter_content(CHUNK_SIZE):
+                    if stopped():
+                        raise InterruptedError("Download cancelled")
+                    chunk = chunk[: end - pos]
+                    out.write(chunk)
+                    pos += len(chunk)
+                    job.positions[index] = pos
+                    progress.add(len(chunk))
+                    if pos >= end:
+                        break
+        if pos < end:
+            raise requests.ConnectionError(
+                f"connection closed at byte {pos} of {end}"
+            )
+
+    def _finalize(self, job: _FileJob, snapshot: Path) -> None:
+        remote = job.remote
+        digest = file_digest(job.incomplete, remote.size, remote.lfs)
+        if digest != remote.etag:
+            job.incomplete.unlink(missing_ok=True)
+            job.state_path.unlink(missing_ok=True)
+            raise ModelLoadError(
+                f"Checksum mismatch for {remote.name}: expected {remote.etag}, got {digest}"
+            )
+        blob = job.incomplete.with_name(remote.etag)
+        os.replace(job.incomplete, blob)
+        job.state_path.unlink(missing_ok=True)
+        self._link(blob, snapshot / remote.name)
+        logger.debug(f"Downloaded and verified {remote.name}")
+
+    @staticmethod
+    def _link(blob: Path, pointer: Path) -> None:
+        if pointer.is_file() and not pointer.is_symlink():
+            return
+        pointer.parent.mkdir(parents=True, exist_ok=True)
+        if pointer.is_symlink():
+            pointer.unlink()
+        try:
+            os.symlink(os.path.relpath(blob, pointer.parent), pointer)
+        except OSError:
+            # No symlink support (e.g. Windows without developer mode): the
+            # snapshot holds the file itself, as huggingface_hub does.
+            os.replace(blob, pointer)
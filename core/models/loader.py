@@ -8,12 +8,13 @@ from pathlib import Path
 from typing import Callable, Optional
 
 import whisper_s2t
-from huggingface_hub import HfApi, hf_hub_download, snapshot_download
-from tqdm.auto import tqdm
+from huggingface_hub import HfApi, snapshot_download
 
 from config.constants import WHISPER_MODELS
 from core.exceptions import ModelLoadError
 from core.logging_config import get_logger
+from core.models.cache_index import get_model_cache_index
+from core.models.downloader import ModelDownloader, hub_cache_dir
 from core.models.metadata import ModelMetadata
 from utils import get_optimal_cpu_threads
 
@@ -35,47 +36,6 @@ def _ensure_streams() -> None:
         sys.stderr = _NullWriter()
 
 
-class _ProgressTqdm(tqdm):
-    def __init__(
-        self,
-        *args,
-        progress_callback=None,
-        completed_bytes=0,
-        total_all_bytes=0,
-        cancel_event=None,
-        **kwargs,
-    ):
-        self._progress_callback = progress_callback
-        self._completed_bytes = completed_bytes
-        self._total_all_bytes = total_all_bytes
-        self._cancel_event = cancel_event
-        kwargs.pop("name", None)
-        if "file" in kwargs and kwargs["file"] is None:
-            kwargs["file"] = _NullWriter()
-        super().__init__(*args, **kwargs)
-
-    def update(self, n=1):
-        if self._cancel_event is not None and self._cancel_event.is_set():
-            raise InterruptedError("Download cancelled")
-        super().update(n)
-        if self._progress_callback and self._total_all_bytes > 0:
-            self._progress_callback(
-                self._completed_bytes + int(self.n), self._total_all_bytes
-            )
-
-
-def _make_tqdm_class(callback, completed, total_all, cancel_event=None):
-    class _BoundTqdm(_ProgressTqdm):
-        def __init__(self, *args, **kwargs):
-            kwargs["progress_callback"] = callback
-            kwargs["completed_bytes"] = completed
-            kwargs["total_all_bytes"] = total_all
-            kwargs["cancel_event"] = cancel_event
-            super().__init__(*args, **kwargs)
-
-    return _BoundTqdm
-
-
 def get_repo_id(model_name: str, precision: str) -> str:
     info = ModelMetadata.get_model_info(model_name, precision)
     if info is None:
@@ -86,12 +46,7 @@ def get_repo_id(model_name: str, precision: str) -> str:
 
 
 def _get_local_model_dir(repo_id: str) -> Path:
-    try:
-        from huggingface_hub.constants import HF_HUB_CACHE
-        base = Path(HF_HUB_CACHE)
-    except Exception:
-        base = Path.home() / ".cache" / "huggingface" / "hub"
-    return base / "local_copies" / repo_id.replace("/", "--")
+    return hub_cache_dir() / "local_copies" / repo_id.replace("/", "--")
 
 
 def _is_file_accessible(filepath: Path) -> bool:
@@ -108,20 +63,43 @@ def validate_model_path(path: str) -> bool:
     return _is_file_accessible(model_bin)
 
 
+def _is_file_present(filepath: Path, size: int = 0) -> bool:
+    # stat() follows the cache symlinks, so a dangling link counts as missing.
+    try:
+        st = filepath.stat()
+    except OSError:
+        return False
+    return size <= 0 or st.st_size == size
+
+
 def _resolve_cache_path(repo_id: str) -> Optional[str]:
+    """The repo's snapshot directory, read straight from the hub cache layout
+    (refs/main, else the newest snapshot) instead of scanning every repo."""
+    repo_dir = _get_repo_cache_path(repo_id)
+    if repo_dir is None:
+        return None
+    snapshots = repo_dir / "snapshots"
     try:
-        from huggingface_hub import scan_cache_dir
-        cache_info = scan_cache_dir()
-        for repo in cache_info.repos:
-            if repo.repo_id == repo_id:
-                for revision in repo.revisions:
-                    return str(revision.snapshot_path)
-    except Exception:
+        commit = (repo_dir / "refs" / "main").read_text(encoding="utf-8").strip()
+        if commit and (snapshots / commit).is_dir():
+            return str(snapshots / commit)
+    except OSError:
         pass
-    return None
+    try:
+        candidates = [p for p in snapshots.iterdir() if p.is_dir()]
+    except OSError:
+        return None
+    if not candidates:
+        return None
+    return str(max(candidates, key=lambda p: p.stat().st_mtime))
 
 
 def check_model_cached(repo_id: str) -> Optional[str]:
+    index = get_model_cache_index()
+    indexed = index.lookup(repo_id)
+    if indexed:
+        return indexed
+
     normal_path = None
     try:
         normal_path = snapshot_download(repo_id, local_files_only=True)
@@ -135,10 +113,12 @@ def check_model_cached(repo_id: str) -> Optional[str]:
         pass
 
     if normal_path and validate_model_path(normal_path):
+        index.record(repo_id, normal_path)
         return normal_path
 
     local_dir = _get_local_model_dir(repo_id)
     if local_dir.is_dir() and validate_model_path(str(local_dir)):
+        index.record(repo_id, str(local_dir))
         return str(local_dir)
 
     if normal_path:
@@ -175,8 +155,7 @@ def get_missing_files(
 
     missing = []
     for filename, size in files_info:
-        filepath = Path(cached_path) / filename
-        if not _is_file_accessible(filepath):
+        if not _is_file_present(Path(cached_path) / filename, size):
             missing.append((filename, size))
 
     if missing:
@@ -213,28 +192,14 @@ def _force_remove_tree(path: Path) -> None:
 
 
 def _get_repo_cache_path(repo_id: str) -> Optional[Path]:
-    try:
-        from huggingface_hub import scan_cache_dir
-        cache_info = scan_cache_dir()
-        for repo in cache_info.repos:
-            if repo.repo_id == repo_id:
-                return Path(repo.repo_path)
-    except Exception:
-        pass
-
-    try:
-        from huggingface_hub.constants import HF_HUB_CACHE
-        dir_name = "models--" + repo_id.replace("/", "--")
-        candidate = Path(HF_HUB_CACHE) / dir_name
-        if candidate.exists():
-            return candidate
-    except Exception:
-        pass
-
+    candidate = hub_cache_dir() / ("models--" + repo_id.replace("/", "--"))
+    if candidate.exists():
+        return candidate
     return None
 
 
 def _clear_corrupted_cache(repo_id: str) -> None:
+    get_model_cache_index().forget(repo_id)
     target = _get_repo_cache_path(repo_id)
     if target is None:
         logger.warning(f"Could not locate cache directory for {repo_id}")
@@ -261,63 +226,35 @@ def download_model_files(
     progress_callback: Optional[Callable[[int, int], None]] = None,
     cancel_event: Optional[threading.Event] = None,
 ) -> str:
-    _ensure_streams()
-
     total_bytes = sum(size for _, size in files_info)
-    downloaded_bytes = 0
-
-    for filename, size in files_info:
+    try:
+        local_path = ModelDownloader().download(
+            repo_id,
+            [filename for filename, _ in files_info],
+            progress_callback=progress_callback,
+            cancel_event=cancel_event,
+        )
+    except InterruptedError:
+        raise
+    except Exception as dl_err:
         if cancel_event and cancel_event.is_set():
-            raise InterruptedError("Download cancelled")
-
+            # Failure was the cancellation; do NOT fall back to
+            # snapshot_download (it would re-fetch the whole model).
+            raise InterruptedError("Download cancelled") from dl_err
+        logger.warning(
+            f"Download failed for {repo_id}: {dl_err}. "
+            f"Falling back to snapshot_download."
+        )
+        _ensure_streams()
         try:
-            tqdm_cls = (
-                _make_tqdm_class(
-                    progress_callback, downloaded_bytes, total_bytes, cancel_event
-                )
-                if (progress_callback or cancel_event is not None)
-                else None
-            )
-            dl_kwargs = {"repo_id": repo_id, "filename": filename}
-            if tqdm_cls:
-                dl_kwargs["tqdm_class"] = tqdm_cls
-            hf_hub_download(**dl_kwargs)
-        except InterruptedError:
-            # Cancelled mid-file via the tqdm hook -- propagate as cancellation.
-            raise
-        except Exception as file_err:
-            if cancel_event and cancel_event.is_set():
-                # Failure was the cancellation; do NOT fall back to
-                # snapshot_download (it would re-fetch the whole model).
-                raise InterruptedError("Download cancelled") from file_err
-            logger.warning(
-                f"Per-file download failed for '{filename}': {file_err}. "
-                f"Falling back to snapshot_download."
-            )
-            _ensure_streams()
-            try:
-                local_path = snapshot_download(repo_id)
-            except Exception as snap_err:
-                raise snap_err from file_err
-            if progress_callback:
-                progress_callback(total_bytes, total_bytes)
-            return local_path
-
-        downloaded_bytes += size
-
+            local_path = snapshot_download(repo_id)
+        except Exception as snap_err:
+            raise snap_err from dl_err
         if progress_callback:
-            progress_callback(downloaded_bytes, total_bytes)
-
-    try:
-        local_path = snapshot_download(repo_id, local_files_only=True)
-    except OSError:
-        local_path = _resolve_cache_path(repo_id)
-        if local_path is None:
-            raise ModelLoadError(
-                f"Files downloaded but cache path could not be resolved for {repo_id}"
-            )
+            progress_callback(total_bytes, total_bytes)
 
     if validate_model_path(local_path):
+        get_model_cache_index().record(repo_id, local_path)
         return local_path
 
     logger.warning(
@@ -344,6 +281,7 @@ def download_model_files(
             f"directory and try again."
         )
 
+    get_model_cache_index().record(repo_id, local_path)
     return local_path
 
 
@@ -353,15 +291,21 @@ def load_whisper_s2t_model(
     device: str,
     beam_size: int = 1,
     local_path: str | None = None,
+    cpu_threads: int | None = None,
 ):
-    """Invoke whisper_s2t.load_model with the right kwargs for the target model."""
+    """Invoke whisper_s2t.load_model with the right kwargs for the target model.
+
+    `cpu_threads` overrides the default thread count, e.g. when several
+    worker processes share the machine's cores.
+    """
     info = WHISPER_MODELS.get(ModelMetadata.resolve_model_key(model_name, precision))
     if info is None:
         raise ModelLoadError(
             f"Unknown model/precision combination: {model_name} - {precision}"
         )
 
-    cpu_threads = get_optimal_cpu_threads() if device == "cpu" else 4
+    if cpu_threads is None:
+        cpu_threads = get_optimal_cpu_threads() if device == "cpu" else 4
 
     kwargs = {
         "model_identifier": local_path or info["repo_id"],
@@ -376,7 +320,7 @@ def load_whisper_s2t_model(
 
     logger.info(
         f"Loading WhisperS2T model: name={model_name}, precision={precision}, "
-        f"device={device}, beam_size={beam_size}"
+        f"device={device}, beam_size={beam_size}, cpu_threads={cpu_threads}"
     )
 
     try:
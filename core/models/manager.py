@@ -2,13 +2,26 @@ from __future__ import annotations
 
 import gc
 import threading
+import time
 import uuid
-from typing import Optional
-
-from PySide6.QtCore import QMutex, QMutexLocker, QObject, QRunnable, QThreadPool, Signal
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+from PySide6.QtCore import (
+    QMutex,
+    QMutexLocker,
+    QObject,
+    QRunnable,
+    QThreadPool,
+    QTimer,
+    Signal,
+)
 
 from core.exceptions import ModelLoadError
 from core.logging_config import get_logger
+from core.models.cache_index import get_model_cache_index
+from core.models.downloader import ModelDownloader, changed_files
 from core.models.loader import (
     check_model_cached,
     download_model_files,
@@ -18,6 +31,8 @@ from core.models.loader import (
     load_whisper_s2t_model,
     validate_model_path,
 )
+from core.models.pool import ModelPool, device_memory_used_mb
+from core.transcription.cache import model_beam_size
 
 logger = get_logger(__name__)
 
@@ -51,6 +66,33 @@ def _release_model(model) -> None:
     gc.collect()
 
 
+def _check_freshness(repo_id: str, local_path: str) -> None:
+    """Compare a cache-first snapshot against the repo's current revision.
+
+    Runs after the load, off the loader pool. Each file's blob id (the lfs
+    sha256 or git blob sha1) is compared with the snapshot's copy, so a file
+    replaced by one of the same size is caught; a snapshot of the current
+    commit needs no comparison. If the repo changed, the index entry is
+    dropped so the next load verifies and downloads the update; network
+    trouble just leaves the entry for the next check.
+    """
+    index = get_model_cache_index()
+    try:
+        commit, files = ModelDownloader().fetch_manifest(repo_id)
+    except Exception as e:
+        logger.debug(f"Freshness check for {repo_id} skipped: {e}")
+        return
+    changed = [] if Path(local_path).name == commit else changed_files(local_path, files)
+    if changed:
+        logger.info(
+            f"Cached model {repo_id} is out of date ({len(changed)} file(s) "
+            f"changed); it will be updated on the next load"
+        )
+        index.forget(repo_id)
+    else:
+        index.mark_checked(repo_id)
+
+
 class _LoaderSignals(QObject):
     model_loaded = Signal(object, str, str, str, str)
     error_occurred = Signal(str, str)
@@ -70,6 +112,8 @@ class _ModelLoaderRunnable(QRunnable):
         beam_size: int,
         model_version: str,
         cancel_event: threading.Event,
+        pool: Optional[ModelPool] = None,
+        freshness_ttl_hours: float = 0,
     ) -> None:
         super().__init__()
         self.setAutoDelete(True)
@@ -79,6 +123,9 @@ class _ModelLoaderRunnable(QRunnable):
         self.beam_size = beam_size
         self.model_version = model_version
         self.cancel_event = cancel_event
+        self.pool = pool
+        self.freshness_ttl_hours = freshness_ttl_hours
+        self._freshness_due = False
         self.signals = _LoaderSignals()
 
     def run(self) -> None:
@@ -99,6 +146,7 @@ class _ModelLoaderRunnable(QRunnable):
 
             self.signals.loading_started.emit(self.model_name, self.model_version)
 
+            before = device_memory_used_mb(self.device) if self.pool else None
             model = load_whisper_s2t_model(
                 self.model_name,
                 self.precision,
@@ -106,6 +154,12 @@ class _ModelLoaderRunnable(QRunnable):
                 beam_size=self.beam_size,
                 local_path=local_path,
             )
+            if self.pool is not None:
+                self.pool.record_footprint(
+                    (self.model_name, self.precision, self.device, self.beam_size),
+                    before,
+                    device_memory_used_mb(self.device),
+                )
             self.signals.model_loaded.emit(
                 model,
                 self.model_name,
@@ -113,6 +167,13 @@ class _ModelLoaderRunnable(QRunnable):
                 self.device,
                 self.model_version,
             )
+            if self._freshness_due:
+                threading.Thread(
+                    target=_check_freshness,
+                    args=(repo_id, local_path),
+                    name="ModelFreshnessCheck",
+                    daemon=True,
+                ).start()
         except ModelLoadError as e:
             logger.error(f"Model load error: {e}")
             self.signals.error_occurred.emit(str(e), self.model_version)
@@ -126,9 +187,20 @@ class _ModelLoaderRunnable(QRunnable):
                 )
 
     def _resolve_model_files(self, repo_id: str) -> Optional[str]:
+        index = get_model_cache_index()
         cached_path = check_model_cached(repo_id)
 
         if cached_path:
+            # Cache first: a snapshot that has matched the remote file list
+            # before, and whose files are unchanged since, loads without a
+            # network round trip. Its freshness is re-checked after the load.
+            checked_at = index.checked_at(repo_id, cached_path)
+            if checked_at is not None:
+                ttl = self.freshness_ttl_hours * 3600
+                self._freshness_due = ttl > 0 and time.time() - checked_at >= ttl
+                logger.info(f"Using verified cached model for '{self.model_name}'")
+                return cached_path
+
             files_info = None
             try:
                 files_info = get_repo_file_info(repo_id)
@@ -161,6 +233,8 @@ class _ModelLoaderRunnable(QRunnable):
             _, missing_files = get_missing_files(repo_id, files_info, cached_path)
 
             if not missing_files:
+                index.record(repo_id, cached_path)
+                index.mark_checked(repo_id)
                 return cached_path
 
             return self._download_files(repo_id, missing_files)
@@ -226,6 +300,9 @@ class _ModelLoaderRunnable(QRunnable):
                 )
             return None
 
+        # download_model_files indexed the snapshot; the remote file list was
+        # fetched for this download, so it is verified too.
+        get_model_cache_index().mark_checked(repo_id)
         self.signals.download_finished.emit(self.model_name, self.model_version)
         return local_path
 
@@ -243,11 +320,18 @@ class ModelManager(QObject):
     download_cancelled = Signal()
     loading_started = Signal(str)
 
-    def __init__(self):
+    def __init__(self, pool_budget_mb: int = 0, freshness_ttl_hours: float = 24):
         super().__init__()
+        # Hours between background re-checks of cache-first models against
+        # the hub (0 never re-checks).
+        self._freshness_ttl_hours = freshness_ttl_hours
+        # Every resident model, the GUI's (pinned) and the server's. _model is
+        # the GUI's and is also in the pool.
+        self._pool = ModelPool(pool_budget_mb)
         self._model = None
         self._model_version: Optional[str] = None
         self._pending_version: Optional[str] = None
+        self._pending_beam_size = 1
         self._model_mutex = QMutex()
         self._thread_pool = QThreadPool.globalInstance()
         self._current_settings: dict = {}
@@ -265,10 +349,27 @@ class ModelManager(QObject):
 
         new_version = str(uuid.uuid4())
         self._pending_version = new_version
+        self._pending_beam_size = beam_size
         self._cancel_event = threading.Event()
 
+        key = (model_name, precision, device, beam_size)
+        resident = self._pool.peek(key)
+        if resident is not None:
+            logger.info(f"Model already resident: {model_name}")
+            # Queued so callers still see the signal after load_model returns.
+            QTimer.singleShot(
+                0,
+                lambda: self._on_model_loaded(
+                    resident, model_name, precision, device, new_version
+                ),
+            )
+            return
+        for evicted in self._pool.make_room(key):
+            self._release_unless_gui(evicted)
+
         runnable = _ModelLoaderRunnable(
-            model_name, precision, device, beam_size, new_version, self._cancel_event
+            model_name, precision, device, beam_size, new_version, self._cancel_event,
+            pool=self._pool, freshness_ttl_hours=self._freshness_ttl_hours,
         )
         runnable.signals.model_loaded.connect(self._on_model_loaded)
         runnable.signals.error_occurred.connect(self._on_model_error)
@@ -287,42 +388,75 @@ class ModelManager(QObject):
         with QMutexLocker(self._model_mutex):
             return self._model, self._model_version
 
-    def get_or_load_model_sync(
+    def get_current_settings(self) -> dict:
+        """Name, precision, device and beam size of the resident model (empty
+        if none)."""
+        return dict(self._current_settings)
+
+    def pool_stats(self) -> dict:
+        return self._pool.stats()
+
+    def _release_unless_gui(self, model) -> None:
+        # The GUI's model is released when the GUI replaces it, not before.
+        if model is not None and model is not self._model:
+            _release_model(model)
+
+    def acquire_model(self, model) -> None:
+        """Keep `model` from being evicted or freed while it is in use; pair
+        with release_model()."""
+        if model is not None:
+            self._pool.lease(model)
+
+    def release_model(self, model) -> None:
+        if model is not None:
+            self._release_unless_gui(self._pool.release(model))
+
+    @contextmanager
+    def leased_model(
         self, model_name: str, precision: str, device: str, beam_size: int = 1
+    ) -> Iterator:
+        """get_or_load_model_sync() holding a lease for the with-block."""
+        model = self.get_or_load_model_sync(
+            model_name, precision, device, beam_size, lease=True
+        )
+        try:
+            yield model
+        finally:
+            self.release_model(model)
+
+    def get_or_load_model_sync(
+        self,
+        model_name: str,
+        precision: str,
+        device: str,
+        beam_size: int = 1,
+        lease: bool = False,
     ):
-        """Synchronous variant used by the server API when it needs the current
-        model right now (blocks until a load finishes; typically the model is
-        already resident in memory)."""
-        model, _ = self.get_model()
-        if model is not None and self._current_settings == {
-            "model_name": model_name,
-            "precision": precision,
-            "device_type": device,
-        }:
+        """Synchronous variant used by the server API (blocks until a load
+        finishes). Models stay in the pool after use, so clients alternating
+        between models do not reload them while they fit the budget. With
+        `lease` the model comes back leased; the caller must release_model()
+        it. The beam size is part of the pool key, so a request never gets a
+        model decoding with another beam."""
+        key = (model_name, precision, device, beam_size)
+        model = self._pool.acquire(key) if lease else self._pool.get(key)
+        if model is not None:
             return model
 
+        for evicted in self._pool.make_room(key):
+            self._release_unless_gui(evicted)
+
         version = str(uuid.uuid4())
         cancel_event = threading.Event()
         runnable = _ModelLoaderRunnable(
-            model_name, precision, device, beam_size, version, cancel_event
+            model_name, precision, device, beam_size, version, cancel_event,
+            pool=self._pool, freshness_ttl_hours=self._freshness_ttl_hours,
         )
         holder: dict = {}
         done_event = threading.Event()
 
-        def _on_loaded(m, name, prec, dev, _v):
-            # Store as the one resident model so repeat server requests reuse it
-            # and we never hold two models at once. Evicts the previous model
-            # (including the GUI-loaded one) under the mutex.
-            with QMutexLocker(self._model_mutex):
-                if self._model is not None and self._model is not m:
-                    _release_model(self._model)
-                self._model = m
-                self._model_version = _v
-            self._current_settings = {
-                "model_name": name,
-                "precision": prec,
-                "device_type": dev,
-            }
+        def _on_loaded(m, _name, _prec, _dev, _v):
+            self._release_unless_gui(self._pool.add(key, m, lease=lease))
             holder["model"] = m
             done_event.set()
 
@@ -380,20 +514,39 @@ class ModelManager(QObject):
     ) -> None:
         if version != self._pending_version:
             logger.info(f"Ignoring stale model load (version {version})")
-            _release_model(model)
+            key = (name, precision, device, model_beam_size(model))
+            self._release_unless_gui(self._pool.discard(model, key))
             return
 
+        beam_size = self._pending_beam_size
+        key = (name, precision, device, beam_size)
+        old_settings = self._current_settings
+        replaced = self._pool.add(key, model, pinned=True)
+        self._pool.pin_only(key)
         with QMutexLocker(self._model_mutex):
-            if self._model is not None:
-                _release_model(self._model)
-                self._model = None
+            old = self._model
             self._model = model
             self._model_version = version
+        if replaced is not None:
+            _release_model(replaced)
+        # The previous GUI model stays resident, unpinned, while it is still
+        # in the pool; otherwise nothing else holds it.
+        if old is not None and old is not model and old is not replaced:
+            old_key = (
+                old_settings.get("model_name"),
+                old_settings.get("precision"),
+                old_settings.get("device_type"),
+                old_settings.get("beam_size"),
+            )
+            freed = self._pool.discard(old, old_key)
+            if freed is not None:
+                _release_model(freed)
 
         self._current_settings = {
             "model_name": name,
             "precision": precision,
             "device_type": device,
+            "beam_size": beam_size,
         }
         logger.info(f"Model loaded successfully: {name}")
         self.model_loaded.emit(name, precision, device)
@@ -417,10 +570,10 @@ class ModelManager(QObject):
 
         _t = _time.perf_counter()
         with QMutexLocker(self._model_mutex):
-            if self._model is not None:
-                _release_model(self._model)
-                self._model = None
-                self._model_version = None
+            self._model = None
+            self._model_version = None
+        for model in self._pool.drain():
+            _release_model(model)
         logger.info(f"[SHUTDOWN]   MM unload+gc: {_time.perf_counter() - _t:.3f}s")
 
         logger.debug("ModelManager cleanup complete")
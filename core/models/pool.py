@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from core.logging_config import get_logger
+from core.models.metadata import ModelMetadata
+
+logger = get_logger(__name__)
+
+# (name, precision, device, beam size). whisper_s2t fixes the beam size when
+# a model is loaded, so copies with different beams are different models.
+PoolKey = tuple[str, str, str, int]
+
+# Used when the catalog has no figure for a model.
+_FALLBACK_ESTIMATE_MB = 3000.0
+# Share of the device's memory the pool may fill when no budget is configured.
+_AUTO_VRAM_SHARE = 0.9
+_AUTO_RAM_SHARE = 0.5
+# Smaller before/after deltas are measurement noise, not a model.
+_MIN_MEASURED_MB = 50.0
+
+_SIZE_RE = re.compile(r"([\d.]+)\s*([GM])B", re.IGNORECASE)
+
+
+def _device_kind(device: str) -> str:
+    return "cuda" if str(device).startswith("cuda") else "cpu"
+
+
+def parse_memory_mb(text: Optional[str]) -> Optional[float]:
+    """'3.3 GB' -> 3379.2; None if the text has no size in it."""
+    match = _SIZE_RE.search(text or "")
+    if not match:
+        return None
+    value = float(match.group(1))
+    return value * 1024.0 if match.group(2).upper() == "G" else value
+
+
+def device_memory_used_mb(device: str) -> Optional[float]:
+    """GPU 0 memory in use (NVML), or this process's RSS for the CPU."""
+    try:
+        if _device_kind(device) == "cuda":
+            import pynvml
+            pynvml.nvmlInit()
+            handle = pynvml.nvmlDeviceGetHandleByIndex(0)
+            return pynvml.nvmlDeviceGetMemoryInfo(handle).used / (1024 * 1024)
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except Exception:
+        return None
+
+
+def default_budget_mb(device_kind: str) -> float:
+    try:
+        if device_kind == "cuda":
+            import pynvml
+            pynvml.nvmlInit()
+            handle = pynvml.nvmlDeviceGetHandleByIndex(0)
+            total = pynvml.nvmlDeviceGetMemoryInfo(handle).total
+            return total / (1024 * 1024) * _AUTO_VRAM_SHARE
+        import psutil
+        return psutil.virtual_memory().total / (1024 * 1024) * _AUTO_RAM_SHARE
+    except Exception:
+        return float("inf")
+
+
+@dataclass
+class _Entry:
+    model: Any
+    size_mb: float
+    pinned: bool = False
+
+
+class ModelPool:
+    """Resident models keyed by (name, precision, device, beam size), least
+    recently used first.
+
+    Each device kind (cuda, cpu) has its own memory budget. Sizes start from
+    the catalog's avg_vram_usage and are replaced by the measured footprint
+    of a load once one is seen. Before a load, unpinned models on the same
+    device kind are evicted oldest first until the new one fits; the pinned
+    (GUI) model is never evicted. The pool only tracks models: callers
+    release what make_room(), add(), remove(), drain(), discard() and
+    release() hand back.
+
+    A model in use is leased (lease()/release()). Leased models are never
+    evicted, and one that leaves the pool while leased (replaced, removed,
+    drained or discarded) still counts against its budget until its last
+    lease ends; release() then hands it back to be freed.
+    """
+
+    def __init__(self, budget_mb: int = 0) -> None:
+        self._configured_mb = float(budget_mb) if budget_mb > 0 else None
+        self._budgets: dict[str, float] = {}
+        self._entries: "OrderedDict[PoolKey, _Entry]" = OrderedDict()
+        self._measured: dict[PoolKey, float] = {}
+        # id(model) -> active leases, and leased models that left the pool:
+        # id(model) -> (model, device kind, size_mb).
+        self._leases: dict[int, int] = {}
+        self._retired: dict[int, tuple[Any, str, float]] = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def budget_mb(self, device_kind: str) -> float:
+        if self._configured_mb is not None:
+            return self._configured_mb
+        if device_kind not in self._budgets:
+            self._budgets[device_kind] = default_budget_mb(device_kind)
+        return self._budgets[device_kind]
+
+    def estimate_mb(self, key: PoolKey) -> float:
+        if key in self._measured:
+            return self._measured[key]
+        info = ModelMetadata.get_model_info(key[0], key[1]) or {}
+        return parse_memory_mb(info.get("avg_vram_usage")) or _FALLBACK_ESTIMATE_MB
+
+    def record_footprint(
+        self, key: PoolKey, before_mb: Optional[float], after_mb: Optional[float]
+    ) -> None:
+        if before_mb is None or after_mb is None:
+            return
+        delta = after_mb - before_mb
+        if delta >= _MIN_MEASURED_MB:
+            with self._lock:
+                self._measured[key] = delta
+                if key in self._entries:
+                    self._entries[key].size_mb = delta
+            logger.debug(f"Model pool: measured {key} at {delta:.0f} MB")
+
+    def get(self, key: PoolKey) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.model
+
+    def acquire(self, key: PoolKey) -> Optional[Any]:
+        """get() and lease the model in one step, so it cannot be evicted
+        in between. Pair with release()."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self._leases[id(entry.model)] = self._leases.get(id(entry.model), 0) + 1
+            return entry.model
+
+    def lease(self, model: Any) -> None:
+        """Mark `model` as in use until the matching release()."""
+        with self._lock:
+            self._leases[id(model)] = self._leases.get(id(model), 0) + 1
+
+    def release(self, model: Any) -> Optional[Any]:
+        """End one lease. Returns the model when that was its last lease and
+        it has already left the pool, for the caller to free."""
+        with self._lock:
+            count = self._leases.get(id(model), 0) - 1
+            if count > 0:
+                self._leases[id(model)] = count
+                return None
+            self._leases.pop(id(model), None)
+            retired = self._retired.pop(id(model), None)
+        return retired[0] if retired is not None else None
+
+    def discard(self, model: Any, key: PoolKey) -> Optional[Any]:
+        """The caller is done with a model that is no longer in the pool.
+        Returns it if it can be freed now; a leased one is kept counted
+        until release() hands it back."""
+        with self._lock:
+            for entry in self._entries.values():
+                if entry.model is model:
+                    return None
+            return self._hand_back(model, key, self.estimate_mb(key))
+
+    def _hand_back(self, model: Any, key: PoolKey, size_mb: float) -> Optional[Any]:
+        # Caller holds the lock.
+        if self._leases.get(id(model), 0) > 0:
+            self._retired[id(model)] = (model, _device_kind(key[2]), size_mb)
+            return None
+        return model
+
+    def peek(self, key: PoolKey) -> Optional[Any]:
+        """Like get() without touching LRU order or counters."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.model if entry is not None else None
+
+    def _used_mb(self, device_kind: str) -> float:
+        return sum(
+            e.size_mb for k, e in self._entries.items() if _device_kind(k[2]) == device_kind
+        ) + sum(size for _, kind, size in self._retired.values() if kind == device_kind)
+
+    def make_room(self, key: PoolKey) -> list[Any]:
+        """Evict until `key` fits its device budget; returns evicted models."""
+        kind = _device_kind(key[2])
+        budget = self.budget_mb(kind)
+        needed = self.estimate_mb(key)
+        evicted = []
+        with self._lock:
+            used = self._used_mb(kind)
+            for old_key in list(self._entries):
+                if used + needed <= budget:
+                    break
+                entry = self._entries[old_key]
+                if entry.pinned or old_key == key or _device_kind(old_key[2]) != kind:
+                    continue
+                if self._leases.get(id(entry.model), 0) > 0:
+                    # Still running; evicting it would free nothing.
+                    continue
+                del self._entries[old_key]
+                used -= entry.size_mb
+                evicted.append(entry.model)
+                self.evictions += 1
+                logger.info(f"Model pool: evicted {old_key[0]} ({old_key[1]}, {old_key[2]})")
+            if used + needed > budget:
+                logger.warning(
+                    f"Model pool: {key[0]} ({needed:.0f} MB) does not fit the "
+                    f"{budget:.0f} MB {kind} budget; loading anyway"
+                )
+        return evicted
+
+    def add(
+        self, key: PoolKey, model: Any, pinned: bool = False, lease: bool = False
+    ) -> Optional[Any]:
+        """Insert as most recently used (leased too with `lease`); returns a
+        different model that was held under the same key, for the caller to
+        release."""
+        with self._lock:
+            old = self._entries.pop(key, None)
+            self._entries[key] = _Entry(model, self.estimate_mb(key), pinned)
+            if lease:
+                self._leases[id(model)] = self._leases.get(id(model), 0) + 1
+            if old is None or old.model is not model:
+                self.loads += 1
+            if old is not None and old.model is not model:
+                return self._hand_back(old.model, key, old.size_mb)
+        return None
+
+    def remove(self, key: PoolKey) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            return self._hand_back(entry.model, key, entry.size_mb)
+
+    def pin_only(self, key: Optional[PoolKey]) -> None:
+        """Make `key` the one pinned model (None unpins everything)."""
+        with self._lock:
+            for k, entry in self._entries.items():
+                entry.pinned = k == key
+
+    def drain(self) -> list[Any]:
+        with self._lock:
+            models = []
+            for k, e in self._entries.items():
+                model = self._hand_back(e.model, k, e.size_mb)
+                if model is not None:
+                    models.append(model)
+            self._entries.clear()
+        return models
+
+    def stats(self) -> dict:
+        with self._lock:
+            resident = [
+                {
+                    "model": k[0],
+                    "precision": k[1],
+                    "device": k[2],
+                    "beam_size": k[3],
+                    "size_mb": round(e.size_mb),
+                    "measured": k in self._measured,
+                    "pinned": e.pinned,
+                    "leases": self._leases.get(id(e.model), 0),
+                }
+                for k, e in self._entries.items()
+            ]
+            kinds = {_device_kind(k[2]) for k in self._entries}
+            kinds |= {kind for _, kind, _ in self._retired.values()}
+            used = {kind: round(self._used_mb(kind)) for kind in kinds}
+        budgets = {}
+        for kind in kinds:
+            budget = self.budget_mb(kind)
+            budgets[kind] = round(budget) if budget != float("inf") else None
+        return {
+            "resident": resident,
+            "used_mb": used,
+            "budget_mb": budgets,
+            "loads": self.loads,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "retired_in_use": len(self._retired),
+        }
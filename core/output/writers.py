@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+import io
 import json
+import os
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Iterator, TextIO
 
 from core.logging_config import get_logger
 
@@ -33,63 +38,208 @@ def format_timestamp(seconds: float, delimiter: str = ",") -> str:
     return f"{hours:02d}:{minutes:02d}:{secs:02d}{delimiter}{millis:03d}"
 
 
+class SegmentWriter(ABC):
+    """Writes one output format incrementally to a text stream.
+
+    open() writes the header, append_segment() one segment as soon as it is
+    produced and close() the footer, so memory does not grow with the
+    length of the transcript. Subclasses registered with @register_format
+    become available to write_output, render_output and open_output.
+    """
+
+    name = ""
+    media_type = "text/plain; charset=utf-8"
+
+    def __init__(self, stream: TextIO) -> None:
+        self.stream = stream
+
+    def open(self, language: str | None = None, duration: float | None = None) -> None:
+        pass
+
+    @abstractmethod
+    def append_segment(self, segment: SegmentData) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+_WRITERS: dict[str, type[SegmentWriter]] = {}
+
+
+def register_format(name: str, media_type: str | None = None):
+    """Class decorator adding a SegmentWriter under `name`, which is also the
+    output file suffix. Registering an existing name replaces it."""
+    def decorator(cls: type[SegmentWriter]) -> type[SegmentWriter]:
+        cls.name = name
+        if media_type is not None:
+            cls.media_type = media_type
+        _WRITERS[name] = cls
+        return cls
+    return decorator
+
+
+def available_formats() -> list[str]:
+    return list(_WRITERS)
+
+
+def get_writer(fmt: str) -> type[SegmentWriter]:
+    writer = _WRITERS.get(fmt)
+    if writer is None:
+        raise ValueError(f"Unknown output format: {fmt}")
+    return writer
+
+
+@register_format("txt")
+class TxtWriter(SegmentWriter):
+    def append_segment(self, segment: SegmentData) -> None:
+        self.stream.write(segment.text.strip() + "\n")
+
+
+@register_format("srt", "application/x-subrip; charset=utf-8")
+class SrtWriter(SegmentWriter):
+    def open(self, language: str | None = None, duration: float | None = None) -> None:
+        self._index = 0
+
+    def append_segment(self, segment: SegmentData) -> None:
+        self._index += 1
+        self.stream.write(
+            f"{self._index}\n"
+            f"{format_timestamp(segment.start, ',')} --> "
+            f"{format_timestamp(segment.end, ',')}\n"
+            f"{segment.text.strip()}\n\n"
+        )
+
+
+@register_format("vtt", "text/vtt; charset=utf-8")
+class VttWriter(SegmentWriter):
+    def open(self, language: str | None = None, duration: float | None = None) -> None:
+        self.stream.write("WEBVTT\n\n")
+
+    def append_segment(self, segment: SegmentData) -> None:
+        self.stream.write(
+            f"{format_timestamp(segment.start, '.')} --> "
+            f"{format_timestamp(segment.end, '.')}\n"
+            f"{segment.text.strip()}\n\n"
+        )
+
+
+@register_format("json", "application/json")
+class JsonWriter(SegmentWriter):
+    """Streams the same document json.dumps(indent=2) would produce. When the
+    duration is not known at open() it is written after the segments, taken
+    from the last segment's end."""
+
+    def open(self, language: str | None = None, duration: float | None = None) -> None:
+        self._duration = duration
+        self._count = 0
+        self._last_end: float | None = None
+        self.stream.write(f'{{\n  "language": {json.dumps(language, ensure_ascii=False)},\n')
+        if duration is not None:
+            self.stream.write(f'  "duration": {json.dumps(duration)},\n')
+        self.stream.write('  "segments": [')
+
+    def append_segment(self, segment: SegmentData) -> None:
+        item = json.dumps(
+            {"start": segment.start, "end": segment.end, "text": segment.text.strip()},
+            indent=2,
+            ensure_ascii=False,
+        )
+        self.stream.write(",\n" if self._count else "\n")
+        self.stream.write("\n".join("    " + line for line in item.splitlines()))
+        self._count += 1
+        self._last_end = segment.end
+
+    def close(self) -> None:
+        self.stream.write("\n  ]" if self._count else "]")
+        if self._duration is None:
+            self.stream.write(f',\n  "duration": {json.dumps(self._last_end)}')
+        self.stream.write("\n}")
+
+
+def _render(fmt: str, segments, language: str | None = None,
+            duration: float | None = None) -> str:
+    buf = io.StringIO()
+    writer = get_writer(fmt)(buf)
+    writer.open(language, duration)
+    for segment in segments:
+        writer.append_segment(segment)
+    writer.close()
+    return buf.getvalue()
+
+
+def render_txt(segments: list[SegmentData]) -> str:
+    return _render("txt", segments)
+
+
+def render_srt(segments: list[SegmentData]) -> str:
+    return _render("srt", segments)
+
+
+def render_vtt(segments: list[SegmentData]) -> str:
+    return _render("vtt", segments)
+
+
+def render_json(result: TranscriptionResult) -> str:
+    return _render("json", result.segments, result.language, result.duration)
+
+
+def render_output(result: TranscriptionResult, fmt: str) -> str:
+    """Serialize a result to a registered format in memory."""
+    return _render(fmt, result.segments, result.language, result.duration)
+
+
+@contextmanager
+def open_output(
+    output_file: Path,
+    fmt: str,
+    language: str | None = None,
+    duration: float | None = None,
+) -> Iterator[SegmentWriter]:
+    """Open `output_file` for writing segments one at a time.
+
+    Writes to a .part file next to it and renames it into place only when
+    the block exits cleanly, so an interrupted run never leaves a truncated
+    output that looks finished.
+    """
+    writer_cls = get_writer(fmt)
+    output_file = Path(output_file)
+    part = output_file.with_name(output_file.name + ".part")
+    try:
+        with open(part, "w", encoding="utf-8") as f:
+            writer = writer_cls(f)
+            writer.open(language, duration)
+            yield writer
+            writer.close()
+        os.replace(part, output_file)
+    except BaseException:
+        part.unlink(missing_ok=True)
+        raise
+
+
 def write_txt(segments: list[SegmentData], output_file: Path) -> None:
-    with open(output_file, "w", encoding="utf-8") as f:
-        for segment in segments:
-            f.write(segment.text.strip() + "\n")
+    write_output(TranscriptionResult(text="", segments=segments), output_file, "txt")
 
 
 def write_srt(segments: list[SegmentData], output_file: Path) -> None:
-    with open(output_file, "w", encoding="utf-8") as f:
-        for i, segment in enumerate(segments, 1):
-            f.write(f"{i}\n")
-            f.write(
-                f"{format_timestamp(segment.start, ',')} --> "
-                f"{format_timestamp(segment.end, ',')}\n"
-            )
-            f.write(f"{segment.text.strip()}\n\n")
+    write_output(TranscriptionResult(text="", segments=segments), output_file, "srt")
 
 
 def write_vtt(segments: list[SegmentData], output_file: Path) -> None:
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write("WEBVTT\n\n")
-        for segment in segments:
-            f.write(
-                f"{format_timestamp(segment.start, '.')} --> "
-                f"{format_timestamp(segment.end, '.')}\n"
-            )
-            f.write(f"{segment.text.strip()}\n\n")
+    write_output(TranscriptionResult(text="", segments=segments), output_file, "vtt")
 
 
 def write_json(result: TranscriptionResult, output_file: Path) -> None:
-    output = {
-        "language": result.language,
-        "duration": result.duration,
-        "segments": [
-            {
-                "start": seg.start,
-                "end": seg.end,
-                "text": seg.text.strip(),
-            }
-            for seg in result.segments
-        ],
-    }
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    write_output(result, output_file, "json")
 
 
 def write_output(
     result: TranscriptionResult, output_file: Path, fmt: str
 ) -> None:
-    writers = {
-        "txt": lambda: write_txt(result.segments, output_file),
-        "srt": lambda: write_srt(result.segments, output_file),
-        "vtt": lambda: write_vtt(result.segments, output_file),
-        "json": lambda: write_json(result, output_file),
-    }
-    writer = writers.get(fmt)
-    if writer:
-        writer()
-        logger.info(f"Output written to {output_file}")
-    else:
+    if fmt not in _WRITERS:
         logger.error(f"Unknown output format: {fmt}")
+        return
+    with open_output(output_file, fmt, result.language, result.duration) as writer:
+        for segment in result.segments:
+            writer.append_segment(segment)
+    logger.info(f"Output written to {output_file}")
@@ -2,25 +2,59 @@ from __future__ import annotations
 
 import asyncio
 import base64
+import functools
 import io
+import json
 import logging
+import math
 import os
 import tempfile
 import time
 import wave
+from collections import deque
 from contextlib import asynccontextmanager
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from threading import Event
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
 
 import numpy as np
-from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from fastapi import (
+    FastAPI,
+    File,
+    Form,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+    WebSocket,
+    WebSocketDisconnect,
+)
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 
 from config.server_settings import TranscriptionSettings
+from core.audio.decoding import (
+    decode_bytes_with_pyav,
+    float_to_pcm16,
+    model_input,
+    probe_duration,
+    wav_bytes,
+)
+from core.audio.endpointing import EnergyEndpointer, Utterance
+from core.audio.resampling import StreamingResampler, resample
 from core.models.metadata import ModelMetadata
+from core.output.writers import (
+    SegmentData,
+    TranscriptionResult,
+    available_formats,
+    get_writer,
+    render_output,
+)
+from core.server.jobs import CANCELLED, DONE, FAILED, Job, JobStore, JobStoreFull
+from core.transcription.cache import CacheScope, hash_audio, model_beam_size
+from core.transcription.cancellable import transcribe_with_vad_cancellable
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +65,34 @@ MAX_BEAM_SIZE = 5
 MIN_BATCH_SIZE = 1
 MAX_BATCH_SIZE = 200
 
+DEFAULT_BATCH_WINDOW_MS = 20
+DEFAULT_MAX_BATCH_ITEMS = 8
+DEFAULT_MAX_JOBS = 100
+DEFAULT_MAX_QUEUE_DEPTH = 64
+DEFAULT_MAX_QUEUED_AUDIO_S = 7200
+DEFAULT_REQUEST_TIMEOUT_S = 600
+# Retry-After bounds, and the value used before any throughput is measured.
+DEFAULT_RETRY_AFTER_S = 5
+MAX_RETRY_AFTER_S = 3600
+DISCONNECT_POLL_S = 0.5
+
+# Synthetic clip length for warmup inference.
+WARMUP_CLIP_S = 10
+
+DEFAULT_PARTIAL_INTERVAL_MS = 1000
+MIN_PARTIAL_INTERVAL_MS = 200
+MAX_PARTIAL_INTERVAL_MS = 10000
+# A partial still unfinished this many intervals after it was asked for is
+# stale (a newer one is due), so it gets dropped instead of run.
+PARTIAL_DEADLINE_INTERVALS = 2
+# Close code for a stream refused because the server is saturated.
+WS_TRY_AGAIN_LATER = 1013
+
+_PCM_DTYPES = {
+    "float32": np.float32, "float64": np.float64,
+    "int16": np.int16, "int32": np.int32,
+}
+
 
 class AppState:
     model_manager: Any = None
@@ -39,34 +101,147 @@ class AppState:
     queue: Optional[asyncio.Queue] = None
     worker_task: Optional[asyncio.Task] = None
     cancel_event: Event = Event()
+    cache: Any = None
+    deferred: Deque[Any] = deque()
+    batch_window_s: float = DEFAULT_BATCH_WINDOW_MS / 1000.0
+    max_batch_items: int = DEFAULT_MAX_BATCH_ITEMS
+    jobs: JobStore = JobStore(DEFAULT_MAX_JOBS)
+    streams: int = 0
+    max_queue_depth: int = DEFAULT_MAX_QUEUE_DEPTH
+    max_queued_audio_s: float = float(DEFAULT_MAX_QUEUED_AUDIO_S)
+    request_timeout_s: Optional[float] = float(DEFAULT_REQUEST_TIMEOUT_S)
+    # Admitted requests not yet finished, and their total audio length.
+    admitted: int = 0
+    admitted_seconds: float = 0.0
+    warmup_models: List[str] = []
+    # Set once warmup has finished; the queue worker and /health wait for it.
+    ready: Optional[asyncio.Event] = None
+    warmup_task: Optional[asyncio.Task] = None
 
 
 _state = AppState()
 
 
-def set_app_state(*, model_manager, default_settings: TranscriptionSettings) -> None:
+def set_app_state(
+    *,
+    model_manager,
+    default_settings: TranscriptionSettings,
+    cache=None,
+    batch_window_ms: int = DEFAULT_BATCH_WINDOW_MS,
+    max_batch_items: int = DEFAULT_MAX_BATCH_ITEMS,
+    max_jobs: int = DEFAULT_MAX_JOBS,
+    max_queue_depth: int = DEFAULT_MAX_QUEUE_DEPTH,
+    max_queued_audio_s: int = DEFAULT_MAX_QUEUED_AUDIO_S,
+    request_timeout_s: int = DEFAULT_REQUEST_TIMEOUT_S,
+    warmup_models: Optional[List[str]] = None,
+) -> None:
     _state.model_manager = model_manager
     _state.default_settings = default_settings
+    _state.cache = cache
+    _state.batch_window_s = max(0, batch_window_ms) / 1000.0
+    _state.max_batch_items = max(1, max_batch_items)
+    _state.jobs = JobStore(max_jobs)
+    _state.max_queue_depth = max(1, max_queue_depth)
+    _state.max_queued_audio_s = float(max(1, max_queued_audio_s))
+    _state.request_timeout_s = float(request_timeout_s) if request_timeout_s > 0 else None
+    _state.admitted = 0
+    _state.admitted_seconds = 0.0
+    _state.warmup_models = list(warmup_models or [])
     _state.cancel_event.clear()
     _state.transcription_active = False
 
 
 @dataclass
 class WorkItem:
-    audio_path: Path
+    # An in-memory 16 kHz mono WAV, or a temp file for containers that could
+    # not be decoded in memory.
+    audio: Union[bytes, Path]
     settings: TranscriptionSettings
     model_info: Dict[str, Any]
     future: asyncio.Future
     cleanup_path: bool = True
+    audio_seconds: Optional[float] = None
+    job: Optional[Job] = None
+    # Live stream utterances are never repeated; keep them out of the cache.
+    use_cache: bool = True
+    # Cache digest of the upload as received (see _upload_digest).
+    source_digest: Optional[str] = None
+    # time.monotonic() after which nobody wants the result any more.
+    deadline: Optional[float] = None
+    admitted: bool = False
+    # Set (from the event loop) once the future is cancelled; checked by the
+    # model call in the executor thread between decoder batches.
+    cancel_token: Event = field(default_factory=Event)
+
+    def __post_init__(self) -> None:
+        self.future.add_done_callback(self._on_future_done)
+
+    def _on_future_done(self, future: asyncio.Future) -> None:
+        if future.cancelled():
+            self.cancel_token.set()
+
+    def release(self) -> None:
+        if self.cleanup_path and isinstance(self.audio, Path):
+            try:
+                os.remove(self.audio)
+            except OSError:
+                pass
 
 
-def _resample(audio: np.ndarray, orig_sr: int, target_sr: int = SR) -> np.ndarray:
-    if orig_sr == target_sr:
-        return audio
-    ratio = target_sr / orig_sr
-    n_samples = int(len(audio) * ratio)
-    indices = np.linspace(0, len(audio) - 1, n_samples)
-    return np.interp(indices, np.arange(len(audio)), audio).astype(np.float32)
+def _queue_depth() -> int:
+    return (_state.queue.qsize() if _state.queue else 0) + len(_state.deferred)
+
+
+def _busy(detail: str, backlog_seconds: float) -> HTTPException:
+    """429 whose Retry-After is the time the measured drain rate needs to
+    work off `backlog_seconds` of audio."""
+    rate = _state.jobs.rate
+    if rate:
+        retry = min(MAX_RETRY_AFTER_S, max(1, math.ceil(backlog_seconds / rate)))
+    else:
+        retry = DEFAULT_RETRY_AFTER_S
+    return HTTPException(
+        status_code=429, detail=detail, headers={"Retry-After": str(retry)}
+    )
+
+
+def _check_queue_depth() -> None:
+    # Runs before the upload is decoded or spooled to a temp file.
+    depth = _queue_depth()
+    if depth < _state.max_queue_depth:
+        return
+    per_item = _state.admitted_seconds / max(1, _state.admitted)
+    raise _busy(
+        f"Server busy: {depth} requests queued (limit {_state.max_queue_depth})",
+        per_item * (depth - _state.max_queue_depth + 1),
+    )
+
+
+def _admit(item: WorkItem) -> None:
+    seconds = item.audio_seconds or 0.0
+    excess = _state.admitted_seconds + seconds - _state.max_queued_audio_s
+    # A single recording longer than the limit is still taken when idle.
+    if excess > 0 and _state.admitted:
+        item.release()
+        raise _busy(
+            f"Server busy: {_state.admitted_seconds:.0f} s of audio in flight "
+            f"(limit {_state.max_queued_audio_s:.0f} s)",
+            excess,
+        )
+    item.admitted = True
+    _state.admitted += 1
+    _state.admitted_seconds += seconds
+
+
+def _retire(item: WorkItem) -> None:
+    """Release an item leaving the queue, for whatever reason."""
+    item.release()
+    if item.admitted:
+        item.admitted = False
+        _state.admitted -= 1
+        _state.admitted_seconds = max(
+            0.0, _state.admitted_seconds - (item.audio_seconds or 0.0)
+        )
 
 
 def _to_mono_float32(audio: np.ndarray) -> np.ndarray:
@@ -89,21 +264,39 @@ def _to_mono_float32(audio: np.ndarray) -> np.ndarray:
     return audio
 
 
-def _write_wav(audio: np.ndarray, sr: int) -> Path:
-    tmp = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-    tmp_path = Path(tmp.name)
-    tmp.close()
-
-    pcm = np.clip(audio, -1.0, 1.0)
-    pcm = (pcm * 32767.0).astype(np.int16)
+def _to_wav_bytes(audio: np.ndarray, sample_rate: int) -> bytes:
+    audio = _to_mono_float32(audio)
+    audio = resample(audio, sample_rate, SR)
+    return wav_bytes(float_to_pcm16(audio), SR)
 
-    with wave.open(str(tmp_path), "wb") as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)
-        wf.setframerate(sr)
-        wf.writeframes(pcm.tobytes())
 
-    return tmp_path
+def _read_wav_upload(data: bytes) -> Optional[bytes]:
+    """Decode an uploaded PCM WAV in memory. A 16 kHz mono 16-bit file is
+    passed through untouched; other rates, widths and channel counts are
+    downmixed and resampled here. None if the wave module cannot read it."""
+    try:
+        with wave.open(io.BytesIO(data), "rb") as wf:
+            rate = wf.getframerate()
+            channels = wf.getnchannels()
+            width = wf.getsampwidth()
+            frames = wf.readframes(wf.getnframes())
+    except (wave.Error, EOFError):
+        return None
+
+    if rate == SR and channels == 1 and width == 2:
+        return data
+    if width == 1:
+        audio = (np.frombuffer(frames, np.uint8).astype(np.int16) - 128) << 8
+    elif width == 2:
+        audio = np.frombuffer(frames, np.int16)
+    elif width == 3:
+        raw = np.frombuffer(frames, np.uint8).reshape(-1, 3).astype(np.int32)
+        audio = (raw[:, 0] << 8) | (raw[:, 1] << 16) | (raw[:, 2] << 24)
+    elif width == 4:
+        audio = np.frombuffer(frames, np.int32)
+    else:
+        return None
+    return _to_wav_bytes(audio.reshape(-1, channels), rate)
 
 
 def _detect_format(filename: Optional[str], audio_format: str) -> str:
@@ -126,44 +319,43 @@ def _detect_format(filename: Optional[str], audio_format: str) -> str:
     return "file"
 
 
-def _normalize_to_wav(
+def _normalize_audio(
     data: bytes,
     filename: Optional[str] = None,
     audio_format: str = "auto",
     sample_rate: int = SR,
     dtype: str = "float32",
-) -> Path:
-    """Accept one of several audio payload types, return a path to a 16 kHz mono WAV."""
+) -> Union[bytes, Path]:
+    """Accept one of several audio payload types and return what the model
+    reads: a 16 kHz mono WAV held in memory, or, only for containers that
+    cannot be decoded in memory, a temp file holding the upload."""
     fmt = _detect_format(filename, audio_format)
 
     if fmt == "numpy":
         buf = io.BytesIO(data)
         audio = np.load(buf, allow_pickle=False)
-        audio = _to_mono_float32(audio)
-        audio = _resample(audio, sample_rate, SR)
-        return _write_wav(audio, SR)
+        return _to_wav_bytes(audio, sample_rate)
 
     if fmt == "tensor":
         import torch
         buf = io.BytesIO(data)
         tensor = torch.load(buf, map_location="cpu", weights_only=True)
-        audio = tensor.numpy()
-        audio = _to_mono_float32(audio)
-        audio = _resample(audio, sample_rate, SR)
-        return _write_wav(audio, SR)
+        return _to_wav_bytes(tensor.numpy(), sample_rate)
 
     if fmt == "pcm":
-        np_dtype = {
-            "float32": np.float32, "float64": np.float64,
-            "int16": np.int16, "int32": np.int32,
-        }.get(dtype, np.float32)
+        np_dtype = _PCM_DTYPES.get(dtype, np.float32)
         audio = np.frombuffer(data, dtype=np_dtype)
-        audio = _to_mono_float32(audio)
-        audio = _resample(audio, sample_rate, SR)
-        return _write_wav(audio, SR)
+        return _to_wav_bytes(audio, sample_rate)
 
-    # Fall-through: raw audio container file. Write it verbatim so whisper_s2t
-    # can decode it (it supports the full audio-container zoo via PyAV).
+    wav = _read_wav_upload(data)
+    if wav is not None:
+        return wav
+    pcm = decode_bytes_with_pyav(data, SR)
+    if pcm:
+        return wav_bytes(pcm, SR)
+
+    # Fall-through: a container PyAV is not available for (or cannot read
+    # from memory). Write it verbatim so whisper_s2t can decode it with ffmpeg.
     suffix = Path(filename).suffix if filename else ".wav"
     tmp = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
     tmp_path = Path(tmp.name)
@@ -180,35 +372,34 @@ def _normalize_to_wav(
     return tmp_path
 
 
-def _do_transcription(item: WorkItem) -> Dict[str, Any]:
-    start_time = time.perf_counter()
+def _audio_seconds(audio: Union[bytes, Path]) -> Optional[float]:
+    if isinstance(audio, Path):
+        return probe_duration(audio)
+    try:
+        with wave.open(io.BytesIO(audio), "rb") as wf:
+            return wf.getnframes() / float(wf.getframerate())
+    except (wave.Error, EOFError, ZeroDivisionError):
+        return None
 
-    model_info = item.model_info
-    model_name = model_info["name"]
-    precision = model_info["precision"]
 
-    try:
-        model = _state.model_manager.get_or_load_model_sync(
-            model_name=model_name,
-            precision=precision,
-            device=item.settings.device,
-            beam_size=item.settings.beam_size,
-        )
-    except Exception as e:
-        raise RuntimeError(f"Failed to load model: {e}") from e
+def _segment_data(raw_segments: list) -> List[SegmentData]:
+    segments = []
+    for s in raw_segments:
+        start = float(s.get("start_time", 0.0) or 0.0)
+        end = float(s.get("end_time", start) or start)
+        segments.append(SegmentData(start=start, end=end, text=s.get("text", "")))
+    return segments
 
-    if model is None:
-        raise RuntimeError("Failed to load model")
 
-    out = model.transcribe_with_vad(
-        [str(item.audio_path)],
-        lang_codes=[item.settings.language],
-        tasks=[item.settings.task_mode],
-        initial_prompts=[None],
-        batch_size=item.settings.batch_size,
-    )
+def _batch_key(item: WorkItem) -> Tuple[str, str, int]:
+    """Items with equal keys can share one transcribe_with_vad call; language
+    and task are per-file arguments, so they may differ within a batch."""
+    return (item.settings.model_key, item.settings.device, item.settings.beam_size)
 
-    raw_segments = out[0] if out else []
+
+def _format_result(
+    item: WorkItem, raw_segments: list, elapsed: float
+) -> Dict[str, Any]:
     text_parts = [s.get("text", "").lstrip() for s in raw_segments if s.get("text")]
     text = "\n".join(text_parts)
 
@@ -223,39 +414,282 @@ def _do_transcription(item: WorkItem) -> Dict[str, Any]:
                 }
             )
 
-    elapsed = time.perf_counter() - start_time
-
     return {
         "text": text,
         "segments": segments_out,
         "language": item.settings.language,
         "task": item.settings.task_mode,
-        "model_used": f"{model_name} - {precision}",
+        "model_used": f"{item.model_info['name']} - {item.model_info['precision']}",
         "processing_time_seconds": round(elapsed, 3),
     }
 
 
+def _abandoned(item: WorkItem) -> Optional[Exception]:
+    """Why nobody wants this item's result any more, or None."""
+    if item.cancel_token.is_set():
+        return RuntimeError("Transcription cancelled")
+    if _state.cancel_event.is_set():
+        return RuntimeError("Server shutting down")
+    if item.deadline is not None and time.monotonic() >= item.deadline:
+        return TimeoutError("Request deadline passed during transcription")
+    return None
+
+
+def _run_model(model, items: list, batch_size: int) -> list:
+    out = transcribe_with_vad_cancellable(
+        model,
+        [model_input(item.audio) for item in items],
+        lang_codes=[item.settings.language for item in items],
+        tasks=[item.settings.task_mode for item in items],
+        initial_prompts=[None] * len(items),
+        batch_size=batch_size,
+        is_cancelled=lambda i: _abandoned(items[i]) is not None,
+    )
+    return out + [[] for _ in range(len(items) - len(out))]
+
+
+def _do_transcription_batch(items: list) -> list:
+    """Transcribe compatible WorkItems in one model call.
+
+    Returns one entry per item, in order: the response dict, or the exception
+    that item failed with.
+    """
+    start_time = time.perf_counter()
+
+    model_info = items[0].model_info
+    settings = items[0].settings
+
+    try:
+        # Leased so a model load elsewhere cannot evict it mid-batch.
+        model = _state.model_manager.get_or_load_model_sync(
+            model_name=model_info["name"],
+            precision=model_info["precision"],
+            device=settings.device,
+            beam_size=settings.beam_size,
+            lease=True,
+        )
+    except Exception as e:
+        raise RuntimeError(f"Failed to load model: {e}") from e
+
+    if model is None:
+        raise RuntimeError("Failed to load model")
+    try:
+        return _transcribe_items(model, items, start_time)
+    finally:
+        _state.model_manager.release_model(model)
+
+
+def _transcribe_items(model, items: list, start_time: float) -> list:
+    settings = items[0].settings
+    raw: list = [None] * len(items)
+    cache_keys: list = [None] * len(items)
+    if _state.cache is not None:
+        scope = CacheScope(
+            model_key=settings.model_key,
+            beam_size=model_beam_size(model, settings.beam_size),
+        )
+        for i, item in enumerate(items):
+            if not item.use_cache or item.source_digest is None:
+                continue
+            cache_keys[i] = _state.cache.key(
+                item.source_digest, scope,
+                item.settings.language, item.settings.task_mode,
+            )
+            raw[i] = _state.cache.get(cache_keys[i])
+
+    todo = [i for i in range(len(items)) if raw[i] is None]
+    if todo:
+        batch_size = min(items[i].settings.batch_size for i in todo)
+        try:
+            for i, segments in zip(todo, _run_model(model, [items[i] for i in todo], batch_size)):
+                raw[i] = segments
+        except Exception as e:
+            if len(todo) == 1:
+                raw[todo[0]] = e
+            else:
+                # One bad upload fails the whole call; retry item by item so
+                # the other requests in the batch still get their results.
+                logger.warning(
+                    f"Batched transcription of {len(todo)} requests failed ({e}); "
+                    f"retrying them one at a time"
+                )
+                for i in todo:
+                    if _abandoned(items[i]) is not None:
+                        continue
+                    try:
+                        raw[i] = _run_model(model, [items[i]], items[i].settings.batch_size)[0]
+                    except Exception as item_error:
+                        raw[i] = item_error
+        # Cancelled items stopped part-way; their segments are incomplete.
+        for i in todo:
+            reason = _abandoned(items[i])
+            if reason is not None:
+                raw[i] = reason
+        if _state.cache is not None:
+            for i in todo:
+                if cache_keys[i] is not None and not isinstance(raw[i], Exception):
+                    _state.cache.put(cache_keys[i], raw[i])
+
+    elapsed = time.perf_counter() - start_time
+    for item, r in zip(items, raw):
+        if item.job is not None and not isinstance(r, Exception):
+            # Kept so GET /jobs/{id}/result can render any writer format.
+            item.job.segments = _segment_data(r)
+            item.job.language = item.settings.language
+    return [
+        r if isinstance(r, Exception) else _format_result(item, r, elapsed)
+        for item, r in zip(items, raw)
+    ]
+
+
+async def _next_batch() -> list:
+    """Take the next item plus every compatible item that arrives within the
+    batch window, up to max_batch_items. Incompatible items pulled meanwhile
+    are deferred, in order, and served before anything newer."""
+    first = _state.deferred.popleft() if _state.deferred else await _state.queue.get()
+    batch = [first]
+    key = _batch_key(first)
+
+    for item in list(_state.deferred):
+        if len(batch) >= _state.max_batch_items:
+            return batch
+        if _batch_key(item) == key:
+            _state.deferred.remove(item)
+            batch.append(item)
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + _state.batch_window_s
+    while len(batch) < _state.max_batch_items:
+        remaining = deadline - loop.time()
+        try:
+            if remaining > 0:
+                item = await asyncio.wait_for(_state.queue.get(), remaining)
+            else:
+                # Window over: still take whatever is already waiting.
+                item = _state.queue.get_nowait()
+        except (asyncio.TimeoutError, asyncio.QueueEmpty):
+            break
+        if _batch_key(item) == key:
+            batch.append(item)
+        else:
+            _state.deferred.append(item)
+    return batch
+
+
+def _warm_up_model(model_key: str) -> None:
+    """Load a model into the pool and run synthetic batches through it at
+    batch size 1 and at its catalog-optimal size, so CTranslate2's first-run
+    allocations happen before real traffic."""
+    defaults = _state.default_settings
+    info = ModelMetadata.get_all_models_with_precisions().get(model_key)
+    if info is None:
+        logger.warning(f"Warmup: unknown model '{model_key}'")
+        return
+
+    started = time.perf_counter()
+    with _state.model_manager.leased_model(
+        model_name=info["name"],
+        precision=info["precision"],
+        device=defaults.device,
+        beam_size=defaults.beam_size,
+    ) as model:
+        if model is None:
+            return
+        loaded = time.perf_counter()
+        _run_warmup_batches(model, info, defaults)
+    logger.info(
+        f"Warmed up {model_key}: load {loaded - started:.1f}s, "
+        f"inference {time.perf_counter() - loaded:.1f}s"
+    )
+
+
+def _run_warmup_batches(model, info: dict, defaults) -> None:
+    language = "en" if ModelMetadata.is_english_only(info["name"]) else defaults.language
+    rng = np.random.default_rng(0)
+    clip = wav_bytes(
+        float_to_pcm16(rng.normal(0.0, 0.01, SR * WARMUP_CLIP_S).astype(np.float32)), SR
+    )
+    # transcribe() skips VAD, so the noise still reaches the decoder.
+    run = getattr(model, "transcribe", None) or model.transcribe_with_vad
+    for batch_size in sorted({1, int(info.get("optimal_batch_size") or 1)}):
+        run(
+            [model_input(clip) for _ in range(batch_size)],
+            lang_codes=[language] * batch_size,
+            tasks=["transcribe"] * batch_size,
+            initial_prompts=[None] * batch_size,
+            batch_size=batch_size,
+        )
+
+
+async def _warm_up() -> None:
+    loop = asyncio.get_running_loop()
+    try:
+        for model_key in _state.warmup_models:
+            try:
+                await loop.run_in_executor(None, _warm_up_model, model_key)
+            except Exception as e:
+                logger.warning(f"Warmup of {model_key} failed: {e}")
+    finally:
+        _state.ready.set()
+        logger.info("Transcription server ready")
+
+
 async def _queue_worker():
+    # Requests queue up during warmup but are not run alongside it, so
+    # nothing races the warmup for the same model load.
+    await _state.ready.wait()
     while True:
-        item: WorkItem = await _state.queue.get()
+        batch = await _next_batch()
+        # Drop items whose caller already gave up (e.g. a cancelled job) or
+        # whose deadline passed while they waited.
+        live = []
+        now = time.monotonic()
+        for item in batch:
+            if not item.future.done() and item.deadline is not None and now >= item.deadline:
+                item.future.set_exception(
+                    TimeoutError("Request deadline passed while queued")
+                )
+            if item.future.done():
+                _retire(item)
+                _state.queue.task_done()
+            else:
+                live.append(item)
+        batch = live
+        if not batch:
+            continue
+
+        for item in batch:
+            if item.job is not None:
+                _state.jobs.mark_running(item.job)
         _state.transcription_active = True
+        started = time.perf_counter()
         try:
             loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(None, _do_transcription, item)
-            if not item.future.done():
-                item.future.set_result(result)
+            results = await loop.run_in_executor(None, _do_transcription_batch, batch)
+            if len(batch) > 1:
+                logger.info(f"Transcribed {len(batch)} requests in one batch")
+            _state.jobs.record_throughput(
+                sum(item.audio_seconds or 0.0 for item in batch),
+                time.perf_counter() - started,
+            )
+            for item, result in zip(batch, results):
+                if item.future.done():
+                    continue
+                if isinstance(result, Exception):
+                    logger.error(f"Transcription failed: {result}")
+                    item.future.set_exception(result)
+                else:
+                    item.future.set_result(result)
         except Exception as e:
             logger.error(f"Transcription failed: {e}", exc_info=True)
-            if not item.future.done():
-                item.future.set_exception(e)
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(e)
         finally:
             _state.transcription_active = False
-            if item.cleanup_path:
-                try:
-                    os.remove(item.audio_path)
-                except OSError:
-                    pass
-            _state.queue.task_done()
+            for item in batch:
+                _retire(item)
+                _state.queue.task_done()
 
 
 def _resolve_model_key(
@@ -339,6 +773,337 @@ class RawTranscribeRequest(BaseModel):
     beam_size: Optional[int] = None
     batch_size: Optional[int] = None
     include_timestamps: Optional[bool] = None
+    timeout_seconds: Optional[float] = None
+
+
+def _upload_digest(
+    data: bytes, filename: Optional[str], audio_format: str, sample_rate: int, dtype: str
+) -> str:
+    """Cache digest of the upload bytes as received, the same scope batch and
+    the GUI use for a source file, so a recording hits the cache whichever
+    way it came in. Raw sample uploads do not carry their rate or dtype,
+    so those are folded in."""
+    digest = hash_audio(data)
+    fmt = _detect_format(filename, audio_format)
+    if fmt in ("numpy", "tensor", "pcm"):
+        digest = hash_audio(f"{digest}:{fmt}:{sample_rate}:{dtype}".encode())
+    return digest
+
+
+def _prepare_item(
+    data: bytes,
+    filename: Optional[str],
+    audio_format: str,
+    sample_rate: int,
+    dtype: str,
+    settings_args: tuple,
+    decode_error: str = "Failed to process audio",
+    timeout: Optional[float] = None,
+) -> WorkItem:
+    if not data:
+        raise HTTPException(status_code=400, detail="Empty audio data")
+
+    try:
+        settings, model_info = _build_settings(*settings_args)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    _check_queue_depth()
+    try:
+        payload = _normalize_audio(
+            data,
+            filename=filename,
+            audio_format=audio_format,
+            sample_rate=sample_rate,
+            dtype=dtype,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"{decode_error}: {e}")
+
+    item = WorkItem(
+        audio=payload,
+        settings=settings,
+        model_info=model_info,
+        future=asyncio.get_event_loop().create_future(),
+        audio_seconds=_audio_seconds(payload),
+    )
+    if _state.cache is not None:
+        item.source_digest = _upload_digest(
+            data, filename, audio_format, sample_rate, dtype
+        )
+    if timeout is not None and timeout > 0:
+        item.deadline = time.monotonic() + timeout
+    _admit(item)
+    return item
+
+
+def _sync_timeout(timeout_seconds: Optional[float]) -> Optional[float]:
+    """Deadline for a request whose client waits on the connection."""
+    if timeout_seconds is not None and timeout_seconds > 0:
+        return timeout_seconds
+    return _state.request_timeout_s
+
+
+def _prepare_raw_item(request: RawTranscribeRequest, timeout: Optional[float]) -> WorkItem:
+    try:
+        data = base64.b64decode(request.audio_data)
+    except Exception as e:
+        raise HTTPException(
+            status_code=400, detail=f"Failed to decode/process audio: {e}"
+        )
+    return _prepare_item(
+        data, None, request.audio_format, request.sample_rate, request.dtype,
+        (request.model, request.precision, request.device,
+         request.language, request.task_mode,
+         request.beam_size, request.batch_size, request.include_timestamps),
+        decode_error="Failed to decode/process audio",
+        timeout=timeout,
+    )
+
+
+async def _cancel_on_disconnect(request: Request, item: WorkItem) -> None:
+    while not item.future.done():
+        if await request.is_disconnected():
+            logger.info("Client disconnected; cancelling its transcription")
+            item.future.cancel()
+            return
+        await asyncio.sleep(DISCONNECT_POLL_S)
+
+
+async def _await_result(item: WorkItem, request: Request) -> Dict[str, Any]:
+    await _state.queue.put(item)
+
+    remaining = None
+    if item.deadline is not None:
+        remaining = max(0.0, item.deadline - time.monotonic())
+    # Cancelling the future drops a queued item and stops a running one at
+    # the next decoder batch (see WorkItem.cancel_token).
+    watcher = asyncio.create_task(_cancel_on_disconnect(request, item))
+    try:
+        done, _ = await asyncio.wait({item.future}, timeout=remaining)
+    finally:
+        watcher.cancel()
+    if not done:
+        item.future.cancel()
+        raise HTTPException(
+            status_code=504, detail="Transcription did not finish before the request deadline"
+        )
+    if item.future.cancelled():
+        # Nobody is listening any more; the status is for the access log.
+        # 499 is nginx's "client closed request" (see SERVER_API_GUIDE).
+        raise HTTPException(status_code=499, detail="Client closed request")
+    try:
+        return item.future.result()
+    except TimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Transcription failed: {e}")
+
+
+def _on_job_done(job: Job, future: asyncio.Future) -> None:
+    if future.cancelled():
+        _state.jobs.finish(job, CANCELLED)
+    elif future.exception() is not None:
+        _state.jobs.finish(job, FAILED, error=str(future.exception()))
+    else:
+        _state.jobs.finish(job, DONE, response=future.result())
+
+
+def _submit_job(item: WorkItem) -> Dict[str, Any]:
+    job = Job(audio_seconds=item.audio_seconds, future=item.future)
+    try:
+        _state.jobs.add(job)
+    except JobStoreFull as e:
+        _retire(item)
+        raise HTTPException(status_code=503, detail=f"Too many unfinished jobs: {e}")
+    item.job = job
+    item.future.add_done_callback(functools.partial(_on_job_done, job))
+    _state.queue.put_nowait(item)
+    return _state.jobs.describe(job)
+
+
+def _get_job(job_id: str) -> Job:
+    job = _state.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+
+def _pcm_to_float(data: bytes, np_dtype) -> np.ndarray:
+    audio = np.frombuffer(data, dtype=np_dtype)
+    if np.issubdtype(np_dtype, np.integer):
+        return audio.astype(np.float32) / float(-np.iinfo(np_dtype).min)
+    # Per-frame peak normalisation would pump the level; clip instead.
+    return np.clip(audio, -1.0, 1.0).astype(np.float32)
+
+
+def _is_end_message(text: Optional[str]) -> bool:
+    """Clients end a stream with the text frame "end" or {"type": "end"}."""
+    if not text:
+        return False
+    text = text.strip()
+    if text == "end":
+        return True
+    try:
+        message = json.loads(text)
+    except ValueError:
+        return False
+    return isinstance(message, dict) and message.get("type") == "end"
+
+
+class _StreamSession:
+    """One /ws/stream connection.
+
+    Incoming PCM is resampled to 16 kHz and run through an EnergyEndpointer.
+    Each closed utterance becomes a WorkItem on the shared queue, so live
+    streams are micro-batched with each other and with uploads. While an
+    utterance is open, a partial transcription of it so far is requested
+    every `partial_interval` seconds (one at a time). Results are sent back
+    in submission order by a separate sender task.
+
+    Utterances pass the same queue-depth and audio-seconds admission as
+    uploads. A partial that is not admitted is skipped; a final that is not
+    admitted raises the 429 HTTPException, and the stream is closed with
+    "try again later".
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        settings: TranscriptionSettings,
+        model_info: Dict[str, Any],
+        sample_rate: int,
+        np_dtype,
+        partials: bool,
+        partial_interval: float,
+    ) -> None:
+        self.websocket = websocket
+        self.settings = settings
+        self.model_info = model_info
+        self.np_dtype = np_dtype
+        self.itemsize = np.dtype(np_dtype).itemsize
+        self.resampler = StreamingResampler(sample_rate, SR)
+        self.endpointer = EnergyEndpointer(sample_rate=SR)
+        self.partials = partials
+        self.partial_interval = partial_interval
+        self._carry = b""
+        self._utterance = 0
+        self._partial_end = 0.0
+        self._partial: Optional[asyncio.Future] = None
+        self._outbox: asyncio.Queue = asyncio.Queue()
+        self._pending: List[asyncio.Future] = []
+
+    def _submit(self, utt: Utterance, partial: bool = False) -> asyncio.Future:
+        _check_queue_depth()
+        item = WorkItem(
+            audio=wav_bytes(float_to_pcm16(utt.audio), SR),
+            settings=self.settings,
+            model_info=self.model_info,
+            future=asyncio.get_event_loop().create_future(),
+            audio_seconds=len(utt.audio) / float(SR),
+            use_cache=False,
+        )
+        if partial:
+            timeout = PARTIAL_DEADLINE_INTERVALS * self.partial_interval
+        else:
+            timeout = _state.request_timeout_s
+        if timeout:
+            item.deadline = time.monotonic() + timeout
+        _admit(item)
+        _state.queue.put_nowait(item)
+        self._pending.append(item.future)
+        return item.future
+
+    def _final(self, utt: Utterance) -> None:
+        if self._partial is not None and not self._partial.done():
+            # Superseded: the queue worker drops it if it has not started.
+            self._partial.cancel()
+        self._partial = None
+        self._partial_end = 0.0
+        self._outbox.put_nowait(("final", self._utterance, utt, self._submit(utt)))
+        self._utterance += 1
+
+    def _maybe_partial(self) -> None:
+        if not self.partials or (self._partial is not None and not self._partial.done()):
+            return
+        current = self.endpointer.current()
+        if current is None:
+            return
+        if current.end - max(self._partial_end, current.start) < self.partial_interval:
+            return
+        self._partial_end = current.end
+        try:
+            self._partial = self._submit(current, partial=True)
+        except HTTPException:
+            # Busy: skip this partial; the final still gets its turn.
+            return
+        self._outbox.put_nowait(("partial", self._utterance, current, self._partial))
+
+    def feed(self, data: bytes) -> None:
+        data = self._carry + data
+        usable = len(data) - len(data) % self.itemsize
+        self._carry = data[usable:]
+        if not usable:
+            return
+        audio = self.resampler.process(_pcm_to_float(data[:usable], self.np_dtype))
+        for utt in self.endpointer.feed(audio):
+            self._final(utt)
+        self._maybe_partial()
+
+    def finish(self) -> None:
+        for utt in self.endpointer.feed(self.resampler.flush()):
+            self._final(utt)
+        utt = self.endpointer.flush()
+        if utt is not None and utt.audio.size:
+            self._final(utt)
+        self._outbox.put_nowait(None)
+
+    def abort(self) -> None:
+        for future in self._pending:
+            if not future.done():
+                future.cancel()
+        self._outbox.put_nowait(None)
+
+    async def send_results(self) -> None:
+        while True:
+            entry = await self._outbox.get()
+            if entry is None:
+                return
+            kind, index, utt, future = entry
+            await asyncio.wait((future,))
+            self._pending.remove(future)
+            if future.cancelled():
+                if kind == "final":
+                    return
+                continue
+            if future.exception() is not None:
+                if kind == "final":
+                    await self.websocket.send_json(
+                        {"type": "error", "utterance": index,
+                         "detail": f"Transcription failed: {future.exception()}"}
+                    )
+                continue
+            result = future.result()
+            message = {
+                "type": kind,
+                "utterance": index,
+                "start": round(utt.start, 3),
+                "end": round(utt.end, 3),
+                "text": result["text"],
+            }
+            if kind == "final":
+                message["segments"] = [
+                    {
+                        "start": round(utt.start + s["start"], 3),
+                        "end": round(utt.start + s["end"], 3),
+                        "text": s["text"],
+                    }
+                    for s in result["segments"]
+                ]
+                message["processing_time_seconds"] = result["processing_time_seconds"]
+            await self.websocket.send_json(message)
 
 
 def create_app() -> FastAPI:
@@ -346,16 +1111,26 @@ def create_app() -> FastAPI:
     @asynccontextmanager
     async def lifespan(app: FastAPI):
         _state.queue = asyncio.Queue()
+        _state.deferred = deque()
         _state.cancel_event.clear()
+        _state.ready = asyncio.Event()
+        _state.warmup_task = asyncio.create_task(_warm_up())
         _state.worker_task = asyncio.create_task(_queue_worker())
         logger.info("Transcription queue worker started")
         yield
+        if _state.warmup_task and not _state.warmup_task.done():
+            _state.warmup_task.cancel()
         if _state.worker_task:
             _state.worker_task.cancel()
             try:
                 await _state.worker_task
             except asyncio.CancelledError:
                 pass
+        while _state.deferred:
+            item = _state.deferred.popleft()
+            if not item.future.done():
+                item.future.set_exception(RuntimeError("Server shutting down"))
+            _retire(item)
         if _state.queue:
             while not _state.queue.empty():
                 try:
@@ -364,6 +1139,7 @@ def create_app() -> FastAPI:
                         item.future.set_exception(
                             RuntimeError("Server shutting down")
                         )
+                    _retire(item)
                 except asyncio.QueueEmpty:
                     break
         logger.info("Transcription server shut down")
@@ -389,6 +1165,11 @@ def create_app() -> FastAPI:
 
     @app.get("/health")
     async def health():
+        if _state.ready is None or not _state.ready.is_set():
+            return JSONResponse(
+                status_code=503,
+                content={"status": "warming_up", "models": _state.warmup_models},
+            )
         return {"status": "ok"}
 
     @app.get("/models")
@@ -413,12 +1194,24 @@ def create_app() -> FastAPI:
     async def status():
         return {
             "server_running": True,
-            "queue_depth": _state.queue.qsize() if _state.queue else 0,
+            "ready": _state.ready is not None and _state.ready.is_set(),
+            "queue_depth": _queue_depth(),
             "transcription_active": _state.transcription_active,
+            "cache": _state.cache.stats() if _state.cache is not None else None,
+            "jobs": _state.jobs.counts(),
+            "streams": _state.streams,
+            "queued_audio_seconds": round(_state.admitted_seconds, 1),
+            "drain_rate": round(_state.jobs.rate, 2) if _state.jobs.rate else None,
+            "models": (
+                _state.model_manager.pool_stats()
+                if hasattr(_state.model_manager, "pool_stats")
+                else None
+            ),
         }
 
     @app.post("/transcribe")
     async def transcribe(
+        http_request: Request,
         audio: UploadFile = File(...),
         audio_format: Optional[str] = Form("auto"),
         sample_rate: Optional[int] = Form(SR),
@@ -431,104 +1224,174 @@ def create_app() -> FastAPI:
         beam_size: Optional[int] = Form(None),
         batch_size: Optional[int] = Form(None),
         include_timestamps: Optional[bool] = Form(None),
+        timeout_seconds: Optional[float] = Form(None),
     ):
-        try:
-            data = await audio.read()
-            if not data:
-                raise HTTPException(status_code=400, detail="Empty audio data")
-
-            audio_path = _normalize_to_wav(
-                data,
-                filename=audio.filename,
-                audio_format=audio_format,
-                sample_rate=sample_rate,
-                dtype=dtype,
-            )
-        except HTTPException:
-            raise
-        except Exception as e:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Failed to process audio: {e}",
-            )
-
-        try:
-            settings, model_info = _build_settings(
-                model, precision, device, language, task_mode,
-                beam_size, batch_size, include_timestamps,
-            )
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=str(e))
-
-        loop = asyncio.get_event_loop()
-        future = loop.create_future()
-
-        item = WorkItem(
-            audio_path=audio_path,
-            settings=settings,
-            model_info=model_info,
-            future=future,
+        item = _prepare_item(
+            await audio.read(), audio.filename, audio_format, sample_rate, dtype,
+            (model, precision, device, language, task_mode,
+             beam_size, batch_size, include_timestamps),
+            timeout=_sync_timeout(timeout_seconds),
         )
-        await _state.queue.put(item)
-
-        try:
-            result = await future
-        except RuntimeError as e:
-            raise HTTPException(status_code=503, detail=str(e))
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Transcription failed: {e}")
-
-        return result
+        return await _await_result(item, http_request)
 
     @app.post("/transcribe/raw")
-    async def transcribe_raw(request: RawTranscribeRequest):
-        try:
-            data = base64.b64decode(request.audio_data)
-            if not data:
-                raise HTTPException(status_code=400, detail="Empty audio data")
-
-            audio_path = _normalize_to_wav(
-                data,
-                filename=None,
-                audio_format=request.audio_format,
-                sample_rate=request.sample_rate,
-                dtype=request.dtype,
-            )
-        except HTTPException:
-            raise
-        except Exception as e:
+    async def transcribe_raw(request: RawTranscribeRequest, http_request: Request):
+        return await _await_result(
+            _prepare_raw_item(request, _sync_timeout(request.timeout_seconds)),
+            http_request,
+        )
+
+    @app.post("/jobs", status_code=202)
+    async def create_job(
+        audio: UploadFile = File(...),
+        audio_format: Optional[str] = Form("auto"),
+        sample_rate: Optional[int] = Form(SR),
+        dtype: Optional[str] = Form("float32"),
+        model: Optional[str] = Form(None),
+        precision: Optional[str] = Form(None),
+        device: Optional[str] = Form(None),
+        language: Optional[str] = Form(None),
+        task_mode: Optional[str] = Form(None),
+        beam_size: Optional[int] = Form(None),
+        batch_size: Optional[int] = Form(None),
+        include_timestamps: Optional[bool] = Form(None),
+        timeout_seconds: Optional[float] = Form(None),
+    ):
+        item = _prepare_item(
+            await audio.read(), audio.filename, audio_format, sample_rate, dtype,
+            (model, precision, device, language, task_mode,
+             beam_size, batch_size, include_timestamps),
+            timeout=timeout_seconds,
+        )
+        return _submit_job(item)
+
+    @app.post("/jobs/raw", status_code=202)
+    async def create_job_raw(request: RawTranscribeRequest):
+        return _submit_job(_prepare_raw_item(request, request.timeout_seconds))
+
+    @app.get("/jobs/{job_id}")
+    async def job_status(job_id: str):
+        return _state.jobs.describe(_get_job(job_id))
+
+    @app.get("/jobs/{job_id}/result")
+    async def job_result(job_id: str, format: Optional[str] = Query(None)):
+        job = _get_job(job_id)
+        if job.status != DONE:
+            detail = f"Job is {job.status}"
+            if job.error:
+                detail = f"{detail}: {job.error}"
+            raise HTTPException(status_code=409, detail=detail)
+        if format is None:
+            return job.response
+        if format not in available_formats():
             raise HTTPException(
                 status_code=400,
-                detail=f"Failed to decode/process audio: {e}",
+                detail=f"Unknown format '{format}'. Available: {available_formats()}",
             )
+        result = TranscriptionResult(
+            text=job.response.get("text", "") if job.response else "",
+            segments=job.segments,
+            language=job.language,
+            duration=job.segments[-1].end if job.segments else None,
+        )
+        return PlainTextResponse(
+            render_output(result, format), media_type=get_writer(format).media_type
+        )
 
+    @app.delete("/jobs/{job_id}")
+    async def delete_job(job_id: str):
+        job = _get_job(job_id)
+        if job.active:
+            # A queued job is dropped before it reaches the model; a running
+            # one stops at the next decoder batch.
+            if job.future is not None:
+                job.future.cancel()
+            _state.jobs.finish(job, CANCELLED)
+            return _state.jobs.describe(job)
+        _state.jobs.remove(job_id)
+        return {"job_id": job_id, "status": "deleted"}
+
+    @app.websocket("/ws/stream")
+    async def stream(
+        websocket: WebSocket,
+        sample_rate: int = SR,
+        dtype: str = "int16",
+        model: Optional[str] = None,
+        precision: Optional[str] = None,
+        device: Optional[str] = None,
+        language: Optional[str] = None,
+        task_mode: Optional[str] = None,
+        beam_size: Optional[int] = None,
+        partials: bool = True,
+        partial_interval_ms: int = DEFAULT_PARTIAL_INTERVAL_MS,
+    ):
+        await websocket.accept()
         try:
+            if dtype not in _PCM_DTYPES:
+                raise ValueError(
+                    f"Unknown dtype '{dtype}'. Available: {list(_PCM_DTYPES)}"
+                )
             settings, model_info = _build_settings(
-                request.model, request.precision, request.device,
-                request.language, request.task_mode,
-                request.beam_size, request.batch_size, request.include_timestamps,
+                model, precision, device, language, task_mode, beam_size, None, True
+            )
+            session = _StreamSession(
+                websocket,
+                settings,
+                model_info,
+                sample_rate,
+                _PCM_DTYPES[dtype],
+                partials,
+                _clamp(
+                    partial_interval_ms, MIN_PARTIAL_INTERVAL_MS, MAX_PARTIAL_INTERVAL_MS
+                ) / 1000.0,
             )
         except ValueError as e:
-            raise HTTPException(status_code=400, detail=str(e))
-
-        loop = asyncio.get_event_loop()
-        future = loop.create_future()
-
-        item = WorkItem(
-            audio_path=audio_path,
-            settings=settings,
-            model_info=model_info,
-            future=future,
-        )
-        await _state.queue.put(item)
+            await websocket.send_json({"type": "error", "detail": str(e)})
+            await websocket.close(code=1008)
+            return
 
+        _state.streams += 1
+        sender = asyncio.create_task(session.send_results())
         try:
-            result = await future
-        except RuntimeError as e:
-            raise HTTPException(status_code=503, detail=str(e))
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    session.abort()
+                    break
+                if message.get("bytes"):
+                    session.feed(message["bytes"])
+                elif _is_end_message(message.get("text")):
+                    # Flush the open utterance, send the remaining results, close.
+                    session.finish()
+                    await sender
+                    await websocket.send_json({"type": "end"})
+                    await websocket.close()
+                    break
+        except WebSocketDisconnect:
+            session.abort()
+        except HTTPException as e:
+            # Admission refused a final utterance.
+            session.abort()
+            retry_after = int((e.headers or {}).get("Retry-After", DEFAULT_RETRY_AFTER_S))
+            logger.warning(f"Closing stream: {e.detail}")
+            try:
+                await websocket.send_json(
+                    {"type": "error", "detail": e.detail, "retry_after": retry_after}
+                )
+                await websocket.close(
+                    code=WS_TRY_AGAIN_LATER, reason=f"Server busy; retry in {retry_after} s"
+                )
+            except Exception:
+                pass
         except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Transcription failed: {e}")
-
-        return result
+            logger.error(f"Stream failed: {e}", exc_info=True)
+            session.abort()
+        finally:
+            _state.streams -= 1
+            if not sender.done():
+                try:
+                    await sender
+                except Exception:
+                    pass
 
     return app
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from core.logging_config import get_logger
+from core.output.writers import SegmentData
+
+logger = get_logger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+
+class JobStoreFull(Exception):
+    """Every retained job is still queued or running."""
+
+
+@dataclass
+class Job:
+    audio_seconds: Optional[float] = None
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    response: Optional[Dict[str, Any]] = None
+    segments: List[SegmentData] = field(default_factory=list)
+    language: Optional[str] = None
+    error: Optional[str] = None
+    # The WorkItem's future; cancelling it drops a queued job.
+    future: Any = field(default=None, repr=False)
+
+    @property
+    def active(self) -> bool:
+        return self.status in ACTIVE_STATES
+
+
+class JobStore:
+    """Bounded, insertion-ordered store of API jobs.
+
+    Finished jobs (done, failed or cancelled) are evicted oldest first once
+    more than `max_jobs` are held; queued and running jobs are never evicted.
+    Also tracks a moving average of audio-seconds transcribed per wall-second
+    to report progress and ETA, since whisper_s2t has no progress callback.
+    """
+
+    def __init__(self, max_jobs: int = 100) -> None:
+        self.max_jobs = max(1, max_jobs)
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._rate: Optional[float] = None
+
+    def add(self, job: Job) -> None:
+        with self._lock:
+            if len(self._jobs) >= self.max_jobs:
+                for old_id in [j.id for j in self._jobs.values() if not j.active]:
+                    del self._jobs[old_id]
+                    if len(self._jobs) < self.max_jobs:
+                        break
+            if len(self._jobs) >= self.max_jobs:
+                raise JobStoreFull(f"{len(self._jobs)} jobs are still queued or running")
+            self._jobs[job.id] = job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def remove(self, job_id: str) -> None:
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def mark_running(self, job: Job) -> None:
+        if job.status == QUEUED:
+            job.status = RUNNING
+            job.started_at = time.time()
+
+    def finish(
+        self,
+        job: Job,
+        status: str,
+        response: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        if not job.active:
+            return
+        job.status = status
+        job.finished_at = time.time()
+        job.response = response
+        job.error = error
+
+    def record_throughput(self, audio_seconds: float, wall_seconds: float) -> None:
+        if audio_seconds <= 0 or wall_seconds <= 0:
+            return
+        rate = audio_seconds / wall_seconds
+        with self._lock:
+            self._rate = rate if self._rate is None else 0.7 * self._rate + 0.3 * rate
+
+    @property
+    def rate(self) -> Optional[float]:
+        """Recent audio-seconds transcribed per wall-second, if measured."""
+        return self._rate
+
+    def _remaining(self, job: Job, now: float) -> Optional[float]:
+        if job.audio_seconds is None or self._rate is None:
+            return None
+        if job.status == RUNNING and job.started_at is not None:
+            done = (now - job.started_at) * self._rate
+            return max(0.0, job.audio_seconds - done) / self._rate
+        return job.audio_seconds / self._rate
+
+    def progress(self, job: Job) -> tuple[float, Optional[float]]:
+        """(fraction done, seconds until finished) for a job."""
+        if not job.active:
+            return (1.0 if job.status == DONE else 0.0), 0.0
+        now = time.time()
+        own = self._remaining(job, now)
+        if own is None:
+            return 0.0, None
+        fraction = 0.0
+        if job.status == RUNNING and job.audio_seconds:
+            fraction = min(0.99, 1.0 - own * self._rate / job.audio_seconds)
+            return max(0.0, fraction), own
+
+        # Queued: everything submitted earlier has to finish first.
+        eta = own
+        with self._lock:
+            ahead = [j for j in self._jobs.values() if j.active and j.created_at < job.created_at]
+        for other in ahead:
+            remaining = self._remaining(other, now)
+            if remaining is not None:
+                eta += remaining
+        return fraction, eta
+
+    def describe(self, job: Job) -> Dict[str, Any]:
+        fraction, eta = self.progress(job)
+        return {
+            "job_id": job.id,
+            "status": job.status,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
+            "audio_seconds": (
+                round(job.audio_seconds, 3) if job.audio_seconds is not None else None
+            ),
+            "progress": round(fraction, 3),
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+            "error": job.error,
+        }
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            out: Dict[str, int] = {}
+            for job in self._jobs.values():
+                out[job.status] = out.get(job.status, 0) + 1
+            return out
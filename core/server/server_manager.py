@@ -23,7 +23,18 @@ class ServerManager(QObject):
         self._port: int = 0
 
     def start_server(
-        self, port: int, model_manager, default_settings: TranscriptionSettings
+        self,
+        port: int,
+        model_manager,
+        default_settings: TranscriptionSettings,
+        cache=None,
+        batch_window_ms: int = 20,
+        max_batch_items: int = 8,
+        max_jobs: int = 100,
+        max_queue_depth: int = 64,
+        max_queued_audio_s: int = 7200,
+        request_timeout_s: int = 600,
+        warmup_models: Optional[list[str]] = None,
     ) -> None:
         if self.is_running():
             self.server_error.emit("Server is already running")
@@ -36,6 +47,14 @@ class ServerManager(QObject):
             set_app_state(
                 model_manager=model_manager,
                 default_settings=default_settings,
+                cache=cache,
+                batch_window_ms=batch_window_ms,
+                max_batch_items=max_batch_items,
+                max_jobs=max_jobs,
+                max_queue_depth=max_queue_depth,
+                max_queued_audio_s=max_queued_audio_s,
+                request_timeout_s=request_timeout_s,
+                warmup_models=warmup_models,
             )
 
             app = create_app()
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def free_cuda_cache() -> None:
+    try:
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except Exception:
+        pass
+
+
+class AdaptiveBatchSize:
+    """Batch size controller for long unattended runs.
+
+    On OOM the size is halved and the caller retries the same work. After
+    `probe_after` consecutive successes it probes upward again: doubling, but
+    never past `ceiling` (the size the user asked for) and never back onto a
+    size that has already run out of memory in this run. The largest size
+    that completed a full run of successes is kept as `stable`.
+    """
+
+    def __init__(
+        self,
+        ceiling: int,
+        remembered: Optional[int] = None,
+        probe_after: int = 8,
+    ) -> None:
+        self.ceiling = max(1, ceiling)
+        self.remembered = remembered
+        self.current = min(self.ceiling, remembered) if remembered else self.ceiling
+        self.probe_after = max(1, probe_after)
+        self.stable: Optional[int] = None
+        self.oom_seen = False
+        self._oom_floor: Optional[int] = None
+        self._successes = 0
+
+    def on_oom(self) -> bool:
+        """Record an OOM at the current size. False if already at 1."""
+        self.oom_seen = True
+        if self._oom_floor is None or self.current < self._oom_floor:
+            self._oom_floor = self.current
+        if self.current <= 1:
+            return False
+        self.current = max(1, self.current // 2)
+        self._successes = 0
+        logger.warning(f"Out of memory; batch size reduced to {self.current}")
+        return True
+
+    def on_success(self) -> None:
+        self._successes += 1
+        if self._successes < self.probe_after:
+            return
+        self.stable = max(self.stable or 0, self.current)
+        target = min(self.ceiling, self.current * 2)
+        if self._oom_floor is not None:
+            target = min(target, (self.current + self._oom_floor) // 2)
+        if target > self.current:
+            logger.info(f"Probing batch size {self.current} -> {target}")
+            self.current = target
+            self._successes = 0
+
+    def to_remember(self) -> Optional[int]:
+        """Size worth persisting for this model, or None to leave it alone."""
+        if self.oom_seen:
+            return self.stable or self.current
+        if self.remembered and self.stable and self.stable > self.remembered:
+            return self.stable
+        return None
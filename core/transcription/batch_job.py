@@ -0,0 +1,660 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Event
+from typing import Callable, Iterator, Optional
+
+from core.audio.decoding import decode_to_pcm16, model_input, wav_bytes
+from core.logging_config import get_logger
+from core.output.writers import SegmentData, open_output
+from core.transcription.adaptive import AdaptiveBatchSize, free_cuda_cache
+from core.transcription.cache import CacheScope, TranscriptionCache, hash_audio
+from core.transcription.manifest import JobManifest, manifest_location
+from core.transcription.pipeline import BackgroundWriter, Prefetcher
+from core.transcription.scheduler import (
+    SCHEDULE_POLICIES,
+    EtaEstimator,
+    format_duration,
+    order_files,
+    probe_durations,
+    probe_in_background,
+)
+from core.transcription.workers import (
+    DONE,
+    FAILED,
+    LOAD_FAILED,
+    READY,
+    CpuWorkerPool,
+    WorkerModelSpec,
+    split_thread_budget,
+)
+from utils import get_optimal_cpu_threads
+
+logger = get_logger(__name__)
+
+_DECODE_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))
+
+
+def _is_oom_error(exc: Exception) -> bool:
+    try:
+        import torch
+        if isinstance(exc, torch.cuda.OutOfMemoryError):
+            return True
+    except (ImportError, AttributeError):
+        pass
+    if isinstance(exc, RuntimeError):
+        msg = str(exc).lower()
+        if "out of memory" in msg or ("cuda" in msg and "alloc" in msg):
+            return True
+    return False
+
+
+def _unique_output_path(output_file: Path, seen: set[str]) -> Path:
+    """Avoid collisions when multiple inputs map to the same output path
+    (e.g. a.mp3 and a.wav both -> a.txt in the same folder). Within-batch
+    only; a pre-existing file on disk is still overwritten, as before."""
+    key = str(output_file).lower()
+    if key not in seen:
+        seen.add(key)
+        return output_file
+    stem, suffix, parent = output_file.stem, output_file.suffix, output_file.parent
+    n = 1
+    while True:
+        candidate = parent / f"{stem}_{n}{suffix}"
+        ckey = str(candidate).lower()
+        if ckey not in seen:
+            seen.add(ckey)
+            return candidate
+        n += 1
+
+
+def _segment_from_whisper_s2t(s) -> SegmentData | None:
+    if not isinstance(s, dict):
+        return None
+    text = s.get("text", "")
+    start = float(s.get("start_time", 0.0) or 0.0)
+    end = float(s.get("end_time", start) or start)
+    return SegmentData(start=start, end=end, text=text)
+
+
+def _segments_from_whisper_s2t(raw_segments: list) -> Iterator[SegmentData]:
+    for s in raw_segments:
+        segment = _segment_from_whisper_s2t(s)
+        if segment is not None:
+            yield segment
+
+
+def _duration_of(raw_segments: list) -> float | None:
+    """End of the last segment, so the header can carry it before the
+    segments are written."""
+    for s in reversed(raw_segments):
+        segment = _segment_from_whisper_s2t(s)
+        if segment is not None:
+            return segment.end
+    return None
+
+
+class _StopBatch(Exception):
+    """Raised inside run() to abandon the remaining files (e.g. after an OOM)."""
+
+
+@dataclass
+class BatchStats:
+    total: int = 0
+    skipped: int = 0
+    completed: int = 0
+    cached: int = 0
+    failed: int = 0
+    audio_seconds: float = 0.0
+    elapsed: float = 0.0
+
+    @property
+    def succeeded(self) -> bool:
+        return self.failed == 0 and self.skipped + self.completed == self.total
+
+    @property
+    def files_per_second(self) -> float:
+        return self.completed / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def audio_per_second(self) -> float:
+        return self.audio_seconds / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def real_time_factor(self) -> Optional[float]:
+        """Processing time per second of audio (below 1 is faster than real time)."""
+        return self.elapsed / self.audio_seconds if self.audio_seconds > 0 else None
+
+
+class BatchJob:
+    """Transcribe a list of files and write one output per file.
+
+    Plain threads and processes only, no Qt: the GUI runs it inside a
+    BatchProcessor, the CLI calls run() directly. Progress and errors go to
+    the optional callbacks; run() returns the job's BatchStats.
+    """
+
+    def __init__(
+        self,
+        files: list[Path],
+        model,
+        output_format: str,
+        output_directory: str | None,
+        batch_size: int,
+        language: str,
+        task_mode: str,
+        files_per_group: int = 1,
+        prefetch_files: int = 0,
+        resume: bool = False,
+        schedule: str = "path",
+        adaptive_batch: bool = False,
+        remembered_batch_size: int | None = None,
+        worker_spec: WorkerModelSpec | None = None,
+        cpu_workers: int = 1,
+        cache: TranscriptionCache | None = None,
+        cache_scope: CacheScope | None = None,
+        on_progress: Callable[[int, int, str], None] | None = None,
+        on_error: Callable[[str], None] | None = None,
+    ):
+        self.files = [Path(f) for f in files]
+        self.model = model
+        self.output_format = output_format
+        self.output_directory = output_directory
+        self.batch_size = batch_size if batch_size and batch_size > 0 else 8
+        self.language = language or "en"
+        self.task_mode = task_mode or "transcribe"
+        # Number of files handed to whisper_s2t per transcribe_with_vad call.
+        # whisper_s2t packs the VAD segments of every file in the call into
+        # shared decoder batches, so short clips no longer leave most of the
+        # batch_size slots empty. 1 keeps the old one-call-per-file behavior.
+        self.files_per_group = max(1, int(files_per_group or 1))
+        # How many files ahead of the model to decode to 16 kHz PCM on a
+        # thread pool. 0 hands paths straight to whisper_s2t as before.
+        self.prefetch_files = max(0, int(prefetch_files or 0))
+        # Keep a JobManifest next to the outputs and skip inputs it already
+        # lists as done, so a stopped or crashed run picks up where it was.
+        self.resume = resume
+        self.schedule = schedule if schedule in SCHEDULE_POLICIES else "path"
+        # With adaptive_batch, an OOM halves the batch size and retries the
+        # same files instead of ending the run; see AdaptiveBatchSize.
+        self.adaptive = (
+            AdaptiveBatchSize(self.batch_size, remembered_batch_size)
+            if adaptive_batch else None
+        )
+        # On CPU, cpu_workers > 1 runs the batch in that many processes, each
+        # loading its own copy of the model described by worker_spec and
+        # getting a slice of the CPU thread budget.
+        self.worker_spec = worker_spec
+        self.cpu_workers = max(1, int(cpu_workers or 1))
+        # Inputs whose content hash is already in the transcription cache for
+        # this model/beam/language/task are written from the cached segments
+        # without running the model.
+        self.cache = cache if cache_scope is not None else None
+        self.cache_scope = cache_scope
+        self.on_progress = on_progress
+        self.on_error = on_error
+        self.stop_requested = Event()
+        self.stats = BatchStats()
+        self._stats_lock = threading.Lock()
+        self._seen_paths: set[str] = set()
+        self._pending: list[Path] = []
+        self._skipped = 0
+        self._manifest: JobManifest | None = None
+        self._eta: EtaEstimator | None = None
+        self._prefetcher: Prefetcher | None = None
+        self._writer: BackgroundWriter | None = None
+
+    def request_stop(self) -> None:
+        self.stop_requested.set()
+
+    def _progress(self, current: int, total: int, message: str) -> None:
+        if self.on_progress is not None:
+            self.on_progress(current, total, message)
+
+    def _error(self, message: str) -> None:
+        if self.on_error is not None:
+            self.on_error(message)
+
+    def _count(self, field_name: str, n: float = 1) -> None:
+        # Results are written on the BackgroundWriter thread.
+        with self._stats_lock:
+            setattr(self.stats, field_name, getattr(self.stats, field_name) + n)
+
+    @staticmethod
+    def _decode(audio_file: Path) -> bytes | Path:
+        try:
+            return wav_bytes(decode_to_pcm16(audio_file))
+        except Exception as e:
+            # Let whisper_s2t try its own loader and report the real error.
+            logger.debug("Prefetch decode failed for %s: %s", audio_file.name, e)
+            return audio_file
+
+    def _load(self, audio_file: Path) -> tuple[str | None, bytes | Path]:
+        digest = self._hash(audio_file)
+        source = self._decode(audio_file) if self.prefetch_files else audio_file
+        return digest, source
+
+    def _input_for(self, index: int) -> tuple[str | None, bytes | Path]:
+        if self._prefetcher is None:
+            return self._load(self._pending[index])
+        return self._prefetcher.get(index)
+
+    def _hash(self, audio_file: Path) -> str | None:
+        if self.cache is None:
+            return None
+        try:
+            return hash_audio(audio_file)
+        except OSError:
+            return None
+
+    def _cache_key(self, digest: str) -> str:
+        return self.cache.key(digest, self.cache_scope, self.language, self.task_mode)
+
+    def _cached(self, digest: str | None) -> list | None:
+        if self.cache is None or digest is None:
+            return None
+        return self.cache.get(self._cache_key(digest))
+
+    def _store(self, digest: str | None, raw_segments: list) -> None:
+        if self.cache is not None and digest is not None:
+            self.cache.put(self._cache_key(digest), raw_segments)
+
+    def _transcribe_once(self, inputs: list[bytes | Path], batch_size: int) -> list[list]:
+        n = len(inputs)
+        out = self.model.transcribe_with_vad(
+            [model_input(x) for x in inputs],
+            lang_codes=[self.language] * n,
+            tasks=[self.task_mode] * n,
+            initial_prompts=[None] * n,
+            batch_size=batch_size,
+        )
+        out = list(out or [])
+        # whisper_s2t returns one segment list per input, in input order.
+        return out + [[] for _ in range(n - len(out))]
+
+    def _transcribe(self, inputs: list[bytes | Path]) -> list[list]:
+        if self.adaptive is None:
+            return self._transcribe_once(inputs, self.batch_size)
+        while True:
+            try:
+                out = self._transcribe_once(inputs, self.adaptive.current)
+            except Exception as e:
+                if not _is_oom_error(e) or not self.adaptive.on_oom():
+                    raise
+                free_cuda_cache()
+                continue
+            self.adaptive.on_success()
+            return out
+
+    def _output_path(self, audio_file: Path) -> Path:
+        out_suffix = f".{self.output_format}"
+        if self.output_directory:
+            out_dir = Path(self.output_directory)
+            out_dir.mkdir(parents=True, exist_ok=True)
+            base_output = out_dir / f"{audio_file.stem}{out_suffix}"
+        else:
+            base_output = audio_file.with_suffix(out_suffix)
+        return _unique_output_path(base_output, self._seen_paths)
+
+    def _write_result(
+        self,
+        idx: int,
+        total_files: int,
+        audio_file: Path,
+        raw_segments: list,
+        seconds: float,
+        cached: bool = False,
+    ) -> None:
+        try:
+            duration = _duration_of(raw_segments)
+            output_file = self._output_path(audio_file)
+            with open_output(
+                output_file, self.output_format, self.language, duration
+            ) as writer:
+                for segment in _segments_from_whisper_s2t(raw_segments):
+                    writer.append_segment(segment)
+            logger.info("Output written to %s", output_file)
+
+            message = f"Completed {audio_file.name}"
+            audio_seconds = duration
+            if self._eta is not None:
+                self._eta.complete(audio_file)
+                audio_seconds = self._eta.duration_of(audio_file) or duration
+                eta = self._eta.describe()
+                if eta:
+                    message = f"{message} ({eta})"
+            if self._manifest is not None:
+                self._manifest.record(
+                    audio_file, output_file, self.output_format,
+                    self.language, self.task_mode, seconds, audio_seconds,
+                )
+            self._count("completed")
+            self._count("audio_seconds", audio_seconds or 0.0)
+            if cached:
+                self._count("cached")
+            self._progress(idx, total_files, message)
+        except Exception as e:
+            self._count("failed")
+            self._error(f"Error processing {audio_file.name}: {e}")
+            logger.error("Error writing output for %s: %s", audio_file.name, e)
+
+    def _emit_result(
+        self,
+        idx: int,
+        total_files: int,
+        audio_file: Path,
+        raw_segments: list,
+        seconds: float,
+        cached: bool = False,
+    ) -> None:
+        if self._writer is not None:
+            self._writer.submit(
+                self._write_result, idx, total_files, audio_file, raw_segments,
+                seconds, cached,
+            )
+        else:
+            self._write_result(
+                idx, total_files, audio_file, raw_segments, seconds, cached
+            )
+
+    def _handle_file_error(self, audio_file: Path, exc: Exception) -> None:
+        self._count("failed")
+        if _is_oom_error(exc):
+            hint = (
+                "Stopping batch: still out of memory at batch size 1. "
+                "Try a smaller model."
+                if self.adaptive is not None
+                else "Stopping batch. Try a smaller model or reduce batch size."
+            )
+            self._error(f"GPU out of memory processing {audio_file.name}: {exc}\n{hint}")
+            logger.error("OOM error, stopping batch: %s", exc)
+            raise _StopBatch() from exc
+        self._error(f"Error processing {audio_file.name}: {exc}")
+        logger.error("Error processing %s: %s", audio_file.name, exc)
+
+    def _process_file(
+        self,
+        idx: int,
+        total_files: int,
+        audio_file: Path,
+        digest: str | None,
+        source: bytes | Path,
+    ) -> None:
+        self._progress(idx, total_files, f"Processing {audio_file.name}")
+        t0 = time.perf_counter()
+        try:
+            raw_segments = self._transcribe([source])[0]
+        except Exception as e:
+            self._handle_file_error(audio_file, e)
+            return
+        self._store(digest, raw_segments)
+        if not self.stop_requested.is_set():
+            self._emit_result(
+                idx, total_files, audio_file, raw_segments, time.perf_counter() - t0
+            )
+
+    def _process_group(self, start: int, total_files: int, group: list[Path]) -> None:
+        first_idx = self._skipped + start + 1
+        todo: list[tuple[int, Path, str | None, bytes | Path]] = []
+        for offset, audio_file in enumerate(group):
+            digest, source = self._input_for(start + offset)
+            cached = self._cached(digest)
+            if cached is not None:
+                logger.debug("Transcription cache hit for %s", audio_file.name)
+                self._emit_result(
+                    first_idx + offset, total_files, audio_file, cached, 0.0, cached=True
+                )
+            else:
+                todo.append((first_idx + offset, audio_file, digest, source))
+
+        if not todo:
+            return
+        if len(todo) == 1:
+            idx, audio_file, digest, source = todo[0]
+            self._process_file(idx, total_files, audio_file, digest, source)
+            return
+
+        self._progress(
+            todo[0][0], total_files,
+            f"Processing {todo[0][1].name} (+{len(todo) - 1} more)",
+        )
+        t0 = time.perf_counter()
+        try:
+            outputs = self._transcribe([source for *_, source in todo])
+        except Exception as e:
+            if _is_oom_error(e):
+                self._handle_file_error(todo[0][1], e)
+            # One unreadable file fails the whole call; retry the group file
+            # by file so the others still get transcribed.
+            logger.warning(
+                "Grouped transcription of %d files failed (%s); "
+                "retrying them one at a time", len(todo), e,
+            )
+            for idx, audio_file, digest, source in todo:
+                if self.stop_requested.is_set():
+                    return
+                self._process_file(idx, total_files, audio_file, digest, source)
+            return
+
+        for (_, _, digest, _), raw_segments in zip(todo, outputs):
+            self._store(digest, raw_segments)
+        if self.stop_requested.is_set():
+            return
+        per_file = (time.perf_counter() - t0) / len(todo)
+        for (idx, audio_file, _, _), raw_segments in zip(todo, outputs):
+            self._emit_result(idx, total_files, audio_file, raw_segments, per_file)
+
+    def _use_workers(self) -> bool:
+        return (
+            self.worker_spec is not None
+            and self.worker_spec.device == "cpu"
+            and self.cpu_workers > 1
+            and len(self._pending) > 1
+        )
+
+    def _run_workers(self, total_files: int) -> None:
+        workers, threads = split_thread_budget(
+            get_optimal_cpu_threads(), self.cpu_workers
+        )
+        completed = 0
+        pending = self._pending
+        digests: dict[Path, str | None] = {}
+        if self.cache is not None:
+            with ThreadPoolExecutor(max_workers=_DECODE_WORKERS) as ex:
+                digests = dict(zip(pending, ex.map(self._hash, pending)))
+            pending = []
+            for audio_file in self._pending:
+                cached = self._cached(digests[audio_file])
+                if cached is None:
+                    pending.append(audio_file)
+                    continue
+                completed += 1
+                self._emit_result(
+                    self._skipped + completed, total_files, audio_file, cached, 0.0,
+                    cached=True,
+                )
+            if not pending:
+                return
+
+        jobs: dict[int, list[Path]] = {}
+        for start in range(0, len(pending), self.files_per_group):
+            jobs[len(jobs)] = pending[start:start + self.files_per_group]
+        next_id = len(jobs)
+
+        self._progress(
+            self._skipped, total_files,
+            f"Starting {workers} CPU workers ({threads} threads each)...",
+        )
+        logger.info("Batch on %d CPU workers x %d threads", workers, threads)
+        pool = CpuWorkerPool(
+            self.worker_spec, workers, threads,
+            self.language, self.task_mode, self.batch_size,
+        )
+        pool.start()
+        for job_id, group in jobs.items():
+            pool.submit(job_id, [str(f) for f in group])
+
+        load_failures = 0
+        try:
+            while jobs and not self.stop_requested.is_set():
+                msg = pool.get(timeout=0.5)
+                if msg is None:
+                    if pool.alive() < pool.size - load_failures:
+                        # A crashed worker takes its job with it; stop rather
+                        # than wait forever. Resume picks up the rest.
+                        self._error("A CPU worker exited unexpectedly; stopping batch")
+                        logger.error("CPU worker died with %d jobs left", len(jobs))
+                        return
+                    continue
+
+                kind, job_id, payload, seconds = msg
+                if kind == READY:
+                    continue
+                if kind == LOAD_FAILED:
+                    load_failures += 1
+                    logger.error("CPU worker failed to load model: %s", payload)
+                    if load_failures == pool.size:
+                        self._error(f"CPU workers could not load the model: {payload}")
+                        return
+                    continue
+
+                group = jobs.pop(job_id)
+                if kind == FAILED:
+                    if len(group) > 1:
+                        # Same as the in-process path: retry file by file so
+                        # one unreadable input does not sink the group.
+                        logger.warning(
+                            "Grouped transcription of %d files failed (%s); "
+                            "retrying them one at a time", len(group), payload,
+                        )
+                        for audio_file in group:
+                            jobs[next_id] = [audio_file]
+                            pool.submit(next_id, [str(audio_file)])
+                            next_id += 1
+                        continue
+                    completed += 1
+                    self._count("failed")
+                    self._error(f"Error processing {group[0].name}: {payload}")
+                    logger.error("Error processing %s: %s", group[0].name, payload)
+                    continue
+
+                if kind == DONE:
+                    per_file = seconds / len(group)
+                    for audio_file, raw_segments in zip(group, payload):
+                        self._store(digests.get(audio_file), raw_segments)
+                        completed += 1
+                        self._emit_result(
+                            self._skipped + completed, total_files,
+                            audio_file, raw_segments, per_file,
+                        )
+        finally:
+            pool.close()
+
+    def _load_manifest(self) -> None:
+        self._manifest = JobManifest(
+            manifest_location(self.files, self.output_directory)
+        )
+        if not self._manifest.load():
+            return
+        self._pending = [
+            f for f in self.files
+            if not self._manifest.is_done(
+                f, self.output_format, self.language, self.task_mode
+            )
+        ]
+        self._skipped = len(self.files) - len(self._pending)
+        if self._skipped:
+            # Outputs from the earlier run keep their names; new collisions
+            # are numbered around them.
+            self._seen_paths.update(o.lower() for o in self._manifest.done_outputs())
+            logger.info(
+                "Resuming batch: %d of %d files already done (%s)",
+                self._skipped, len(self.files), self._manifest.path,
+            )
+            self._progress(
+                self._skipped, len(self.files),
+                f"Resuming: {self._skipped} files already done",
+            )
+
+    def _plan_schedule(self) -> None:
+        if self.schedule == "path":
+            # The order does not need the durations, so start at once and
+            # probe only for the ETA, off the critical path.
+            self._eta = EtaEstimator()
+            probe_in_background(list(self._pending), self._eta)
+            return
+        self._progress(self._skipped, len(self.files), "Probing audio durations...")
+        durations = probe_durations(self._pending)
+        self._pending = order_files(self._pending, durations, self.schedule)
+        self._eta = EtaEstimator(durations)
+        summary = (
+            f"{len(self._pending)} files, "
+            f"~{format_duration(self._eta.total_audio)} of audio"
+        )
+        if self._eta.unknown:
+            summary += f" ({self._eta.unknown} with unknown length)"
+        logger.info("Batch schedule (%s): %s", self.schedule, summary)
+        self._progress(self._skipped, len(self.files), summary)
+
+    def run(self) -> BatchStats:
+        started = time.perf_counter()
+
+        self.stats = BatchStats(total=len(self.files))
+        self._seen_paths = set()
+        self._pending = list(self.files)
+        self._skipped = 0
+        self._eta = None
+        if self.resume and self.files:
+            self._load_manifest()
+        self.stats.skipped = self._skipped
+        if self._pending:
+            self._plan_schedule()
+
+        # Decode runs ahead on a thread pool and outputs are written on their
+        # own thread, so CTranslate2 is never waiting on ffmpeg or the disk.
+        use_workers = self._use_workers()
+        if self.prefetch_files and not use_workers:
+            self._prefetcher = Prefetcher(
+                self._pending,
+                self._load,
+                depth=max(self.prefetch_files, self.files_per_group),
+                workers=_DECODE_WORKERS,
+            )
+        self._writer = BackgroundWriter(maxsize=max(8, 2 * self.files_per_group))
+
+        try:
+            total_files = len(self.files)
+
+            if use_workers:
+                self._run_workers(total_files)
+            else:
+                for start in range(0, len(self._pending), self.files_per_group):
+                    if self.stop_requested.is_set():
+                        break
+                    group = self._pending[start:start + self.files_per_group]
+                    self._process_group(start, total_files, group)
+
+        except _StopBatch:
+            pass
+
+        except Exception as e:
+            self._error(f"Processing failed: {e}")
+            logger.exception("Batch processing failed")
+
+        finally:
+            if self._prefetcher is not None:
+                self._prefetcher.close()
+                self._prefetcher = None
+            # Transcripts already produced are still written after a stop.
+            self._writer.close()
+            self._writer = None
+            if self._manifest is not None:
+                self._manifest.close()
+                self._manifest = None
+            self.stats.elapsed = time.perf_counter() - started
+        return self.stats
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+CACHE_FILE = "cache/transcriptions.sqlite3"
+
+_HASH_CHUNK = 1 << 20
+_SEGMENT_KEYS = ("text", "start_time", "end_time")
+
+
+def hash_audio(source: str | Path | bytes) -> str:
+    """blake2b of the raw input bytes, streamed so large files stay cheap."""
+    h = hashlib.blake2b(digest_size=20)
+    if isinstance(source, (bytes, bytearray)):
+        h.update(source)
+        return h.hexdigest()
+    with open(source, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def model_beam_size(model, fallback: int = 1) -> int:
+    """Beam size the model actually decodes with.
+
+    The server reuses a resident model whatever beam a request asks for, so
+    the requested value is not necessarily what produced the segments.
+    """
+    kwargs = getattr(model, "generate_kwargs", None)
+    if isinstance(kwargs, dict) and kwargs.get("beam_size"):
+        return int(kwargs["beam_size"])
+    return fallback
+
+
+@dataclass(frozen=True)
+class CacheScope:
+    """The model side of a cache key; combined with the audio hash, language
+    and task in TranscriptionCache.key()."""
+
+    model_key: str
+    beam_size: int = 1
+
+
+class TranscriptionCache:
+    """Persistent segment cache keyed by audio content and decode settings.
+
+    Stores whisper_s2t's raw segment list (text and timings) in SQLite, so a
+    repeated input skips inference entirely and any output format can be
+    rendered from the hit. Least-recently-used entries are evicted once the
+    stored segments exceed `max_bytes`.
+    """
+
+    def __init__(self, path: str | Path, max_bytes: int) -> None:
+        self.path = Path(path)
+        self.max_bytes = max(0, int(max_bytes))
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " segments TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_last_used ON entries(last_used)"
+        )
+        self._conn.commit()
+        row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        self._total = int(row[0])
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(content_hash: str, scope: CacheScope, language: str, task: str) -> str:
+        return "|".join(
+            (content_hash, scope.model_key, str(scope.beam_size), language, task)
+        )
+
+    def get(self, key: str) -> Optional[list[dict]]:
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT segments FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                self._conn.execute(
+                    "UPDATE entries SET last_used = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Transcription cache read failed: {e}")
+                return None
+            try:
+                segments = json.loads(row[0])
+            except json.JSONDecodeError:
+                return None
+            self.hits += 1
+        return segments
+
+    def put(self, key: str, raw_segments: list) -> None:
+        segments = [
+            {k: s.get(k) for k in _SEGMENT_KEYS}
+            for s in raw_segments if isinstance(s, dict)
+        ]
+        payload = json.dumps(segments, ensure_ascii=False)
+        size = len(payload.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            try:
+                old = self._conn.execute(
+                    "SELECT size FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, segments, size, last_used) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, payload, size, time.time()),
+                )
+                self._total += size - (old[0] if old else 0)
+                self._evict()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Transcription cache write failed: {e}")
+
+    def _evict(self) -> None:
+        # Trim to 90% so a full cache does not evict on every insert.
+        if self._total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY last_used ASC"
+        ).fetchall()
+        doomed = []
+        for key, size in rows:
+            if self._total <= target:
+                break
+            doomed.append((key,))
+            self._total -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+        logger.debug(f"Transcription cache evicted {len(doomed)} entries")
+
+    def stats(self) -> dict:
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            return {
+                "entries": count,
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def open_transcription_cache(path: str | Path, max_mb: int) -> Optional[TranscriptionCache]:
+    """Open the cache, or return None (caching off) if the file is unusable."""
+    try:
+        return TranscriptionCache(path, max_mb * 1024 * 1024)
+    except (sqlite3.Error, OSError) as e:
+        logger.warning(f"Transcription cache disabled, could not open {path}: {e}")
+        return None
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from contextlib import nullcontext
+from typing import Callable, Optional, Sequence
+
+from core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def _no_grad():
+    # transcribe_with_vad runs under @torch.no_grad(); the preprocessor and
+    # the PyTorch backends would otherwise record autograd state.
+    try:
+        import torch
+        return torch.no_grad()
+    except ImportError:
+        return nullcontext()
+
+
+_HOOKS = ("data_loader", "preprocessor", "generate_segment_batched", "device")
+
+
+def transcribe_with_vad_cancellable(
+    model,
+    audio_files: Sequence,
+    lang_codes: Sequence[str],
+    tasks: Sequence[str],
+    initial_prompts: Sequence[Optional[str]],
+    batch_size: int,
+    is_cancelled: Callable[[int], bool],
+) -> list[list[dict]]:
+    """transcribe_with_vad that can give up on inputs between batches.
+
+    Runs whisper_s2t's own data_loader -> preprocessor ->
+    generate_segment_batched loop (the body of transcribe_with_vad), asking
+    `is_cancelled(file_id)` before every decoder batch. Segments of cancelled
+    files are dropped from the batch, and the call returns as soon as every
+    file is cancelled. Cancelled files get whatever segments were decoded
+    before the cancel, so callers should discard them. Backends without the
+    loop hooks fall back to a single uninterruptible transcribe_with_vad.
+    """
+    if not all(hasattr(model, name) for name in _HOOKS):
+        return list(model.transcribe_with_vad(
+            list(audio_files),
+            lang_codes=list(lang_codes),
+            tasks=list(tasks),
+            initial_prompts=list(initial_prompts),
+            batch_size=batch_size,
+        ) or [])
+
+    with _no_grad():
+        return _transcribe_loop(
+            model, audio_files, lang_codes, tasks, initial_prompts, batch_size, is_cancelled
+        )
+
+
+def _transcribe_loop(
+    model,
+    audio_files: Sequence,
+    lang_codes: Sequence[str],
+    tasks: Sequence[str],
+    initial_prompts: Sequence[Optional[str]],
+    batch_size: int,
+    is_cancelled: Callable[[int], bool],
+) -> list[list[dict]]:
+    n = len(audio_files)
+    responses: list[list[dict]] = [[] for _ in range(n)]
+    batches = model.data_loader(
+        list(audio_files), list(lang_codes), list(tasks), list(initial_prompts),
+        batch_size=batch_size,
+    )
+    try:
+        for signals, prompts, seq_len, seg_metadata, _ in batches:
+            cancelled = {i for i in range(n) if is_cancelled(i)}
+            if len(cancelled) == n:
+                logger.info("Every input was cancelled; stopping transcription early")
+                break
+            keep = [
+                j for j, meta in enumerate(seg_metadata) if meta["file_id"] not in cancelled
+            ]
+            if not keep:
+                continue
+            if len(keep) < len(seg_metadata):
+                signals, seq_len = signals[keep], seq_len[keep]
+                prompts = [prompts[j] for j in keep]
+                seg_metadata = [seg_metadata[j] for j in keep]
+
+            mels, seq_len = model.preprocessor(signals, seq_len)
+            res = model.generate_segment_batched(
+                mels.to(model.device), prompts, seq_len, seg_metadata
+            )
+            for r, meta in zip(res, seg_metadata):
+                responses[meta["file_id"]].append({
+                    **r,
+                    "start_time": round(meta["start_time"], 3),
+                    "end_time": round(meta["end_time"], 3),
+                })
+    finally:
+        close = getattr(batches, "close", None)
+        if close is not None:
+            close()
+    return responses
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from PySide6.QtCore import QObject, Signal
+
+from core.audio.decoding import float_to_pcm16, model_input, pcm_to_float_mono, wav_bytes
+from core.audio.endpointing import SAMPLE_RATE, EnergyEndpointer, Utterance
+from core.audio.resampling import StreamingResampler
+from core.logging_config import get_logger
+from core.text.curation import curate_text
+
+logger = get_logger(__name__)
+
+
+class DictationSession(QObject):
+    """Transcribes a microphone recording utterance by utterance while it is
+    still being made.
+
+    feed() gets the raw blocks the RecordingThread writes; they are downmixed,
+    resampled to 16 kHz and split by an EnergyEndpointer. Each closed
+    utterance is transcribed on a single worker thread, so results arrive in
+    order and the model never runs twice at once. After finish() only the
+    tail since the last pause is left to transcribe. text_ready carries each
+    utterance's text and whether it is the last one.
+    """
+
+    text_ready = Signal(str, bool)
+    error_occurred = Signal(str)
+
+    def __init__(
+        self,
+        model,
+        samplerate: int,
+        channels: int,
+        dtype: str,
+        language: str = "en",
+        task_mode: str = "transcribe",
+        batch_size: int | None = None,
+        curate: bool = True,
+    ) -> None:
+        super().__init__()
+        self.model = model
+        self.channels = channels
+        self.dtype = dtype
+        self.language = language or "en"
+        self.task_mode = task_mode or "transcribe"
+        self.batch_size = batch_size if batch_size and batch_size > 0 else 8
+        self.curate = curate
+        self._resampler = StreamingResampler(samplerate, SAMPLE_RATE)
+        self._endpointer = EnergyEndpointer(SAMPLE_RATE)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Dictation")
+        self._cancel_event = threading.Event()
+        self._finishing = False
+        self._utterances = 0
+
+    @property
+    def finishing(self) -> bool:
+        """True once the recording has ended and only the tail is left."""
+        return self._finishing
+
+    def feed(self, raw: bytes) -> None:
+        """Called from the recording thread with each block it writes."""
+        if self._cancel_event.is_set():
+            return
+        audio = self._resampler.process(pcm_to_float_mono(raw, self.dtype, self.channels))
+        for utt in self._endpointer.feed(audio):
+            self._submit(utt, final=False)
+
+    def finish(self) -> None:
+        """The recording ended: transcribe what is left, then report final."""
+        if self._cancel_event.is_set():
+            return
+        self._finishing = True
+        for utt in self._endpointer.feed(self._resampler.flush()):
+            self._submit(utt, final=False)
+        self._submit(self._endpointer.flush(), final=True)
+        self._executor.shutdown(wait=False)
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, utt: Optional[Utterance], final: bool) -> None:
+        if utt is not None:
+            self._utterances += 1
+            logger.debug(
+                f"Dictation utterance {self._utterances}: "
+                f"{utt.start:.1f}s-{utt.end:.1f}s"
+            )
+        self._executor.submit(self._transcribe, utt, final)
+
+    def _transcribe(self, utt: Optional[Utterance], final: bool) -> None:
+        if self._cancel_event.is_set():
+            return
+        text = ""
+        if utt is not None and utt.audio.size:
+            try:
+                out = self.model.transcribe_with_vad(
+                    [model_input(wav_bytes(float_to_pcm16(utt.audio)))],
+                    lang_codes=[self.language],
+                    tasks=[self.task_mode],
+                    initial_prompts=[None],
+                    batch_size=self.batch_size,
+                )
+                segments = out[0] if out else []
+                text = " ".join(
+                    s.get("text", "").strip() for s in segments
+                    if isinstance(s, dict) and s.get("text", "").strip()
+                )
+            except Exception as e:
+                logger.exception("Dictation utterance failed")
+                self.error_occurred.emit(f"Transcription failed: {e}")
+            if text and self.curate:
+                try:
+                    text = curate_text(text)
+                except Exception as e:
+                    logger.warning(f"Text curation failed: {e}")
+        if self._cancel_event.is_set():
+            return
+        if text or final:
+            self.text_ready.emit(text, final)
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+MANIFEST_NAME = ".whisper_s2t_batch.jsonl"
+
+
+def manifest_location(files: list[Path], output_directory: str | None) -> Path:
+    """Outputs go to `output_directory` when set, otherwise next to each input;
+    the manifest lives in the output directory or the inputs' common parent."""
+    if output_directory:
+        return Path(output_directory) / MANIFEST_NAME
+    try:
+        base = Path(os.path.commonpath([str(Path(f).resolve().parent) for f in files]))
+    except ValueError:
+        # Inputs on different drives (Windows) have no common path.
+        base = Path(files[0]).resolve().parent
+    return base / MANIFEST_NAME
+
+
+class JobManifest:
+    """Append-only JSONL record of finished batch inputs.
+
+    One line per completed file with its size, mtime, output path and
+    timings. Loading keeps the last record per input in a dict, so checking
+    whether a file can be skipped is a lookup plus one stat(). A crash can at
+    worst leave a truncated final line, which is ignored.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._fh = None
+
+    @staticmethod
+    def _key(audio_file: Path) -> str:
+        return os.path.normcase(str(Path(audio_file).resolve()))
+
+    def load(self) -> int:
+        self._entries.clear()
+        if not self.path.is_file():
+            return 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(entry, dict) and "input" in entry:
+                        self._entries[self._key(Path(entry["input"]))] = entry
+        except OSError as e:
+            logger.warning(f"Could not read batch manifest {self.path}: {e}")
+        return len(self._entries)
+
+    def is_done(self, audio_file: Path, fmt: str, language: str, task: str) -> bool:
+        entry = self._entries.get(self._key(audio_file))
+        if entry is None:
+            return False
+        if (entry.get("format"), entry.get("language"), entry.get("task")) != (
+            fmt, language, task
+        ):
+            return False
+        try:
+            st = os.stat(audio_file)
+        except OSError:
+            return False
+        if st.st_size != entry.get("size") or st.st_mtime_ns != entry.get("mtime_ns"):
+            return False
+        output = entry.get("output")
+        return bool(output) and os.path.exists(output)
+
+    def done_outputs(self) -> Iterable[str]:
+        return (e["output"] for e in self._entries.values() if e.get("output"))
+
+    def _needs_newline(self) -> bool:
+        """True if a crash left the last line unterminated."""
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() == 0:
+                    return False
+                f.seek(-1, os.SEEK_END)
+                return f.read(1) != b"\n"
+        except OSError:
+            return False
+
+    def record(
+        self,
+        audio_file: Path,
+        output_file: Path,
+        fmt: str,
+        language: str,
+        task: str,
+        seconds: float,
+        audio_seconds: Optional[float],
+    ) -> None:
+        try:
+            st = os.stat(audio_file)
+        except OSError:
+            return
+        entry = {
+            "input": str(Path(audio_file).resolve()),
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "output": str(output_file),
+            "format": fmt,
+            "language": language,
+            "task": task,
+            "seconds": round(seconds, 3),
+            "audio_seconds": round(audio_seconds, 3) if audio_seconds else None,
+            "finished_at": round(time.time(), 3),
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            try:
+                if self._fh is None:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    self._fh = open(self.path, "a", encoding="utf-8")
+                    if self._needs_newline():
+                        self._fh.write("\n")
+                self._fh.write(line)
+                self._fh.flush()
+            except OSError as e:
+                logger.warning(f"Could not update batch manifest {self.path}: {e}")
+                return
+            self._entries[self._key(audio_file)] = entry
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
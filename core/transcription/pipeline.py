@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Sequence
+
+from core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class Prefetcher:
+    """Run `load` on upcoming items in a thread pool while the caller works.
+
+    Items must be requested in increasing index order. At most `depth` items
+    ahead of the last requested one are loaded (or in flight) at any time, so
+    memory stays bounded no matter how long the input list is.
+    """
+
+    def __init__(
+        self,
+        items: Sequence[Any],
+        load: Callable[[Any], Any],
+        depth: int,
+        workers: int = 2,
+    ) -> None:
+        self._items = items
+        self._load = load
+        self._depth = max(1, depth)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix="prefetch"
+        )
+        self._futures: dict[int, Future] = {}
+        self._next = 0
+
+    def _fill(self, limit: int) -> None:
+        limit = min(limit, len(self._items))
+        while self._next < limit:
+            self._futures[self._next] = self._executor.submit(
+                self._load, self._items[self._next]
+            )
+            self._next += 1
+
+    def get(self, index: int) -> Any:
+        self._fill(index + 1 + self._depth)
+        future = self._futures.pop(index, None)
+        if future is None:
+            return self._load(self._items[index])
+        return future.result()
+
+    def close(self) -> None:
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class BackgroundWriter:
+    """Serialize output jobs on one thread behind a bounded queue.
+
+    submit() blocks once `maxsize` jobs are waiting, which throttles the
+    producer instead of letting finished transcripts pile up in memory.
+    """
+
+    _SENTINEL = object()
+
+    def __init__(self, maxsize: int = 32) -> None:
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, maxsize))
+        self._thread = threading.Thread(
+            target=self._run, daemon=True, name="output-writer"
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is self._SENTINEL:
+                return
+            fn, args = job
+            try:
+                fn(*args)
+            except Exception:
+                logger.exception("Output writer job failed")
+
+    def submit(self, fn: Callable[..., None], *args: Any) -> None:
+        self._queue.put((fn, args))
+
+    def close(self) -> None:
+        """Finish every queued job, then stop the thread."""
+        self._queue.put(self._SENTINEL)
+        self._thread.join()
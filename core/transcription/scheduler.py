@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from core.audio.decoding import probe_duration
+from core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+SCHEDULE_POLICIES = ["path", "longest_first", "bucketed"]
+
+_PROBE_WORKERS = 8
+
+
+def probe_durations(files: list[Path]) -> dict[Path, Optional[float]]:
+    """Header-only duration probe for every file, done on a small thread pool
+    because it is dominated by file-open latency."""
+    if not files:
+        return {}
+    with ThreadPoolExecutor(max_workers=_PROBE_WORKERS, thread_name_prefix="probe") as ex:
+        return dict(zip(files, ex.map(probe_duration, files)))
+
+
+def _bucket(duration: Optional[float]) -> int:
+    # Power-of-two buckets: 0-1 s, 1-2 s, 2-4 s, 4-8 s, ... Unknown lengths
+    # go last.
+    if duration is None:
+        return -1
+    if duration < 1.0:
+        return 0
+    return int(math.log2(duration)) + 1
+
+
+def order_files(
+    files: list[Path], durations: dict[Path, Optional[float]], policy: str
+) -> list[Path]:
+    """Reorder batch inputs.
+
+    - "path": unchanged (sorted path order from FileScanner).
+    - "longest_first": strictly by duration, longest first, so the slowest
+      files never end up as the tail of the run.
+    - "bucketed": longest bucket first, path order inside a bucket, so each
+      transcribe_with_vad group holds clips of similar length and decoder
+      batches stay full, while outputs in a bucket still appear in order.
+    """
+    if policy == "longest_first":
+        return sorted(
+            files, key=lambda f: -1.0 if durations.get(f) is None else durations[f],
+            reverse=True,
+        )
+    if policy == "bucketed":
+        return sorted(files, key=lambda f: -_bucket(durations.get(f)))
+    return list(files)
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(max(0, round(seconds)))
+    hours, rem = divmod(seconds, 3600)
+    minutes, secs = divmod(rem, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    if minutes:
+        return f"{minutes}m{secs:02d}s"
+    return f"{secs}s"
+
+
+class EtaEstimator:
+    """ETA from measured audio-seconds per wall-second on this run.
+
+    Files whose duration could not be probed count as the mean of those that
+    could, so one unreadable header does not skew the estimate. The
+    durations may arrive after the run has started (see probe_in_background);
+    files completed before that are counted once they do.
+    """
+
+    def __init__(self, durations: Optional[dict[Path, Optional[float]]] = None) -> None:
+        self._lock = threading.Lock()
+        self._durations: dict[Path, float] = {}
+        self._completed: set[Path] = set()
+        self.total_audio = 0.0
+        self.unknown = 0
+        self._done_audio = 0.0
+        self._start = time.monotonic()
+        if durations is not None:
+            self.set_durations(durations)
+
+    def set_durations(self, durations: dict[Path, Optional[float]]) -> None:
+        known = [d for d in durations.values() if d]
+        fallback = sum(known) / len(known) if known else 0.0
+        with self._lock:
+            self._durations = {f: (d if d else fallback) for f, d in durations.items()}
+            self.total_audio = sum(self._durations.values())
+            self.unknown = len(durations) - len(known)
+            self._done_audio = sum(self._durations.get(f, 0.0) for f in self._completed)
+
+    def duration_of(self, audio_file: Path) -> Optional[float]:
+        return self._durations.get(audio_file) or None
+
+    def complete(self, audio_file: Path) -> None:
+        with self._lock:
+            self._completed.add(audio_file)
+            self._done_audio += self._durations.get(audio_file, 0.0)
+
+    def eta_seconds(self) -> Optional[float]:
+        elapsed = time.monotonic() - self._start
+        if self._done_audio <= 0 or elapsed <= 0:
+            return None
+        rate = self._done_audio / elapsed
+        return max(0.0, self.total_audio - self._done_audio) / rate
+
+    def describe(self) -> str:
+        eta = self.eta_seconds()
+        return f"ETA {format_duration(eta)}" if eta is not None else ""
+
+
+def probe_in_background(files: list[Path], eta: EtaEstimator) -> threading.Thread:
+    """Probe `files` on a daemon thread and hand the durations to `eta`, for
+    schedules whose order does not depend on them."""
+    def probe() -> None:
+        durations = probe_durations(files)
+        eta.set_durations(durations)
+        logger.info(
+            f"Probed {len(files)} files: ~{format_duration(eta.total_audio)} of audio"
+        )
+
+    thread = threading.Thread(target=probe, name="DurationProbe", daemon=True)
+    thread.start()
+    return thread
@@ -9,6 +9,7 @@ from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
 from core.logging_config import get_logger
 from core.output.writers import SegmentData, TranscriptionResult
 from core.temp_file_manager import temp_file_manager
+from core.transcription.cache import CacheScope, TranscriptionCache, hash_audio
 from core.text.curation import curate_text
 
 logger = get_logger(__name__)
@@ -50,6 +51,8 @@ class _TranscriptionRunnable(QRunnable):
         batch_size: int | None = None,
         get_current_version_func: Optional[Callable[[], str]] = None,
         cancel_event: threading.Event | None = None,
+        cache: TranscriptionCache | None = None,
+        cache_scope: CacheScope | None = None,
     ) -> None:
         super().__init__()
         self.setAutoDelete(True)
@@ -62,6 +65,8 @@ class _TranscriptionRunnable(QRunnable):
         self.batch_size = batch_size if batch_size and batch_size > 0 else 8
         self.get_current_version = get_current_version_func
         self.cancel_event = cancel_event or threading.Event()
+        self.cache = cache if cache_scope is not None else None
+        self.cache_scope = cache_scope
         self.signals = _TranscriberSignals()
 
     def _is_cancelled(self) -> bool:
@@ -84,19 +89,37 @@ class _TranscriptionRunnable(QRunnable):
                 f"(lang={self.language}, task={self.task_mode}, batch={self.batch_size})"
             )
 
-            out = self.model.transcribe_with_vad(
-                [str(self.audio_file)],
-                lang_codes=[self.language],
-                tasks=[self.task_mode],
-                initial_prompts=[None],
-                batch_size=self.batch_size,
-            )
-
-            if self._is_cancelled():
-                self.signals.cancelled.emit()
-                return
+            cache_key = None
+            raw_segments = None
+            if self.cache is not None:
+                try:
+                    cache_key = self.cache.key(
+                        hash_audio(self.audio_file), self.cache_scope,
+                        self.language, self.task_mode,
+                    )
+                    raw_segments = self.cache.get(cache_key)
+                except OSError as e:
+                    logger.warning(f"Could not hash {self.audio_file.name}: {e}")
+
+            if raw_segments is not None:
+                logger.info(f"Transcription cache hit: {self.audio_file.name}")
+            else:
+                out = self.model.transcribe_with_vad(
+                    [str(self.audio_file)],
+                    lang_codes=[self.language],
+                    tasks=[self.task_mode],
+                    initial_prompts=[None],
+                    batch_size=self.batch_size,
+                )
+
+                if self._is_cancelled():
+                    self.signals.cancelled.emit()
+                    return
+
+                raw_segments = out[0] if out else []
+                if cache_key is not None:
+                    self.cache.put(cache_key, raw_segments)
 
-            raw_segments = out[0] if out else []
             segments = _to_segments(raw_segments)
             text = _segments_to_text(segments)
 
@@ -143,10 +166,14 @@ class TranscriptionService(QObject):
         self._get_model_version_func: Optional[Callable[[], str]] = None
         self._cancel_event: threading.Event | None = None
         self._is_transcribing = False
+        self._cache: TranscriptionCache | None = None
 
     def set_model_version_provider(self, func: Callable[[], str]) -> None:
         self._get_model_version_func = func
 
+    def set_cache(self, cache: TranscriptionCache | None) -> None:
+        self._cache = cache
+
     def set_task_mode(self, mode: str) -> None:
         self.task_mode = mode
         logger.debug(f"Task mode set to: {mode}")
@@ -177,6 +204,7 @@ class TranscriptionService(QObject):
         batch_size: int | None = None,
         language: str | None = None,
         task_mode: str | None = None,
+        cache_scope: CacheScope | None = None,
     ) -> None:
         if not model:
             error_msg = "No model available for transcription"
@@ -200,6 +228,8 @@ class TranscriptionService(QObject):
                 batch_size=batch_size,
                 get_current_version_func=self._get_model_version_func,
                 cancel_event=self._cancel_event,
+                cache=self._cache,
+                cache_scope=cache_scope,
             )
             runnable.signals.transcription_done.connect(self._on_transcription_done)
             runnable.signals.transcription_done_with_result.connect(
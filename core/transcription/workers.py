@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import queue
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Result kinds sent back from a worker process.
+READY = "ready"
+DONE = "done"
+FAILED = "failed"
+LOAD_FAILED = "load_failed"
+
+
+@dataclass(frozen=True)
+class WorkerModelSpec:
+    """Everything a worker process needs to load its own copy of the model."""
+
+    model_name: str
+    precision: str
+    device: str
+    beam_size: int = 1
+    local_path: Optional[str] = None
+
+
+def split_thread_budget(total_threads: int, workers: int) -> tuple[int, int]:
+    """Return (workers, threads_per_worker) for a CPU thread budget.
+
+    CTranslate2 stops scaling well past a handful of intra-op threads, so
+    several models with a slice each beat one model with every core. Never
+    hands a worker fewer than two threads: the worker count shrinks instead,
+    down to a single worker, which gets the whole budget however small.
+    """
+    workers = max(1, min(int(workers), max(1, total_threads // 2)))
+    return workers, max(1, total_threads // workers)
+
+
+def _worker_main(
+    spec: WorkerModelSpec,
+    cpu_threads: int,
+    language: str,
+    task: str,
+    batch_size: int,
+    tasks: Any,
+    results: Any,
+    stop: Any,
+) -> None:
+    # Imported here so the parent only pays for these in the children.
+    from core.audio.decoding import decode_to_pcm16, model_input, wav_bytes
+    from core.models.loader import load_whisper_s2t_model
+
+    try:
+        model = load_whisper_s2t_model(
+            spec.model_name,
+            spec.precision,
+            spec.device,
+            beam_size=spec.beam_size,
+            local_path=spec.local_path,
+            cpu_threads=cpu_threads,
+        )
+    except Exception as e:
+        results.put((LOAD_FAILED, None, str(e), 0.0))
+        return
+    results.put((READY, None, None, 0.0))
+
+    while not stop.is_set():
+        job = tasks.get()
+        if job is None:
+            return
+        job_id, paths = job
+        t0 = time.perf_counter()
+        sources = []
+        for path in paths:
+            try:
+                sources.append(wav_bytes(decode_to_pcm16(path)))
+            except Exception:
+                # Let whisper_s2t's own loader try, and report the real error.
+                sources.append(path)
+        n = len(sources)
+        try:
+            out = model.transcribe_with_vad(
+                [model_input(s) for s in sources],
+                lang_codes=[language] * n,
+                tasks=[task] * n,
+                initial_prompts=[None] * n,
+                batch_size=batch_size,
+            )
+            out = list(out or [])
+            out += [[] for _ in range(n - len(out))]
+        except Exception as e:
+            results.put((FAILED, job_id, str(e), time.perf_counter() - t0))
+            continue
+        results.put((DONE, job_id, out, time.perf_counter() - t0))
+
+
+class CpuWorkerPool:
+    """K processes, each holding its own CPU model, fed from one task queue.
+
+    Jobs are (job_id, [paths]); every job yields exactly one result tuple
+    (kind, job_id, payload, seconds) where payload is the per-file segment
+    lists for DONE or an error string for FAILED. Uses the spawn start method
+    everywhere so CTranslate2 and OpenMP state is never forked.
+    """
+
+    def __init__(
+        self,
+        spec: WorkerModelSpec,
+        workers: int,
+        threads_per_worker: int,
+        language: str,
+        task: str,
+        batch_size: int,
+    ) -> None:
+        self._ctx = mp.get_context("spawn")
+        self._tasks = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+        self._stop = self._ctx.Event()
+        self._procs = [
+            self._ctx.Process(
+                target=_worker_main,
+                args=(
+                    spec, threads_per_worker, language, task, batch_size,
+                    self._tasks, self._results, self._stop,
+                ),
+                daemon=True,
+                name=f"whisper-cpu-worker-{i}",
+            )
+            for i in range(max(1, workers))
+        ]
+
+    @property
+    def size(self) -> int:
+        return len(self._procs)
+
+    def start(self) -> None:
+        for proc in self._procs:
+            proc.start()
+
+    def submit(self, job_id: int, paths: list[str]) -> None:
+        self._tasks.put((job_id, paths))
+
+    def get(self, timeout: float) -> Optional[tuple]:
+        try:
+            return self._results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def alive(self) -> int:
+        return sum(1 for p in self._procs if p.is_alive())
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop after the jobs currently running; queued jobs are dropped."""
+        self._stop.set()
+        for _ in self._procs:
+            self._tasks.put(None)
+        deadline = time.monotonic() + timeout
+        for proc in self._procs:
+            proc.join(max(0.0, deadline - time.monotonic()))
+            if proc.is_alive():
+                logger.warning(f"Terminating unresponsive worker {proc.name}")
+                proc.terminate()
+                proc.join(1.0)
+        self._tasks.cancel_join_thread()
+        self._results.cancel_join_thread()
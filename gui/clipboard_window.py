@@ -151,6 +151,13 @@ class ClipboardSideWindow(QWidget):
         else:
             self._text_display.setPlainText(text)
 
+    def extend_transcription(self, text: str) -> None:
+        """Continue the newest entry, e.g. with the next dictated utterance."""
+        if not text:
+            return
+        current = self._text_display.toPlainText().rstrip()
+        self._text_display.setPlainText(f"{current} {text}" if current else text)
+
     def get_full_text(self) -> str:
         return self._text_display.toPlainText()
 
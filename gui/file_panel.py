@@ -31,6 +31,7 @@ from PySide6.QtWidgets import (
 )
 
 from core.logging_config import get_logger
+from core.output.writers import available_formats
 from core.transcription.file_scanner import FileScanner
 
 logger = get_logger(__name__)
@@ -40,8 +41,6 @@ SUPPORTED_AUDIO_EXTENSIONS = [
     ".mkv", ".mp3", ".mp4", ".ogg", ".wav", ".webm", ".wma",
 ]
 
-OUTPUT_FORMATS = ["txt", "srt", "vtt", "json"]
-
 OUTPUT_MODES = [
     ("Clipboard only", "clipboard"),
     ("Save to source directory", "save_to_source"),
@@ -210,7 +209,7 @@ class FilePanelWindow(QWidget):
 
         grid.addWidget(QLabel("Format:"), 0, 2)
         self._format_combo = QComboBox()
-        self._format_combo.addItems(OUTPUT_FORMATS)
+        self._format_combo.addItems(available_formats())
         grid.addWidget(self._format_combo, 0, 3)
 
         grid.addWidget(QLabel("Output:"), 1, 0)
@@ -958,7 +958,23 @@ class MainWindow(QMainWindow):
             task_mode=self.task_mode,
             include_timestamps=bool(config_manager.get_value("include_timestamps", False)),
         )
-        self.server_manager.start_server(port, self.controller.model_manager, default_settings)
+        self.server_manager.start_server(
+            port,
+            self.controller.model_manager,
+            default_settings,
+            cache=self.controller.transcription_cache,
+            batch_window_ms=config_manager.get_value("server_batch_window_ms", 20),
+            max_batch_items=config_manager.get_value("server_max_batch_items", 8),
+            max_jobs=config_manager.get_value("server_max_jobs", 100),
+            max_queue_depth=config_manager.get_value("server_max_queue_depth", 64),
+            max_queued_audio_s=config_manager.get_value("server_max_queued_audio_s", 7200),
+            request_timeout_s=config_manager.get_value("server_request_timeout_s", 600),
+            warmup_models=(
+                config_manager.get_value("server_warmup_models", []) or [model_key]
+                if config_manager.get_value("server_warmup_enabled", True)
+                else []
+            ),
+        )
 
     @Slot(int)
     def _on_server_started(self, port: int) -> None:
@@ -1243,21 +1259,33 @@ class MainWindow(QMainWindow):
 
     @Slot(str)
     def _on_transcription_ready(self, text: str) -> None:
-        self.record_button.set_state(WaveformButton.IDLE)
+        # Live dictation delivers one utterance at a time; the first starts a
+        # new clipboard entry and the rest extend it.
+        dictating = self.controller.is_dictating()
+        continuing = getattr(self, "_dictation_open", False)
+        self._dictation_open = dictating and (continuing or bool(text))
+        if not dictating:
+            self.record_button.set_state(WaveformButton.IDLE)
 
         output_mode = getattr(self, "_pending_output_mode", "clipboard")
 
         if output_mode in ("clipboard", "save_and_clipboard"):
-            self.clipboard_window.add_transcription(text)
+            if continuing:
+                self.clipboard_window.extend_transcription(text)
+            else:
+                self.clipboard_window.add_transcription(text)
 
             if app := QApplication.instance():
                 clip_text = (
                     self.clipboard_window.get_full_text()
-                    if self.clipboard_window.is_append_mode()
+                    if self.clipboard_window.is_append_mode() or continuing
                     else text
                 )
                 app.clipboard().setText(clip_text)
 
+        if dictating:
+            return
+
         if self.is_recording:
             self.is_recording = False
             update_button_property(self.record_button, "recording", False)
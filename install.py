@@ -41,6 +41,7 @@ libs = [
     "sympy==1.13.3",
     "tqdm",
     "uvicorn",
+    "websockets",
     "whisper-s2t-reborn>=1.7.1,<2.0.0",
 ]
 
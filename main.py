@@ -133,4 +133,7 @@ def main() -> None:
 
 
 if __name__ == "__main__":
+    # Batch CPU workers are spawned processes; needed for frozen builds.
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,55 @@
+"""AdaptiveBatchSize: back off on OOM, probe upward after successes."""
+from __future__ import annotations
+
+from core.transcription.adaptive import AdaptiveBatchSize
+
+
+def _succeed(adaptive: AdaptiveBatchSize, times: int) -> None:
+    for _ in range(times):
+        adaptive.on_success()
+
+
+def test_halves_on_oom_and_never_probes_back_onto_a_failed_size():
+    adaptive = AdaptiveBatchSize(ceiling=16, probe_after=2)
+    assert adaptive.on_oom()
+    assert adaptive.current == 8
+
+    _succeed(adaptive, 2)
+    # Halfway back towards 16, which ran out of memory.
+    assert adaptive.current == 12
+    assert adaptive.stable == 8
+
+    assert adaptive.on_oom()
+    assert adaptive.current == 6
+    _succeed(adaptive, 2)
+    assert adaptive.current == 9
+    assert adaptive.to_remember() == 8
+
+
+def test_gives_up_at_one():
+    adaptive = AdaptiveBatchSize(ceiling=2)
+    assert adaptive.on_oom()
+    assert adaptive.current == 1
+    assert not adaptive.on_oom()
+
+
+def test_starts_from_the_remembered_size_and_grows_to_the_ceiling():
+    adaptive = AdaptiveBatchSize(ceiling=16, remembered=4, probe_after=2)
+    assert adaptive.current == 4
+
+    _succeed(adaptive, 2)
+    assert adaptive.current == 8
+    # Nothing better than what was remembered has been proven yet.
+    assert adaptive.to_remember() is None
+
+    _succeed(adaptive, 2)
+    assert adaptive.current == 16
+    assert adaptive.to_remember() == 8
+
+    _succeed(adaptive, 2)
+    assert adaptive.current == 16
+    assert adaptive.to_remember() == 16
+
+
+def test_remembered_size_is_capped_by_the_ceiling():
+    assert AdaptiveBatchSize(ceiling=8, remembered=32).current == 8
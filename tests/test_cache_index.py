@@ -0,0 +1,71 @@
+"""ModelCacheIndex: stat-only revalidation of indexed snapshots."""
+from __future__ import annotations
+
+import json
+import os
+
+from core.models.cache_index import ModelCacheIndex
+
+REPO = "org/model"
+
+
+def _snapshot(tmp_path):
+    snapshot = tmp_path / "snapshots" / "abc"
+    (snapshot / "sub").mkdir(parents=True)
+    (snapshot / "model.bin").write_bytes(b"\0" * 64)
+    (snapshot / "sub" / "config.json").write_text("{}", encoding="utf-8")
+    return snapshot
+
+
+def test_hit_survives_a_reload(tmp_path):
+    snapshot = _snapshot(tmp_path)
+    index = ModelCacheIndex(tmp_path / "index.json")
+    index.record(REPO, str(snapshot))
+    assert index.lookup(REPO) == str(snapshot)
+
+    entry = json.loads((tmp_path / "index.json").read_text())[REPO]
+    assert sorted(entry["files"]) == ["model.bin", "sub/config.json"]
+    assert ModelCacheIndex(tmp_path / "index.json").lookup(REPO) == str(snapshot)
+
+
+def test_changed_or_missing_file_drops_the_entry(tmp_path):
+    snapshot = _snapshot(tmp_path)
+    index = ModelCacheIndex(tmp_path / "index.json")
+
+    index.record(REPO, str(snapshot))
+    (snapshot / "model.bin").write_bytes(b"\0" * 65)
+    assert index.lookup(REPO) is None
+    # Dropped for good, not just for this lookup.
+    assert ModelCacheIndex(tmp_path / "index.json").lookup(REPO) is None
+
+    index.record(REPO, str(snapshot))
+    st = os.stat(snapshot / "sub" / "config.json")
+    os.utime(snapshot / "sub" / "config.json", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert index.lookup(REPO) is None
+
+    index.record(REPO, str(snapshot))
+    (snapshot / "model.bin").unlink()
+    assert index.lookup(REPO) is None
+
+
+def test_checked_at_is_tied_to_the_indexed_path(tmp_path):
+    snapshot = _snapshot(tmp_path)
+    index = ModelCacheIndex(tmp_path / "index.json")
+    index.record(REPO, str(snapshot))
+    assert index.checked_at(REPO, str(snapshot)) is None
+
+    index.mark_checked(REPO)
+    assert index.checked_at(REPO, str(snapshot)) is not None
+    assert index.checked_at(REPO, str(tmp_path / "elsewhere")) is None
+
+    # Re-recording (a new validation) clears the check.
+    index.record(REPO, str(snapshot))
+    assert index.checked_at(REPO, str(snapshot)) is None
+
+
+def test_unreadable_index_starts_empty(tmp_path):
+    (tmp_path / "index.json").write_text("{not json", encoding="utf-8")
+    index = ModelCacheIndex(tmp_path / "index.json")
+    assert index.lookup(REPO) is None
+    index.record(REPO, str(_snapshot(tmp_path)))
+    assert ModelCacheIndex(tmp_path / "index.json").lookup(REPO) is not None
@@ -0,0 +1,278 @@
+"""ModelDownloader against a local HTTP stand-in for the hub."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from core.exceptions import ModelLoadError
+from core.models.downloader import CHUNK_SIZE, ModelDownloader, changed_files
+
+REPO = "org/model"
+COMMIT = "0123456789abcdef0123456789abcdef01234567"
+PART = CHUNK_SIZE  # the smallest part size the downloader accepts
+
+WEIGHTS = os.urandom(4 * PART + 12345)  # five ranged parts
+CONFIG = b'{"dim": 384}\n'
+
+
+def _git_sha1(data: bytes) -> str:
+    return hashlib.sha1(f"blob {len(data)}\0".encode() + data).hexdigest()
+
+
+class FakeHub:
+    """Serves the revision metadata route and /resolve/ with Range support,
+    recording every file request."""
+
+    def __init__(self, files: dict[str, bytes], lfs: set[str]) -> None:
+        self.files = files
+        self.lfs = lfs
+        self.corrupt: set[str] = set()
+        # File name -> body bytes to send on its next data request before
+        # closing the connection, with the full Content-Length announced.
+        self.drop_after: dict[str, int] = {}
+        self.delay = 0.0
+        self.requests: list[tuple[str, str | None]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def etag(self, name: str) -> str:
+        data = self.files[name]
+        return hashlib.sha256(data).hexdigest() if name in self.lfs else _git_sha1(data)
+
+    def manifest(self) -> dict:
+        siblings = []
+        for name, data in self.files.items():
+            if name in self.lfs:
+                siblings.append({
+                    "rfilename": name,
+                    "size": len(data),
+                    "lfs": {"size": len(data), "sha256": self.etag(name)},
+                })
+            else:
+                siblings.append({"rfilename": name, "size": len(data), "blobId": self.etag(name)})
+        return {"sha": COMMIT, "siblings": siblings}
+
+    def file_ranges(self, name: str) -> list[str | None]:
+        """Range headers of the data requests for `name` (not the probe)."""
+        return [r for n, r in self.requests if n == name and r != "bytes=0-0"]
+
+    def _handler(self):
+        hub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                if self.path == f"/api/models/{REPO}/revision/main?blobs=true":
+                    body = json.dumps(hub.manifest()).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                prefix = f"/{REPO}/resolve/{COMMIT}/"
+                name = self.path[len(prefix):] if self.path.startswith(prefix) else None
+                if name not in hub.files:
+                    self.send_error(404)
+                    return
+                data = hub.files[name]
+                if name in hub.corrupt:
+                    data = bytes([data[0] ^ 0xFF]) + data[1:]
+                rng = self.headers.get("Range")
+                with hub._lock:
+                    hub.requests.append((name, rng))
+                    drop = hub.drop_after.pop(name, None) if rng != "bytes=0-0" else None
+                    hub.in_flight += 1
+                    hub.max_in_flight = max(hub.max_in_flight, hub.in_flight)
+                try:
+                    time.sleep(hub.delay)
+                    match = re.fullmatch(r"bytes=(\d+)-(\d+)", rng or "")
+                    if match:
+                        start, end = int(match.group(1)), int(match.group(2)) + 1
+                        self.send_response(206)
+                        self.send_header(
+                            "Content-Range", f"bytes {start}-{end - 1}/{len(data)}"
+                        )
+                    else:
+                        start, end = 0, len(data)
+                        self.send_response(200)
+                    self.send_header("Content-Length", str(end - start))
+                    self.end_headers()
+                    if drop is not None:
+                        self.wfile.write(data[start:start + drop])
+                        self.close_connection = True
+                        return
+                    self.wfile.write(data[start:end])
+                finally:
+                    with hub._lock:
+                        hub.in_flight -= 1
+
+        return Handler
+
+    def __enter__(self) -> "FakeHub":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def hub():
+    with FakeHub({"model.bin": WEIGHTS, "config.json": CONFIG}, lfs={"model.bin"}) as h:
+        yield h
+
+
+def _downloader(hub: FakeHub, cache: Path, workers: int) -> ModelDownloader:
+    return ModelDownloader(hub.url, cache, max_workers=workers, part_size=PART, timeout=10)
+
+
+def test_interrupted_ranged_download_resumes(hub, tmp_path):
+    blobs = tmp_path / f"models--{REPO.replace('/', '--')}" / "blobs"
+    weights_etag = hub.etag("model.bin")
+    cancel = threading.Event()
+
+    def cancel_after_two_parts(done: int, total: int) -> None:
+        if done >= 2 * PART:
+            cancel.set()
+
+    # One worker fetches the parts in order, so the cancel lands in part 2.
+    with pytest.raises(InterruptedError):
+        _downloader(hub, tmp_path, workers=1).download(
+            REPO, progress_callback=cancel_after_two_parts, cancel_event=cancel
+        )
+    state = json.loads((blobs / f"{weights_etag}.parts.json").read_text())
+    assert state["done"] == [0, 1]
+    assert (blobs / f"{weights_etag}.incomplete").stat().st_size == len(WEIGHTS)
+
+    hub.requests.clear()
+    calls = []
+    snapshot = _downloader(hub, tmp_path, workers=4).download(
+        REPO, progress_callback=lambda done, total: calls.append((done, total))
+    )
+
+    # Only the missing parts were fetched again.
+    requested = sorted(hub.file_ranges("model.bin"))
+    expected = sorted(
+        f"bytes={start}-{min(start + PART, len(WEIGHTS)) - 1}"
+        for start in range(2 * PART, len(WEIGHTS), PART)
+    )
+    assert requested == expected
+
+    # Progress is aggregated over every file and starts from what was on disk.
+    total = len(WEIGHTS) + len(CONFIG)
+    assert all(t == total for _, t in calls)
+    assert calls[0][0] >= 2 * PART
+    assert [d for d, _ in calls] == sorted(d for d, _ in calls)
+    assert calls[-1][0] == total
+
+    assert Path(snapshot) == tmp_path / f"models--{REPO.replace('/', '--')}" / "snapshots" / COMMIT
+    assert not list(blobs.glob("*.incomplete")) and not list(blobs.glob("*.parts.json"))
+
+
+def test_snapshot_layout(hub, tmp_path):
+    hub.delay = 0.05
+    snapshot = Path(_downloader(hub, tmp_path, workers=4).download(REPO))
+    repo_dir = tmp_path / f"models--{REPO.replace('/', '--')}"
+
+    # Parts and files were fetched in parallel.
+    assert hub.max_in_flight > 1
+    assert (repo_dir / "refs" / "main").read_text() == COMMIT
+    assert snapshot == repo_dir / "snapshots" / COMMIT
+    for name, data in hub.files.items():
+        blob = repo_dir / "blobs" / hub.etag(name)
+        assert blob.read_bytes() == data
+        pointer = snapshot / name
+        assert pointer.read_bytes() == data
+        if pointer.is_symlink():
+            assert pointer.resolve() == blob.resolve()
+
+
+def test_checksum_mismatch_discards_the_download(hub, tmp_path):
+    hub.corrupt = {"config.json"}
+    blobs = tmp_path / f"models--{REPO.replace('/', '--')}" / "blobs"
+    with pytest.raises(ModelLoadError, match="Checksum mismatch for config.json"):
+        _downloader(hub, tmp_path, workers=2).download(REPO, filenames=["config.json"])
+    assert not (blobs / f"{hub.etag('config.json')}.incomplete").exists()
+    assert not (blobs / hub.etag("config.json")).exists()
+
+
+def test_corrupt_ranged_file_discards_parts_state(hub, tmp_path):
+    hub.corrupt = {"model.bin"}
+    blobs = tmp_path / f"models--{REPO.replace('/', '--')}" / "blobs"
+    etag = hub.etag("model.bin")
+    with pytest.raises(ModelLoadError, match="Checksum mismatch for model.bin"):
+        _downloader(hub, tmp_path, workers=4).download(REPO, filenames=["model.bin"])
+    assert not (blobs / f"{etag}.incomplete").exists()
+    assert not (blobs / f"{etag}.parts.json").exists()
+
+
+
+@pytest.mark.parametrize(
+    "part_size, prefix, retry",
+    [
+        # Part 0 of two drops halfway and continues from there.
+        (4 * PART, 0, f"bytes={2 * PART}-{4 * PART - 1}"),
+        # A resumed sequential download drops after two more chunks.
+        (8 * PART, PART, f"bytes={3 * PART}-{len(WEIGHTS) - 1}"),
+    ],
+    ids=["ranged", "single-stream"],
+)
+def test_dropped_connection_retries_from_the_last_written_byte(
+    hub, tmp_path, part_size, prefix, retry
+):
+    blobs = tmp_path / f"models--{REPO.replace('/', '--')}" / "blobs"
+    blobs.mkdir(parents=True)
+    if prefix:
+        (blobs / f"{hub.etag('model.bin')}.incomplete").write_bytes(WEIGHTS[:prefix])
+    hub.drop_after = {"model.bin": 2 * PART}
+
+    calls = []
+    downloader = ModelDownloader(hub.url, tmp_path, max_workers=1, part_size=part_size, timeout=10)
+    snapshot = Path(downloader.download(
+        REPO,
+        filenames=["model.bin"],
+        progress_callback=lambda done, total: calls.append(done),
+    ))
+
+    assert (snapshot / "model.bin").read_bytes() == WEIGHTS
+    assert hub.file_ranges("model.bin")[1] == retry
+    # Bytes are reported once: progress never overshoots and ends at the size.
+    assert calls == sorted(calls)
+    assert calls[-1] == len(WEIGHTS)
+
+
+def test_changed_files_compares_blob_ids(hub, tmp_path):
+    downloader = _downloader(hub, tmp_path, workers=2)
+    snapshot = Path(downloader.download(REPO))
+    _, files = downloader.fetch_manifest(REPO)
+    assert changed_files(snapshot, files) == []
+
+    # Same size, new content: only the blob id tells them apart.
+    hub.files["config.json"] = CONFIG.replace(b"384", b"512")
+    _, files = downloader.fetch_manifest(REPO)
+    assert changed_files(snapshot, files) == ["config.json"]
+
+    # A plain copy (no symlink support) is hashed instead.
+    pointer = snapshot / "config.json"
+    pointer.unlink()
+    pointer.write_bytes(hub.files["config.json"])
+    assert changed_files(snapshot, files) == []
@@ -0,0 +1,69 @@
+"""EnergyEndpointer: utterance boundaries in a live stream."""
+from __future__ import annotations
+
+import numpy as np
+
+from core.audio.endpointing import SAMPLE_RATE, EnergyEndpointer
+
+
+def _noise(seconds: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.normal(0.0, 1e-3, int(seconds * SAMPLE_RATE)).astype(np.float32)
+
+
+def _tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32) + _noise(seconds, 1)
+
+
+def _feed(endpointer: EnergyEndpointer, audio: np.ndarray, sizes=(4000,)) -> list:
+    out, pos, i = [], 0, 0
+    while pos < audio.size:
+        n = sizes[i % len(sizes)]
+        out.extend(endpointer.feed(audio[pos:pos + n]))
+        pos += n
+        i += 1
+    return out
+
+
+def test_one_utterance_with_pre_roll():
+    audio = np.concatenate((_noise(1.0), _tone(1.0), _noise(1.5)))
+    endpointer = EnergyEndpointer()
+    [utt] = _feed(endpointer, audio)
+
+    # Opens with up to 300 ms from before the onset and closes after 600 ms
+    # of silence.
+    assert 0.7 <= utt.start < 1.0
+    assert 2.5 <= utt.end <= 2.7
+    assert not endpointer.in_speech
+    assert endpointer.flush() is None
+
+
+def test_boundaries_do_not_depend_on_chunking():
+    audio = np.concatenate((_noise(0.5), _tone(0.8), _noise(1.0), _tone(0.5), _noise(1.0)))
+    whole = _feed(EnergyEndpointer(), audio, sizes=(audio.size,))
+    chunked = _feed(EnergyEndpointer(), audio, sizes=(1, 333, 480, 7919))
+    assert len(whole) == 2
+    assert [(u.start, u.audio.size) for u in chunked] == [(u.start, u.audio.size) for u in whole]
+    for a, b in zip(chunked, whole):
+        np.testing.assert_array_equal(a.audio, b.audio)
+
+
+def test_long_speech_is_split_at_max_utterance():
+    endpointer = EnergyEndpointer(max_utterance_s=1.0)
+    closed = _feed(endpointer, np.concatenate((_noise(0.5), _tone(3.5))))
+    assert len(closed) >= 2
+    assert all(u.end - u.start <= 1.0 + 1e-6 for u in closed)
+
+    # Whatever is still open comes out on flush, including the partial frame.
+    assert endpointer.in_speech
+    assert endpointer.current() is not None
+    tail = endpointer.flush()
+    assert tail is not None and not endpointer.in_speech
+    assert abs(tail.end - 4.0) < 1e-6
+
+
+def test_silence_only_yields_nothing():
+    endpointer = EnergyEndpointer()
+    assert _feed(endpointer, _noise(3.0)) == []
+    assert endpointer.flush() is None
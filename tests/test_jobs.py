@@ -0,0 +1,70 @@
+"""JobStore: bounded retention and progress estimates for API jobs."""
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from core.server.jobs import DONE, FAILED, RUNNING, Job, JobStore, JobStoreFull
+
+
+def test_evicts_oldest_finished_jobs_but_never_active_ones():
+    store = JobStore(max_jobs=3)
+    first, second, third = Job(), Job(), Job()
+    for job in (first, second, third):
+        store.add(job)
+    store.finish(first, DONE)
+    store.finish(third, FAILED)
+
+    fourth = Job()
+    store.add(fourth)
+    assert store.get(first.id) is None
+    assert store.get(third.id) is third
+    assert store.counts() == {"queued": 2, "failed": 1}
+
+    store.add(Job())
+    assert store.get(third.id) is None
+    with pytest.raises(JobStoreFull):
+        store.add(Job())
+
+
+def test_finish_only_applies_once():
+    store = JobStore()
+    job = Job()
+    store.add(job)
+    store.mark_running(job)
+    assert job.status == RUNNING and job.started_at is not None
+    store.finish(job, DONE, response={"text": "hi"})
+    store.finish(job, FAILED, error="late")
+    assert job.status == DONE
+    assert job.error is None
+
+
+def test_queued_eta_includes_the_jobs_ahead():
+    store = JobStore()
+    assert store.progress(Job(audio_seconds=10.0)) == (0.0, None)
+
+    # 10 audio-seconds per second, smoothed.
+    store.record_throughput(100.0, 10.0)
+    store.record_throughput(0.0, 1.0)
+    assert store.rate == pytest.approx(10.0)
+
+    now = time.time()
+    ahead = Job(audio_seconds=50.0, created_at=now - 2)
+    queued = Job(audio_seconds=20.0, created_at=now)
+    store.add(ahead)
+    store.add(queued)
+
+    fraction, eta = store.progress(queued)
+    assert fraction == 0.0
+    assert eta == pytest.approx(7.0)
+
+    store.mark_running(ahead)
+    ahead.started_at = time.time() - 1.0
+    fraction, eta = store.progress(ahead)
+    assert fraction == pytest.approx(0.2, abs=0.01)
+    assert eta == pytest.approx(4.0, abs=0.1)
+
+    store.finish(ahead, DONE)
+    assert store.progress(ahead) == (1.0, 0.0)
+    assert store.describe(queued)["eta_seconds"] == pytest.approx(2.0)
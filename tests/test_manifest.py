@@ -0,0 +1,79 @@
+"""JobManifest: which batch inputs a resumed run may skip."""
+from __future__ import annotations
+
+import os
+
+from core.transcription.manifest import MANIFEST_NAME, JobManifest, manifest_location
+
+
+def _finished(tmp_path, name="a.wav"):
+    audio = tmp_path / name
+    audio.write_bytes(b"RIFF" + bytes(100))
+    output = audio.with_suffix(".txt")
+    output.write_text("hello\n", encoding="utf-8")
+    return audio, output
+
+
+def _reloaded(path) -> JobManifest:
+    manifest = JobManifest(path)
+    manifest.load()
+    return manifest
+
+
+def test_recorded_file_is_done_after_reload(tmp_path):
+    audio, output = _finished(tmp_path)
+    manifest = JobManifest(tmp_path / MANIFEST_NAME)
+    manifest.record(audio, output, "txt", "en", "transcribe", 1.25, 10.0)
+    manifest.close()
+
+    manifest = _reloaded(tmp_path / MANIFEST_NAME)
+    assert manifest.is_done(audio, "txt", "en", "transcribe")
+    assert list(manifest.done_outputs()) == [str(output)]
+    # A different output format, language or task has not been done.
+    assert not manifest.is_done(audio, "srt", "en", "transcribe")
+    assert not manifest.is_done(audio, "txt", "de", "transcribe")
+    assert not manifest.is_done(audio, "txt", "en", "translate")
+
+
+def test_changed_input_or_missing_output_is_not_done(tmp_path):
+    audio, output = _finished(tmp_path)
+    other, other_output = _finished(tmp_path, "b.wav")
+    manifest = JobManifest(tmp_path / MANIFEST_NAME)
+    manifest.record(audio, output, "txt", "en", "transcribe", 1.0, None)
+    manifest.record(other, other_output, "txt", "en", "transcribe", 1.0, None)
+    manifest.close()
+
+    st = os.stat(audio)
+    os.utime(audio, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    other_output.unlink()
+
+    manifest = _reloaded(tmp_path / MANIFEST_NAME)
+    assert not manifest.is_done(audio, "txt", "en", "transcribe")
+    assert not manifest.is_done(other, "txt", "en", "transcribe")
+
+
+def test_truncated_last_line_is_ignored_and_terminated(tmp_path):
+    audio, output = _finished(tmp_path)
+    path = tmp_path / MANIFEST_NAME
+    manifest = JobManifest(path)
+    manifest.record(audio, output, "txt", "en", "transcribe", 1.0, None)
+    manifest.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"input": "half a rec')
+
+    manifest = _reloaded(path)
+    assert manifest.is_done(audio, "txt", "en", "transcribe")
+
+    # The next record starts on a line of its own, so it is not lost.
+    other, other_output = _finished(tmp_path, "b.wav")
+    manifest.record(other, other_output, "txt", "en", "transcribe", 1.0, None)
+    manifest.close()
+    assert _reloaded(path).is_done(other, "txt", "en", "transcribe")
+
+
+def test_manifest_location(tmp_path):
+    (tmp_path / "x").mkdir()
+    files = [tmp_path / "x" / "a.wav", tmp_path / "b.wav"]
+    assert manifest_location(files, None) == tmp_path.resolve() / MANIFEST_NAME
+    out = tmp_path / "out"
+    assert manifest_location(files, str(out)) == out / MANIFEST_NAME
@@ -0,0 +1,104 @@
+"""ModelPool: LRU order, per-device budgets, pinning and leases."""
+from __future__ import annotations
+
+from core.models.pool import ModelPool
+
+A = ("model-a", "float16", "cuda", 1)
+B = ("model-b", "float16", "cuda", 1)
+C = ("model-c", "float16", "cuda", 1)
+CPU = ("model-a", "int8", "cpu", 1)
+
+
+class Model:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __repr__(self) -> str:
+        return self.name
+
+
+def _pool(budget_mb: int = 1000, size_mb: float = 400.0) -> ModelPool:
+    pool = ModelPool(budget_mb)
+    for key in (A, B, C, CPU):
+        pool.record_footprint(key, 0.0, size_mb)
+    return pool
+
+
+def test_evicts_least_recently_used_first():
+    pool = _pool()
+    a, b = Model("a"), Model("b")
+    pool.add(A, a)
+    pool.add(B, b)
+    assert pool.get(A) is a  # a is now the most recently used
+    assert pool.make_room(C) == [b]
+    assert pool.peek(B) is None
+    assert pool.stats()["evictions"] == 1
+
+
+def test_pinned_and_other_device_models_stay():
+    pool = _pool(size_mb=600.0)
+    a, cpu = Model("a"), Model("cpu")
+    pool.add(A, a, pinned=True)
+    pool.add(CPU, cpu)
+    # Does not fit, but the only cuda model is pinned and the cpu one is
+    # on another budget.
+    assert pool.make_room(B) == []
+    assert pool.peek(A) is a and pool.peek(CPU) is cpu
+
+
+def test_leased_model_is_not_evicted_and_counts_until_released():
+    pool = _pool(size_mb=600.0)
+    a = Model("a")
+    pool.add(A, a)
+    assert pool.acquire(A) is a
+    assert pool.make_room(B) == []
+
+    # Removed while leased: nothing to free yet, and its memory still counts.
+    assert pool.remove(A) is None
+    assert pool.stats()["used_mb"]["cuda"] == 600
+    assert pool.stats()["retired_in_use"] == 1
+    assert pool.release(a) is a
+    assert pool.stats()["used_mb"] == {}
+
+
+def test_nested_leases():
+    pool = _pool(size_mb=600.0)
+    a = Model("a")
+    pool.add(A, a, lease=True)
+    pool.lease(a)
+    assert pool.stats()["resident"][0]["leases"] == 2
+    assert pool.release(a) is None
+    assert pool.make_room(C) == []
+    # Still in the pool after the last lease: nothing to hand back, but it
+    # can be evicted now.
+    assert pool.release(a) is None
+    assert pool.make_room(C) == [a]
+
+
+def test_replacing_a_key_hands_back_the_old_model():
+    pool = _pool()
+    old, new = Model("old"), Model("new")
+    pool.add(A, old)
+    assert pool.add(A, new) is old
+    assert pool.add(A, new) is None
+    assert pool.discard(old, A) is old
+    assert pool.discard(new, A) is None  # still resident
+
+
+def test_beam_size_is_part_of_the_key():
+    pool = _pool()
+    greedy, beam5 = Model("greedy"), Model("beam5")
+    pool.add(A, greedy)
+    pool.add(A[:3] + (5,), beam5)
+    assert pool.get(A) is greedy
+    assert pool.get(A[:3] + (5,)) is beam5
+    assert {r["beam_size"] for r in pool.stats()["resident"]} == {1, 5}
+
+
+def test_drain_returns_only_unleased_models():
+    pool = _pool()
+    a, b = Model("a"), Model("b")
+    pool.add(A, a)
+    pool.add(B, b, lease=True)
+    assert pool.drain() == [a]
+    assert pool.release(b) is b
@@ -0,0 +1,82 @@
+"""RingBuffer: single-producer / single-consumer byte ring."""
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+import pytest
+
+from core.audio.ring_buffer import RingBuffer
+
+
+def _drain(ring: RingBuffer) -> bytes:
+    views = ring.peek()
+    data = b"".join(v.tobytes() for v in views)
+    ring.advance(len(data))
+    return data
+
+
+def test_wraparound_returns_two_views_in_order():
+    ring = RingBuffer(10)
+    assert ring.write(b"abcdefg")
+    assert _drain(ring) == b"abcdefg"
+
+    assert ring.write(b"hijklm")  # 3 bytes at the end, 3 at the start
+    views = ring.peek()
+    assert [v.tobytes() for v in views] == [b"hij", b"klm"]
+    ring.advance(6)
+    assert ring.written == ring.consumed == 13
+    assert ring.readable() == 0
+
+
+def test_full_ring_rejects_the_whole_block():
+    ring = RingBuffer(8)
+    assert ring.write(b"12345")
+    assert not ring.write(b"6789")
+    assert ring.readable() == 5
+    assert ring.write(b"678")
+    assert _drain(ring) == b"12345678"
+
+
+def test_partial_peek_and_advance():
+    ring = RingBuffer(8)
+    ring.write(b"abcdef")
+    assert b"".join(v.tobytes() for v in ring.peek(4)) == b"abcd"
+    ring.advance(4)
+    # advance() never releases more than was written.
+    ring.advance(100)
+    assert ring.consumed == ring.written == 6
+
+
+def test_latest_sees_the_newest_bytes_across_the_wrap():
+    ring = RingBuffer(8)
+    ring.write(b"abcdef")
+    ring.advance(6)
+    ring.write(b"ghij")
+    assert ring.latest(6).tobytes() == b"efghij"
+    assert ring.latest(100).tobytes() == b"cdefghij"
+
+
+def test_invalid_capacity():
+    with pytest.raises(ValueError):
+        RingBuffer(0)
+
+
+def test_threaded_producer_and_consumer_keep_every_byte():
+    ring = RingBuffer(4096)
+    data = np.random.default_rng(0).integers(0, 256, 1 << 17, dtype=np.uint8).tobytes()
+    received = bytearray()
+
+    def produce() -> None:
+        pos = 0
+        while pos < len(data):
+            block = data[pos:pos + 1000]
+            if ring.write(block):
+                pos += len(block)
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    while len(received) < len(data):
+        received += _drain(ring)
+    producer.join()
+    assert bytes(received) == data
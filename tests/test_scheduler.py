@@ -0,0 +1,51 @@
+"""Batch scheduling: duration buckets, file order and the ETA."""
+from __future__ import annotations
+
+from pathlib import Path
+
+from core.transcription import scheduler
+from core.transcription.scheduler import EtaEstimator, _bucket, order_files
+
+
+def test_bucket_boundaries():
+    # Sub-second clips share bucket 0 instead of going negative (and sorting
+    # after files of unknown length).
+    assert _bucket(0.0) == 0
+    assert _bucket(0.2) == 0
+    assert _bucket(0.99) == 0
+    assert _bucket(1.0) == 1
+    assert _bucket(1.9) == 1
+    assert _bucket(2.0) == 2
+    assert _bucket(7.9) == 3
+    assert _bucket(None) == -1
+
+
+def test_order_files():
+    files = [Path(n) for n in ("a", "b", "c", "d", "e")]
+    durations = {
+        files[0]: 3.0, files[1]: None, files[2]: 0.5, files[3]: 60.0, files[4]: 2.5,
+    }
+    assert order_files(files, durations, "path") == files
+    assert order_files(files, durations, "longest_first") == [
+        files[3], files[0], files[4], files[2], files[1],
+    ]
+    # Same bucket (2-4 s) keeps path order; unknown lengths go last.
+    assert order_files(files, durations, "bucketed") == [
+        files[3], files[0], files[4], files[2], files[1],
+    ]
+
+
+def test_eta_counts_files_completed_before_durations_arrive(monkeypatch):
+    a, b = Path("a"), Path("b")
+    eta = EtaEstimator()
+    eta.complete(a)
+    assert eta.describe() == ""
+
+    monkeypatch.setattr(scheduler, "probe_duration", lambda f: 30.0 if f == a else None)
+    scheduler.probe_in_background([a, b], eta).join()
+
+    # The unknown file counts as the mean of the known ones.
+    assert eta.total_audio == 60.0
+    assert eta.unknown == 1
+    assert eta.duration_of(a) == 30.0
+    assert eta.eta_seconds() is not None
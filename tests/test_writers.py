@@ -0,0 +1,104 @@
+"""Output writers: the format registry and streamed output files."""
+from __future__ import annotations
+
+import io
+import json
+
+import pytest
+
+from core.output import writers
+from core.output.writers import (
+    SegmentData,
+    SegmentWriter,
+    TranscriptionResult,
+    available_formats,
+    get_writer,
+    open_output,
+    register_format,
+    render_output,
+    write_output,
+)
+
+SEGMENTS = [
+    SegmentData(0.0, 1.5, " Hello there."),
+    SegmentData(1.5, 3661.25, " Ünïcode, \"quoted\"."),
+]
+RESULT = TranscriptionResult(text="", segments=SEGMENTS, language="en", duration=3700.0)
+
+
+def test_builtin_formats():
+    assert {"txt", "srt", "vtt", "json"} <= set(available_formats())
+    assert get_writer("vtt").media_type.startswith("text/vtt")
+    with pytest.raises(ValueError):
+        get_writer("docx")
+    with pytest.raises(TypeError):
+        SegmentWriter(io.StringIO())
+
+
+def test_rendered_formats():
+    assert render_output(RESULT, "txt") == "Hello there.\nÜnïcode, \"quoted\".\n"
+    assert render_output(RESULT, "srt") == (
+        "1\n00:00:00,000 --> 00:00:01,500\nHello there.\n\n"
+        "2\n00:00:01,500 --> 01:01:01,250\nÜnïcode, \"quoted\".\n\n"
+    )
+    assert render_output(RESULT, "vtt").startswith(
+        "WEBVTT\n\n00:00:00.000 --> 00:00:01.500\nHello there.\n\n"
+    )
+
+
+@pytest.mark.parametrize("duration", [3700.0, None])
+def test_streamed_json_matches_json_dumps(duration):
+    result = TranscriptionResult(text="", segments=SEGMENTS, language="en", duration=duration)
+    doc = {
+        "language": "en",
+        "duration": duration if duration is not None else SEGMENTS[-1].end,
+        "segments": [
+            {"start": s.start, "end": s.end, "text": s.text.strip()} for s in SEGMENTS
+        ],
+    }
+    rendered = render_output(result, "json")
+    assert json.loads(rendered) == doc
+    if duration is not None:
+        assert rendered == json.dumps(doc, indent=2, ensure_ascii=False)
+
+
+def test_empty_json_is_valid():
+    assert json.loads(render_output(TranscriptionResult(text=""), "json")) == {
+        "language": None, "segments": [], "duration": None,
+    }
+
+
+def test_registered_format_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(writers, "_WRITERS", dict(writers._WRITERS))
+
+    @register_format("tsv", "text/tab-separated-values; charset=utf-8")
+    class TsvWriter(SegmentWriter):
+        def open(self, language=None, duration=None) -> None:
+            self.stream.write("start\tend\ttext\n")
+
+        def append_segment(self, segment: SegmentData) -> None:
+            self.stream.write(f"{segment.start}\t{segment.end}\t{segment.text.strip()}\n")
+
+    assert "tsv" in available_formats()
+    assert get_writer("tsv") is TsvWriter and TsvWriter.name == "tsv"
+
+    out = tmp_path / "a.tsv"
+    write_output(RESULT, out, "tsv")
+    assert out.read_text(encoding="utf-8") == render_output(RESULT, "tsv")
+    assert out.read_text(encoding="utf-8").splitlines()[1] == "0.0\t1.5\tHello there."
+
+
+def test_open_output_only_publishes_a_finished_file(tmp_path):
+    out = tmp_path / "a.srt"
+    with pytest.raises(RuntimeError):
+        with open_output(out, "srt") as writer:
+            writer.append_segment(SEGMENTS[0])
+            raise RuntimeError("interrupted")
+    assert list(tmp_path.iterdir()) == []
+
+    with open_output(out, "srt") as writer:
+        for segment in SEGMENTS:
+            writer.append_segment(segment)
+        assert not out.exists()
+    assert out.read_text(encoding="utf-8") == render_output(RESULT, "srt")
+    assert list(tmp_path.iterdir()) == [out]